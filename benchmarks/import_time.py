@@ -0,0 +1,77 @@
+"""Startup time of `import instascrape` and of the command line.
+
+Each command is run in a new interpreter `--runs` times, and the median wall time is printed (minus the startup time of the bare interpreter).
+The modules imported by each command are listed with `--modules`, e.g. to check that `instascrape --version` does not import requests.
+
+    $ python benchmarks/import_time.py [--runs 20] [--modules] [--json]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("requests", "aiohttp", "tqdm", "instascrape.structures", "instascrape.download", "instascrape.instascraper")
+
+COMMANDS = {
+    "python": "pass",
+    "import instascrape": "import instascrape",
+    "instascrape --version": "from instascrape.cli import main; main(['instascrape', '--version'])",
+    "instascrape --help": "from instascrape.cli import main; main(['instascrape', '--help'])",
+    "from instascrape import InstaScraper": "from instascrape import InstaScraper",
+}
+
+
+def run(code: str, env: dict) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def imported(code: str, env: dict) -> list:
+    """Heavy modules imported by `code`."""
+    check = "import sys\ntry:\n    {0}\nexcept SystemExit:\n    pass\nprint(' '.join(sys.modules))".format(code)
+    out = subprocess.run([sys.executable, "-c", check], env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL).stdout.decode()
+    modules = out.split()
+    return [name for name in HEAVY if name in modules]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time of instascrape")
+    parser.add_argument("--runs", type=int, default=20, help="runs of each command (default: 20)")
+    parser.add_argument("--modules", action="store_true", help="list the heavy modules imported by each command")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    home = tempfile.mkdtemp()  # -> nothing should be created in it by importing
+    env = dict(os.environ, HOME=home, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+
+    results = {}
+    for name, code in COMMANDS.items():
+        run(code, env)  # warm up the file system cache & bytecode
+        results[name] = {"median_ms": statistics.median(run(code, env) for _ in range(args.runs)) * 1000}
+        if args.modules:
+            results[name]["heavy_modules"] = imported(code, env)
+    base = results["python"]["median_ms"]
+    for result in results.values():
+        result["overhead_ms"] = result["median_ms"] - base
+    created = sorted(os.listdir(home))
+
+    if args.json:
+        print(json.dumps({"python": sys.version.split()[0], "runs": args.runs, "results": results, "home_created": created}, indent=4))
+        return
+    print("Python {0}, median of {1} runs".format(sys.version.split()[0], args.runs))
+    for name, result in results.items():
+        line = "{0:<34} {1:8.1f} ms  (+{2:.1f} ms)".format(name, result["median_ms"], result["overhead_ms"])
+        if args.modules:
+            line += "  " + (", ".join(result["heavy_modules"]) or "-")
+        print(line)
+    print("created in HOME: {0}".format(", ".join(created) or "nothing"))
+
+
+if __name__ == "__main__":
+    main()
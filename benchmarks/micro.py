@@ -0,0 +1,248 @@
+"""CPU micro-benchmarks of the parsing & extraction hot paths, over GraphQL payloads (no network).
+
+Each benchmark processes `size` items, for every size of `--sizes` (from one page of 50 up to one million follower edges,
+the benchmarks of posts stop at `--max-posts`):
+    * shortcode_extractor (without & with filters) over post nodes
+    * _scrape_pages: iteration over the edges of follower pages, replayed in place of `_query_next_page`
+    * container: `container.container()` and `Container.src` of posts
+    * get_biggest_media: `utils.get_biggest_media()` of 'display_resources'
+    * Post.as_dict: lite `Post` built from its data, then `as_dict()`
+    * to_datetime
+    * pretty_print & dump:<format>: the output of `instascrape dump` (to memory / a temporary file)
+The items are cycled from one recorded page of each payload, so the memory used does not grow with the size.
+
+The payloads are generated by the mock of Instagram (see mock_instagram.py). Use `--record DIR` to save them, and `--payloads DIR`
+to run on payloads of the same files instead (e.g. real responses of Instagram).
+
+The results (best & median time per call of `--repeat` runs, and nanoseconds per item) are written as JSON to `--output`, and compared to the
+results of a previous run with `--compare`, which exits with status 1 if a benchmark got slower than `--threshold`.
+
+    $ python benchmarks/micro.py [--sizes 50,10000,1000000] [--filter dump] [--output results.json] [--compare baseline.json]
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import statistics
+import contextlib
+from itertools import (cycle, islice)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from mock_instagram import MockInstagram  # noqa: E402
+
+from instascrape.__version__ import __version__  # noqa: E402
+from instascrape.structures import (Profile, Post, shortcode_extractor)  # noqa: E402
+from instascrape.container import container  # noqa: E402
+from instascrape.utils import (get_biggest_media, to_datetime)  # noqa: E402
+from instascrape.export import (FORMATS, open_writer)  # noqa: E402
+from instascrape.cli import pretty_print  # noqa: E402
+
+PAGE = 50  # -> items per page of Instagram
+PAYLOADS = ("followers_page", "timeline_page", "posts")
+
+
+def generate_payloads() -> dict:
+    """One page of followers, one page of timeline post nodes and the full data of 50 posts, as returned by Instagram."""
+    mock = MockInstagram("https://scontent.cdninstagram.com", posts=PAGE, followers=PAGE)
+    return {"followers_page": {"data": mock.query("followers", {"id": "1", "first": PAGE})},
+            "timeline_page": {"data": mock.query("user_media", {"id": "1", "first": PAGE})},
+            "posts": [{"graphql": {"shortcode_media": mock.post("bench-{0}".format(i))}} for i in range(PAGE)]}
+
+
+def load_payloads(path: str) -> dict:
+    payloads = {}
+    for name in PAYLOADS:
+        with open(os.path.join(path, name + ".json")) as f:
+            payloads[name] = json.load(f)
+    return payloads
+
+
+def record_payloads(payloads: dict, path: str):
+    os.makedirs(path, exist_ok=True)
+    for name in PAYLOADS:
+        with open(os.path.join(path, name + ".json"), "w") as f:
+            json.dump(payloads[name], f, indent=1)
+
+
+class ReplayProfile(Profile):
+    """`Profile` whose follower pages are replayed from one recorded page, instead of queried."""
+
+    def __init__(self, page: dict, total: int):
+        Profile.__init__(self, None, "bench", data={"id": "1", "username": "bench", "edge_followed_by": {"count": total}})
+        self.page = page
+        self.total = total
+        self.offset = 0
+
+    def _query_next_page(self, url: str, param: dict) -> dict:
+        self.offset += len(self.page["edges"])
+        page_info = {"has_next_page": self.offset < self.total, "end_cursor": str(self.offset)}
+        return {"edge_followed_by": {"count": self.total, "page_info": page_info, "edges": self.page["edges"]}}
+
+
+def benchmarks(payloads: dict, max_posts: int) -> dict:
+    """{name: (function(size) -> function to time, maximum size)}, the setup done by `function(size)` is not timed."""
+    followers = payloads["followers_page"]["data"]["user"]["edge_followed_by"]
+    nodes = [edge["node"] for edge in payloads["timeline_page"]["data"]["user"]["edge_owner_to_timeline_media"]["edges"]]
+    posts = [post["graphql"]["shortcode_media"] for post in payloads["posts"]]
+    records = [{"username": edge["node"]["username"], "user_id": edge["node"]["id"]} for edge in followers["edges"]]
+    limit = {"before": max(node["taken_at_timestamp"] for node in nodes) + 1, "after": 0}
+
+    def items(sequence, size):
+        return list(islice(cycle(sequence), size))
+
+    def extractor(size, **kwargs):
+        batch = items(nodes, size)
+        return lambda: [shortcode_extractor(node, **kwargs) for node in batch]
+
+    def scrape_pages(size):
+        def run():
+            for _ in ReplayProfile(followers, size).fetch_followers(count=size):
+                pass
+        return run
+
+    def containers(size):
+        batch = items(posts, size)
+        return lambda: [container(post["__typename"], post) for post in batch]
+
+    def sources(size):
+        batch = [c for post in items(posts, size) for c in container(post["__typename"], post)]
+        return lambda: [c.src for c in batch]
+
+    def biggest(size):
+        batch = items([node["display_resources"] for node in nodes], size)
+        return lambda: [get_biggest_media(resources) for resources in batch]
+
+    def as_dict(size):
+        batch = items(posts, size)
+        return lambda: [Post(None, post["shortcode"], data=post).as_dict() for post in batch]
+
+    def datetimes(size):
+        batch = items([node["taken_at_timestamp"] for node in nodes], size)
+        return lambda: [to_datetime(timestamp) for timestamp in batch]
+
+    def printing(size):
+        def run():
+            with contextlib.redirect_stdout(io.StringIO()):
+                pretty_print(islice(cycle(records), size), "Followers")
+        return run
+
+    def dump(fmt):
+        def setup(size):
+            def run():
+                with tempfile.TemporaryDirectory() as path:
+                    with open_writer(os.path.join(path, "dump." + fmt), fmt) as writer:
+                        for record in islice(cycle(records), size):
+                            writer.write(record)
+            return run
+        return setup
+
+    # -> the benchmarks of posts are capped to `max_posts` items, the benchmarks of follower edges & records go up to the biggest size
+    result = {"shortcode_extractor": (extractor, max_posts),
+              "shortcode_extractor[filtered]": (lambda size: extractor(size, only="image", timestamp_limit=limit), max_posts),
+              "_scrape_pages": (scrape_pages, None), "container": (containers, max_posts), "Container.src": (sources, max_posts),
+              "get_biggest_media": (biggest, max_posts), "Post.as_dict": (as_dict, max_posts), "to_datetime": (datetimes, max_posts),
+              "pretty_print": (printing, None)}
+    result.update(("dump:" + fmt, (dump(fmt), None)) for fmt in FORMATS)
+    return result
+
+
+def measure(setup, size: int, repeat: int, max_time: float, min_run: float = 0.05) -> dict:
+    """Time the function returned by `setup(size)`, `repeat` times or less if the runs took more than `max_time` seconds in total.
+    * Like `timeit`, each run calls the function enough times to take at least `min_run` seconds (the first one also warms up).
+    """
+    run = setup(size)
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_run:
+            break
+        number *= 2 if elapsed * 2 >= min_run else 10
+    times = []
+    while len(times) < repeat and sum(times) * number < max_time:
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        times.append((time.perf_counter() - start) / number)
+    best = min(times)
+    return {"size": size, "runs": len(times), "number": number, "best_s": best, "median_s": statistics.median(times),
+            "ns_per_item": best / size * 1e9}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Print the ratio of the time per item of each benchmark to the baseline. Returns the regressions (slower than 1 + `threshold`)."""
+    previous = {(r["name"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+    for r in results["results"]:
+        old = previous.get((r["name"], r["size"]))
+        if old is None:
+            continue
+        ratio = r["ns_per_item"] / old["ns_per_item"]
+        slower = ratio > 1 + threshold
+        if slower:
+            regressions.append(r)
+        print("{0:<30} {1:>9} {2:9.1f} -> {3:9.1f} ns/item  x{4:.2f}{5}".format(
+            r["name"], r["size"], old["ns_per_item"], r["ns_per_item"], ratio, "  REGRESSION" if slower else ""))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU micro-benchmarks of the parsing & extraction hot paths of instascrape")
+    parser.add_argument("--sizes", default="50,10000,1000000", help="comma separated amounts of items (default: 50,10000,1000000)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs of each benchmark, the best is kept (default: 5)")
+    parser.add_argument("--max-time", type=float, default=5.0, help="stop repeating a benchmark after this many seconds (default: 5)")
+    parser.add_argument("--max-posts", type=int, default=100000, help="maximum size of the benchmarks of posts (default: 100000)")
+    parser.add_argument("--filter", help="only run the benchmarks whose name contains this text")
+    parser.add_argument("--payloads", metavar="DIR", help="run on the payloads saved in this directory by --record")
+    parser.add_argument("--record", metavar="DIR", help="save the payloads to this directory")
+    parser.add_argument("--output", metavar="FILE", help="write the results as JSON to this file ('-': stdout)")
+    parser.add_argument("--compare", metavar="FILE", help="compare with the results of a previous run (written by --output)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="slowdown reported as a regression by --compare (default: 0.25)")
+    args = parser.parse_args()
+
+    payloads = load_payloads(args.payloads) if args.payloads else generate_payloads()
+    if args.record:
+        record_payloads(payloads, args.record)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = {"python": sys.version.split()[0], "platform": platform.platform(), "instascrape": __version__,
+               "payloads": args.payloads or "generated", "results": []}
+    quiet = args.output == "-"
+    for name, (setup, max_size) in benchmarks(payloads, args.max_posts).items():
+        if args.filter and args.filter not in name:
+            continue
+        for size in sizes:
+            if max_size and size > max_size:
+                continue
+            try:
+                result = measure(setup, size, args.repeat, args.max_time)
+            except ImportError as e:  # -> optional dependency (pyarrow) not installed
+                if not quiet:
+                    print("{0:<30} skipped: {1}".format(name, e))
+                break
+            result["name"] = name
+            results["results"].append(result)
+            if not quiet:
+                print("{0:<30} {1:>9} {2:10.4f} s {3:10.1f} ns/item  ({4} runs)".format(name, size, result["best_s"], result["ns_per_item"], result["runs"]))
+
+    if args.output == "-":
+        print(json.dumps(results, indent=4))
+    elif args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
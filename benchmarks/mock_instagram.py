@@ -0,0 +1,420 @@
+"""Local mock of the Instagram endpoints used by instascrape, to benchmark it offline.
+
+It serves synthetic but realistically shaped (and sized) responses of every URL in `constants.py`:
+    * `USER_URL`, `POST_URL`, `HASHTAG_URL` and `USER_ID_URL` (`?__a=1` & API data)
+    * `graphql/query` pages of every `QUERY_*` hash (timeline, saved, tagged, hashtag, discover, followers, followings, likes, comments, stories, highlights)
+    * JPEG / MP4 payloads of the media under `/cdn/` (with `Range` requests)
+    * `/` with the username of the viewer (login by cookie)
+and can inject latency, HTTP 429 responses and 'rate limited' messages into the JSON / GraphQL responses.
+
+The data is generated from the names in the URLs, so any username, hashtag or shortcode exists. instascrape is pointed to the mock
+by the `INSTASCRAPE_BASE_URL` and `INSTASCRAPE_API_URL` environment variables (see constants.py), which must be set before it is imported.
+
+    $ python benchmarks/mock_instagram.py [--port 8000] [--latency 0.05] [--p429 0.01] [--rate-limited 0.01]
+
+The counters of the served requests are returned by `/__stats` (and reset by `/__reset`), see `Stats`.
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from socketserver import ThreadingMixIn
+from http.server import (HTTPServer, BaseHTTPRequestHandler)
+from urllib.parse import (urlparse, parse_qs)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from instascrape import constants  # noqa: E402  (only the query hashes are read from it)
+
+# name of each query ('QUERY_USER_MEDIA_URL' -> 'user_media') by its hash
+QUERIES = {re.search(r"query_hash=(\w+)", value).group(1): name[len("QUERY_"):-len("_URL")].lower()
+           for name, value in vars(constants).items() if name.startswith("QUERY_") and name.endswith("_URL")}
+
+BASE_TIMESTAMP = 1600000000
+VIEWER = "bench_viewer"
+
+
+def _number(text: str, digits: int = 12) -> int:
+    """Stable number derived from `text`."""
+    return int(hashlib.md5(text.encode()).hexdigest()[:digits], 16)
+
+
+def user_id(username: str) -> str:
+    return str(_number(username, 10))
+
+
+class Stats:
+    """Thread-safe counters of the served requests: by endpoint family ('user', 'post', 'hashtag', 'api', 'query:<name>', 'cdn'),
+    'cdn_bytes', 'throttled' (HTTP 429) and 'rate_limited' ('rate limited' messages)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}
+
+    def add(self, key: str, amount: int = 1):
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + amount
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.counts)
+
+    def reset(self):
+        with self._lock:
+            self.counts = {}
+
+
+class MockInstagram:
+    """Generator of the responses of the mock.
+    * The posts of a source are numbered from 0 (the latest), their shortcode is '<source>-<index>', where the source is a username,
+      't.<tag>' (hashtag), 'x' (discover), 's' (saved) or '<username>.tv' (IGTV).
+    * 1 in 5 posts is a video and 1 in 5 is a sidecar (image, image, video). The timeline pages contain everything needed to build
+      lite posts (as Instagram's do), the hashtag & discover pages do not contain the video URLs nor the children of sidecars,
+      so those posts are queried with `POST_URL`.
+
+    Arguments:
+        base: URL of the mock, prefix of the media URLs
+        posts: amount of posts of every source
+        followers: amount of followers (& followings, likes and comments) of every user / post
+        highlights: amount of highlights of every user
+        story_items: amount of items of every story & highlight
+        image_size: size of the images in bytes
+        video_size: size of the videos in bytes
+    """
+
+    def __init__(self, base: str, posts: int = 500, followers: int = 10000, highlights: int = 5, story_items: int = 5,
+                 image_size: int = 200000, video_size: int = 2000000):
+        self.base = base
+        self.posts = posts
+        self.followers = followers
+        self.highlights = highlights
+        self.story_items = story_items
+        self.sizes = {"jpg": image_size, "mp4": video_size}
+        self._payloads = {}
+        self._names = {}  # -> username by user id & highlight reel id
+
+    # -------- Media --------
+
+    def payload(self, ext: str) -> bytes:
+        """Synthetic JPEG ('jpg') or MP4 ('mp4') file of the configured size."""
+        if ext not in self._payloads:
+            size = self.sizes[ext]
+            if ext == "jpg":
+                head, tail = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00", b"\xff\xd9"
+            else:
+                head, tail = b"\x00\x00\x00\x18ftypmp42\x00\x00\x00\x00mp42isom", b""
+            body = random.Random(size).getrandbits(8 * max(0, size - len(head) - len(tail))).to_bytes(max(0, size - len(head) - len(tail)), "big")
+            self._payloads[ext] = head + body + tail
+        return self._payloads[ext]
+
+    def resources(self, name: str) -> list:
+        return [{"src": "{0}/cdn/{1}_{2}.jpg".format(self.base, name, width), "config_width": width, "config_height": width * 5 // 4}
+                for width in (640, 750, 1080)]
+
+    def media(self, name: str, typename: str, full: bool = True) -> dict:
+        node = {"__typename": typename, "id": str(_number(name, 15)), "dimensions": {"height": 1350, "width": 1080},
+                "display_url": "{0}/cdn/{1}_1080.jpg".format(self.base, name), "display_resources": self.resources(name),
+                "accessibility_caption": "Photo by {0}. Image may contain: 2 people, people standing and outdoor".format(name),
+                "is_video": typename == "GraphVideo", "tracking_token": hashlib.sha1(name.encode()).hexdigest() * 2,
+                "edge_media_to_tagged_user": {"edges": []}}
+        if typename == "GraphVideo":
+            node.update(video_duration=14.2, video_view_count=_number(name, 4), has_audio=True)
+            if full:
+                node["video_url"] = "{0}/cdn/{1}.mp4".format(self.base, name)
+        return node
+
+    # -------- Posts --------
+
+    @staticmethod
+    def kind(shortcode: str) -> str:
+        source, _, index = shortcode.rpartition("-")
+        if source.endswith(".tv"):
+            return "GraphVideo"
+        return {0: "GraphVideo", 1: "GraphSidecar"}.get(int(index) % 5, "GraphImage")
+
+    def owner(self, shortcode: str) -> str:
+        source = shortcode.rpartition("-")[0]
+        if source.endswith(".tv"):
+            return source[:-3]
+        if source == "x" or source == "s" or source.startswith("t."):
+            return "user{0}".format(_number(shortcode, 3) % 1000)
+        return source
+
+    def post(self, shortcode: str, full: bool = True) -> dict:
+        """Data of a post: its node in a page if not `full`, its `POST_URL` data otherwise."""
+        index = int(shortcode.rpartition("-")[2])
+        typename = self.kind(shortcode)
+        owner = self.owner(shortcode)
+        lite = full or not shortcode.startswith(("x-", "t."))  # -> nodes of the timelines are complete
+        node = self.media(shortcode, typename, lite)
+        node.update({"shortcode": shortcode, "taken_at_timestamp": BASE_TIMESTAMP - index * 3600, "comments_disabled": False,
+                     "owner": {"id": user_id(owner), "username": owner}, "thumbnail_src": node["display_url"],
+                     "edge_media_to_caption": {"edges": [{"node": {"text": "Post #{0} by @{1} #bench #mock ".format(index, owner) * 4}}]},
+                     "edge_media_to_comment": {"count": self.followers}, "edge_media_preview_like": {"count": index * 7},
+                     "location": None if index % 3 else {"id": str(index), "has_public_page": True, "name": "Place {0}".format(index),
+                                                         "slug": "place-{0}".format(index)}})
+        if typename == "GraphSidecar" and lite:
+            node["edge_sidecar_to_children"] = {"edges": [
+                {"node": self.media("{0}_{1}".format(shortcode, k), "GraphVideo" if k == 2 else "GraphImage")} for k in range(3)]}
+        if full:
+            node["owner"].update(full_name=owner.title(), is_verified=False, is_private=False,
+                                 profile_pic_url="{0}/cdn/{1}_pic_150.jpg".format(self.base, owner))
+            node["edge_media_to_parent_comment"] = self.users_page("c." + shortcode, self.followers, 0, 24, comments=True)
+            node["edge_media_preview_like"]["edges"] = self.users_page("l." + shortcode, 10, 0, 10)["edges"]
+            node["edge_web_media_to_related_media"] = {"edges": []}
+            node["edge_media_to_sponsor_user"] = {"edges": []}
+            node["viewer_has_liked"] = node["viewer_has_saved"] = False
+        return node
+
+    @staticmethod
+    def page_info(total: int, end: int) -> dict:
+        return {"has_next_page": end < total, "end_cursor": str(end) if end < total else None}
+
+    def posts_page(self, source: str, after, first: int, total: int = None) -> dict:
+        total = self.posts if total is None else total
+        start = int(after or 0)
+        end = min(total, start + first)
+        return {"count": total, "page_info": self.page_info(total, end),
+                "edges": [{"node": self.post("{0}-{1}".format(source, i), full=False)} for i in range(start, end)]}
+
+    def users_page(self, source: str, total: int, after, first: int, comments: bool = False) -> dict:
+        start = int(after or 0)
+        end = min(total, start + first)
+        edges = []
+        for i in range(start, end):
+            username = "{0}.{1}".format(source.partition(".")[0] if comments else "fan", i)
+            user = {"id": user_id(username), "username": username, "profile_pic_url": "{0}/cdn/{1}_pic_150.jpg".format(self.base, username)}
+            if comments:
+                edges.append({"node": {"id": str(_number(source, 8) + i), "text": "Comment {0} on {1}".format(i, source[2:]),
+                                       "created_at": BASE_TIMESTAMP + i, "owner": user, "edge_liked_by": {"count": i % 10},
+                                       "did_report_as_spam": False, "viewer_has_liked": False}})
+            else:
+                user.update(full_name=username.title(), is_verified=False, followed_by_viewer=False, requested_by_viewer=False)
+                edges.append({"node": user})
+        return {"count": total, "page_info": self.page_info(total, end), "edges": edges}
+
+    # -------- Users & reels --------
+
+    def profile(self, username: str) -> dict:
+        self._names[user_id(username)] = username
+        return {"id": user_id(username), "username": username, "full_name": username.title(), "biography": "Bio of " + username,
+                "external_url": None, "is_verified": False, "is_private": False, "is_business_account": False,
+                "profile_pic_url": "{0}/cdn/{1}_pic_150.jpg".format(self.base, username),
+                "profile_pic_url_hd": "{0}/cdn/{1}_pic_320.jpg".format(self.base, username),
+                "highlight_reel_count": self.highlights, "edge_followed_by": {"count": self.followers}, "edge_follow": {"count": self.followers},
+                "edge_mutual_followed_by": {"count": 0, "edges": []},
+                "edge_owner_to_timeline_media": self.posts_page(username, 0, 12),
+                "edge_saved_media": self.posts_page("s", 0, 12),
+                "edge_felix_video_timeline": {"count": 2, "page_info": self.page_info(2, 2), "edges": [
+                    {"node": dict(self.post("{0}.tv-{1}".format(username, i), full=False), title="IGTV {0}".format(i))} for i in range(2)]},
+                "edge_media_collections": {"count": 0, "edges": []}}
+
+    def name(self, uid: str) -> str:
+        return self._names.get(uid, "user" + uid)
+
+    def reel(self, reel_id: str, typename: str) -> dict:
+        owner = self.name(reel_id) if typename != "GraphMASReel" else reel_id
+        items = []
+        for k in range(self.story_items):
+            name = "story_{0}_{1}".format(reel_id, k)
+            item = self.media(name, "GraphStoryVideo" if k % 4 == 3 else "GraphStoryImage")
+            item.update(taken_at_timestamp=BASE_TIMESTAMP + _number(name, 4), expiring_at_timestamp=BASE_TIMESTAMP + 86400)
+            if item["__typename"] == "GraphStoryVideo":
+                item["video_resources"] = [{"src": "{0}/cdn/{1}_{2}.mp4".format(self.base, name, w), "config_width": w, "config_height": w * 16 // 9,
+                                            "profile": "BASELINE"} for w in (480, 720)]
+            items.append(item)
+        reel = {"__typename": typename, "id": reel_id, "latest_reel_media": BASE_TIMESTAMP, "seen": None, "items": items,
+                "owner": {"__typename": "GraphUser", "id": user_id(owner), "username": owner,
+                          "profile_pic_url": "{0}/cdn/{1}_pic_150.jpg".format(self.base, owner)}}
+        if typename == "GraphHighlightReel":
+            reel["id"] = "highlight:" + reel_id
+        elif typename == "GraphMASReel":
+            reel["owner"] = {"__typename": "GraphHashtag", "id": str(_number(reel_id, 10)), "name": reel_id}
+        return reel
+
+    # -------- Endpoints --------
+
+    def query(self, name: str, v: dict) -> dict:
+        """Data of a `graphql/query` response."""
+        after, first = v.get("after"), v.get("first", 12)
+        if name in ("user_media", "user_saved", "user_tagged"):
+            key = {"user_media": "edge_owner_to_timeline_media", "user_saved": "edge_saved_media", "user_tagged": "edge_user_to_photos_of_you"}[name]
+            source = {"user_media": self.name(v.get("id", "")), "user_saved": "s", "user_tagged": "t.tagged"}[name]
+            return {"user": {key: self.posts_page(source, after, first)}}
+        if name in ("followers", "followings"):
+            key = "edge_followed_by" if name == "followers" else "edge_follow"
+            return {"user": {key: self.users_page("f." + v["id"], self.followers, after, first)}}
+        if name == "hashtag":
+            return {"hashtag": {"name": v["tag_name"], "edge_hashtag_to_media": self.posts_page("t." + v["tag_name"], after, first)}}
+        if name == "discover":
+            return {"user": {"edge_web_discover_media": self.posts_page("x", after, first)}}
+        if name == "likes":
+            return {"shortcode_media": {"edge_liked_by": self.users_page("l." + v["shortcode"], self.followers, after, first)}}
+        if name == "comments":
+            return {"shortcode_media": {"edge_media_to_comment": self.users_page("c." + v["shortcode"], self.followers, after, first, comments=True)}}
+        if name == "highlights":
+            owner = self.name(v["user_id"])
+            ids = [str(_number("{0}.{1}".format(owner, k), 13)) for k in range(self.highlights)]
+            self._names.update((id, owner) for id in ids)
+            return {"user": {"edge_highlight_reels": {"edges": [
+                {"node": {"id": id, "title": "Highlight {0}".format(k), "cover_media": {
+                    "thumbnail_src": "{0}/cdn/{1}_cover_{2}.jpg".format(self.base, owner, k)}}} for k, id in enumerate(ids)]}}}
+        if name == "stories":
+            return {"reels_media": [self.reel(i, "GraphReel") for i in v.get("reel_ids", [])]
+                    + [self.reel(i, "GraphHighlightReel") for i in v.get("highlight_reel_ids", [])]
+                    + [self.reel(i, "GraphMASReel") for i in v.get("tag_names", [])]}
+        raise KeyError(name)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body: bytes, status: int = 200, content_type: str = "application/json", headers: dict = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, data: dict, status: int = 200, headers: dict = None):
+        self._send(json.dumps(data).encode(), status, headers=headers)
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        if url.path == "/__stats":
+            return self._json(server.stats.snapshot())
+        if url.path == "/__reset":
+            server.stats.reset()
+            return self._json({})
+        if url.path.startswith("/cdn/"):
+            return self._media(url.path)
+
+        family, data = self._route(url)
+        if data is None:
+            server.stats.add("not_found")
+            return self._send(b"<html>Page Not Found</html>", 404, "text/html")
+        server.stats.add(family)
+        if server.latency:
+            time.sleep(server.latency)
+        if server.random.random() < server.p429:
+            server.stats.add("throttled")
+            return self._json({"message": "Please wait a few minutes before you try again.", "status": "fail"}, 429,
+                              {"Retry-After": str(server.retry_after)})
+        if server.random.random() < server.p_rate_limited:
+            server.stats.add("rate_limited")
+            return self._json({"message": "rate limited", "status": "fail"})
+        if isinstance(data, str):
+            return self._send(data.encode(), content_type="text/html")
+        self._json(data)
+
+    def _route(self, url) -> tuple:
+        """Endpoint family and data of the response of a JSON URL ((family, None) if not found)."""
+        mock = self.server.mock
+        parts = [part for part in url.path.split("/") if part]
+        if not parts:
+            return "home", '<html><script>window._sharedData = {"config":{"viewer":{"username":"' + VIEWER + '"}}};</script></html>'
+        if parts == ["graphql", "query"]:
+            query = parse_qs(url.query)
+            name = QUERIES.get(query.get("query_hash", [""])[0])
+            if name is None:
+                return "query", None
+            return "query:" + name, {"data": mock.query(name, json.loads(query["variables"][0])), "status": "ok"}
+        if len(parts) == 2 and parts[0] == "p":
+            return "post", {"graphql": {"shortcode_media": mock.post(parts[1])}}
+        if len(parts) == 3 and parts[:2] == ["explore", "tags"]:
+            return "hashtag", {"graphql": {"hashtag": {"id": str(_number(parts[2], 10)), "name": parts[2],
+                                                       "edge_hashtag_to_media": mock.posts_page("t." + parts[2], 0, 12)}}}
+        if len(parts) == 5 and parts[:3] == ["api", "v1", "users"]:
+            return "api", {"user": {"pk": int(parts[3]), "username": mock.name(parts[3])}, "status": "ok"}
+        if len(parts) == 1 and "__a" in parse_qs(url.query):
+            return "user", {"logging_page_id": "profilePage_" + user_id(parts[0]), "graphql": {"user": mock.profile(parts[0])}}
+        return "user", None
+
+    def _media(self, path: str):
+        server = self.server
+        ext = path.rpartition(".")[2]
+        if ext not in ("jpg", "mp4"):
+            return self._send(b"", 404, "text/plain")
+        if server.cdn_latency:
+            time.sleep(server.cdn_latency)
+        body = server.mock.payload(ext)
+        content_type = "image/jpeg" if ext == "jpg" else "video/mp4"
+        match = re.match(r"bytes=(\d+)-", self.headers.get("Range", ""))
+        server.stats.add("cdn")
+        if match and int(match.group(1)) < len(body):
+            start = int(match.group(1))
+            server.stats.add("cdn_bytes", len(body) - start)
+            return self._send(body[start:], 206, content_type, {"Content-Range": "bytes {0}-{1}/{2}".format(start, len(body) - 1, len(body))})
+        server.stats.add("cdn_bytes", len(body))
+        self._send(body, content_type=content_type)
+
+
+class Server(ThreadingMixIn, HTTPServer):
+    """Threaded HTTP server of the mock.
+
+    Arguments:
+        port: port to listen on (0: any free port, see `self.url`)
+        latency: seconds added to every JSON / GraphQL response
+        cdn_latency: seconds added to every media response
+        p429: probability of responding HTTP 429 to a JSON / GraphQL request
+        p_rate_limited: probability of responding a 'rate limited' message to a JSON / GraphQL request
+        retry_after: value of the `Retry-After` header of the HTTP 429 responses
+        seed: seed of the injected errors
+        **kwargs: passed to `MockInstagram`
+    """
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, port: int = 0, latency: float = 0.0, cdn_latency: float = 0.0, p429: float = 0.0, p_rate_limited: float = 0.0,
+                 retry_after: int = 0, seed: int = 0, **kwargs):
+        HTTPServer.__init__(self, ("127.0.0.1", port), Handler)
+        self.url = "http://127.0.0.1:{0}".format(self.server_address[1])
+        self.mock = MockInstagram(self.url, **kwargs)
+        self.stats = Stats()
+        self.latency = latency
+        self.cdn_latency = cdn_latency
+        self.p429 = p429
+        self.p_rate_limited = p_rate_limited
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of Instagram for benchmarks")
+    parser.add_argument("--port", type=int, default=8000, help="port to listen on, 0 for any free port (default: 8000)")
+    parser.add_argument("--posts", type=int, default=500, help="posts of every user, hashtag etc. (default: 500)")
+    parser.add_argument("--followers", type=int, default=10000, help="followers, followings, likes & comments (default: 10000)")
+    parser.add_argument("--image-size", type=int, default=200000, help="size of the images in bytes (default: 200000)")
+    parser.add_argument("--video-size", type=int, default=2000000, help="size of the videos in bytes (default: 2000000)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every JSON response")
+    parser.add_argument("--cdn-latency", type=float, default=0.0, help="seconds added to every media response")
+    parser.add_argument("--p429", type=float, default=0.0, help="probability of a HTTP 429 response")
+    parser.add_argument("--rate-limited", type=float, default=0.0, help="probability of a 'rate limited' response")
+    parser.add_argument("--retry-after", type=int, default=0, help="Retry-After of the HTTP 429 responses in seconds (default: 0)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = Server(args.port, args.latency, args.cdn_latency, args.p429, args.rate_limited, args.retry_after, args.seed,
+                    posts=args.posts, followers=args.followers, image_size=args.image_size, video_size=args.video_size)
+    print(server.url, flush=True)  # -> read by throughput.py
+    print("export INSTASCRAPE_BASE_URL={0} INSTASCRAPE_API_URL={0}".format(server.url), file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""End-to-end throughput of the download & dump flows of `InstaScraper`, against the local mock of Instagram (see mock_instagram.py).
+
+The mock runs in this process, and each scenario runs in a new interpreter pointed to it (`INSTASCRAPE_BASE_URL` & `INSTASCRAPE_API_URL`),
+so that its peak RSS is its own. For each scenario, this prints:
+    * pages/s: GraphQL pages queried per second
+    * items/s: posts (or reels, or dumped records) per second
+    * MB/s: media downloaded per second
+    * req/item: JSON / GraphQL requests per item (retries included)
+    * 429: HTTP 429 and 'rate limited' responses injected by the mock
+    * RSS: peak resident memory of the scenario process
+
+The request rate of the `governor` is raised to `--rate` (the default `REQUEST_RATE` would only measure the rate limit), and the
+amount of posts and records of the scenarios is set by `--posts` and `--records`.
+
+    $ python benchmarks/throughput.py [--posts 200] [--records 20000] [--latency 0.02] [--p429 0.01] [--rate-limited 0.01] [--json]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from mock_instagram import (Server, VIEWER)  # noqa: E402
+
+USER = "bench_user"
+
+
+def _timeline(insta, dest: str, args) -> int:
+    insta.download_user_timeline_posts(USER, count=args.posts, dest=dest)
+    return args.posts
+
+
+def _hashtag(insta, dest: str, args) -> int:
+    insta.download_hashtag_posts("bench", count=args.posts, dest=dest)
+    return args.posts
+
+
+def _highlights(insta, dest: str, args) -> int:
+    highlights = insta.get_user_highlights(USER, preload=True)
+    insta.download_user_highlights(USER, dest=dest)
+    return len(highlights)
+
+
+def _stories(insta, dest: str, args) -> int:
+    names = ["{0}{1}".format(USER, i) for i in range(max(1, args.posts // 10))]
+    insta.download_users_stories(names, dest=dest)
+    return len(names)
+
+
+def _dump(method, target: str):
+    def scenario(insta, dest: str, args) -> int:
+        from instascrape.export import open_writer
+        kwargs = {"convert": False} if method != "get_post_comments" else {}
+        with open_writer(os.path.join(dest, "dump.ndjson")) as writer:
+            for item in getattr(insta, method)(target, count=args.records, **kwargs):
+                writer.write(item)
+        return writer.count
+    return scenario
+
+
+# name: (function, description)
+SCENARIOS = {
+    "timeline": (_timeline, "download timeline posts (lite posts built from the pages)"),
+    "hashtag": (_hashtag, "download hashtag posts (each post queried)"),
+    "highlights": (_highlights, "download story highlights"),
+    "stories": (_stories, "download stories of many users (batched reels queries)"),
+    "followers": (_dump("get_user_followers", USER), "dump followers to NDJSON"),
+    "comments": (_dump("get_post_comments", USER + "-1"), "dump comments of a post to NDJSON"),
+}
+
+
+def child(args):
+    """Run a scenario (in the scenario process), and print its results as JSON."""
+    import resource
+    from instascrape import InstaScraper
+    from instascrape.governor import governor
+
+    governor.rate = args.rate
+    insta = InstaScraper(username=VIEWER, cookie={"csrftoken": "benchmark", "ds_user_id": "1"}, save_cookie=False, logout=False,
+                         level=40, cache_ttl=0)
+    insta.login()
+    dest = tempfile.mkdtemp()
+    start = time.perf_counter()
+    items = SCENARIOS[args.child][0](insta, dest, args)
+    wall = time.perf_counter() - start
+    files = sum(len(names) for _, _, names in os.walk(dest))
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mb = rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024  # -> bytes on macOS, kilobytes on Linux
+    print(json.dumps({"wall_s": wall, "items": items, "files": files, "peak_rss_mb": rss_mb}))
+
+
+def run(name: str, server: Server, args) -> dict:
+    """Run a scenario in a new interpreter, and compute its results from its own and the counters of the mock."""
+    env = dict(os.environ, INSTASCRAPE_BASE_URL=server.url, INSTASCRAPE_API_URL=server.url, HOME=tempfile.mkdtemp(),
+               PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    command = [sys.executable, os.path.abspath(__file__), "--child", name, "--posts", str(args.posts), "--records", str(args.records),
+               "--rate", str(args.rate)]
+    server.stats.reset()
+    out = subprocess.run(command, env=env, stdout=subprocess.PIPE, check=True).stdout.decode()
+    result = json.loads(out.strip().splitlines()[-1])
+    stats = server.stats.snapshot()
+    wall = result["wall_s"]
+    requests = sum(n for key, n in stats.items() if key not in ("home", "cdn", "cdn_bytes", "throttled", "rate_limited", "not_found"))
+    pages = sum(n for key, n in stats.items() if key.startswith("query:"))
+    result.update(pages=pages, requests=requests, media_mb=stats.get("cdn_bytes", 0) / 1e6, media_files=stats.get("cdn", 0),
+                  throttled=stats.get("throttled", 0) + stats.get("rate_limited", 0), not_found=stats.get("not_found", 0),
+                  pages_per_s=pages / wall, items_per_s=result["items"] / wall, media_mb_per_s=stats.get("cdn_bytes", 0) / 1e6 / wall,
+                  requests_per_item=requests / max(1, result["items"]))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end throughput of instascrape against a local mock of Instagram")
+    parser.add_argument("scenarios", nargs="*", metavar="SCENARIO", help="scenarios to run (default: all): " + "; ".join(
+        "{0}: {1}".format(name, description) for name, (_, description) in SCENARIOS.items()))
+    parser.add_argument("--posts", type=int, default=200, help="posts downloaded by the download scenarios (default: 200)")
+    parser.add_argument("--records", type=int, default=20000, help="records dumped by the dump scenarios (default: 20000)")
+    parser.add_argument("--rate", type=float, default=1000.0, help="request rate of the governor per endpoint family (default: 1000)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every JSON response by the mock")
+    parser.add_argument("--cdn-latency", type=float, default=0.0, help="seconds added to every media response by the mock")
+    parser.add_argument("--p429", type=float, default=0.0, help="probability of a HTTP 429 response")
+    parser.add_argument("--rate-limited", type=float, default=0.0, help="probability of a 'rate limited' response")
+    parser.add_argument("--image-size", type=int, default=200000, help="size of the images in bytes (default: 200000)")
+    parser.add_argument("--video-size", type=int, default=2000000, help="size of the videos in bytes (default: 2000000)")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args)
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error("unknown scenario: '{0}'".format(name))
+
+    server = Server(0, args.latency, args.cdn_latency, args.p429, args.rate_limited, posts=max(args.posts, 50),
+                    followers=max(args.records, 50), image_size=args.image_size, video_size=args.video_size)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    results = {}
+    try:
+        for name in args.scenarios or SCENARIOS:
+            results[name] = run(name, server, args)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    if args.json:
+        print(json.dumps({"python": sys.version.split()[0], "posts": args.posts, "records": args.records, "rate": args.rate,
+                          "latency": args.latency, "p429": args.p429, "rate_limited": args.rate_limited, "results": results}, indent=4))
+        return
+    print("Python {0}, {1} posts, {2} records, latency {3}s, 429 {4:.0%}, rate limited {5:.0%}".format(
+        sys.version.split()[0], args.posts, args.records, args.latency, args.p429, args.rate_limited))
+    print("{0:<11} {1:>8} {2:>9} {3:>9} {4:>8} {5:>9} {6:>6} {7:>8}".format("scenario", "wall s", "pages/s", "items/s", "MB/s", "req/item", "429", "RSS MB"))
+    for name, r in results.items():
+        print("{0:<11} {1:8.2f} {2:9.1f} {3:9.1f} {4:8.1f} {5:9.2f} {6:6d} {7:8.1f}".format(
+            name, r["wall_s"], r["pages_per_s"], r["items_per_s"], r["media_mb_per_s"], r["requests_per_item"], r["throttled"], r["peak_rss_mb"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,16 +8,40 @@ if sys.version_info[0] < 3 or sys.version_info[1] < 6:
 import os
 DIR_PATH = os.path.join(os.path.expanduser("~"), ".instascrape/")
 ACCOUNT_DIR = os.path.join(DIR_PATH, "accounts/")
-if not os.path.isdir(DIR_PATH):
-    os.mkdir(DIR_PATH)
-if not os.path.isdir(ACCOUNT_DIR):
-    os.mkdir(ACCOUNT_DIR)
+
+
+def make_dirs():
+    """Create `DIR_PATH` and `ACCOUNT_DIR` if they do not exist. Called before writing files in them, rather than when importing the package."""
+    if not os.path.isdir(ACCOUNT_DIR):
+        os.makedirs(ACCOUNT_DIR)
+
 
 # Import API
-from instascrape.instascraper import InstaScraper
-from instascrape.structures import *
 from instascrape.exceptions import *
 
+# * The API is imported when it is first accessed, so that importing `instascrape` (e.g. by the command line) does not import requests, aiohttp etc.
+_LAZY = {"InstaScraper": "instascrape.instascraper", "AsyncInstaScraper": "instascrape.aio"}
+_LAZY.update((name, "instascrape.structures") for name in ("BaseStructure", "Profile", "Hashtag", "Explore", "Post", "IGTV", "Story", "Highlight"))
+__all__ = ["DIR_PATH", "ACCOUNT_DIR"] + [name for name in dir(exceptions) if not name.startswith("_")] + list(_LAZY)
+
+if sys.version_info >= (3, 7):
+    import importlib
+
+    def __getattr__(name):
+        if name not in _LAZY:
+            raise AttributeError("module 'instascrape' has no attribute '{0}'".format(name))
+        value = getattr(importlib.import_module(_LAZY[name]), name)
+        globals()[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(globals()) | set(_LAZY))
+else:
+    # module `__getattr__` (PEP 562) requires Python 3.7
+    from instascrape.instascraper import InstaScraper
+    from instascrape.aio import AsyncInstaScraper
+    from instascrape.structures import *
+
 # Init colors
 from colorama import init
 init(autoreset=True)
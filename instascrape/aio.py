@@ -0,0 +1,575 @@
+import os
+import json
+import asyncio
+import logging
+from collections import deque
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None  # optional dependency, see `AsyncInstaScraper`
+
+from instascrape.constants import *
+from instascrape.exceptions import *
+from instascrape.structures import (Profile, Post, Story, Highlight, node_extractor, lite_node,
+                                    raise_for_message, reels_query_url, extract_reels, split_reels, highlights_query_url, extract_highlights)
+from instascrape.governor import (governor, endpoint_family)
+from instascrape.cache import cache
+from instascrape.manifest import (Manifest, src_id)
+from instascrape.download import (_plan_structure, _open_manifest, _metadata_sink, _find_part, _media_ext, _content_range, _StalePart, NOTHING)
+from instascrape.utils import (to_datetime, chunks, load_user_ids, dump_user_ids)
+
+__all__ = ("AsyncInstaScraper",)
+logger = logging.getLogger("instascrape")
+
+
+class AsyncInstaScraper:
+    """Asyncio-native counterpart of `InstaScraper`. All requests (JSON & media) are sent by `aiohttp` on the running event loop,
+    so that a large amount of targets can be scraped and downloaded concurrently by a single process (e.g. with `asyncio.gather()`).
+    * Requires the optional dependency `aiohttp` (`pip install instascrape-ax[async]`).
+    * Does not log in by itself, provide the cookie of a logged in session instead (see `from_scraper()`).
+    * Requests go through the same `governor` as `InstaScraper` (see governor.py), so the rate limits are shared, as well as the `cache` of profiles and posts (see cache.py).
+    * The structures returned are the ones in structures.py, built from the data fetched here. They are not bound to a session,
+      so their methods which send requests (e.g. `Post.fetch_likes()`) cannot be used, use the methods of this class instead.
+
+    Arguments:
+        cookie: cookie data of a logged in session
+        user_agent: user provided user_agent
+        limit: maximum number of connections opened at the same time, for JSON requests and media downloads respectively
+    """
+
+    def __init__(self, cookie: dict = None, user_agent: str = None, limit: int = 100):
+        if aiohttp is None:
+            raise ImportError("AsyncInstaScraper requires 'aiohttp'. Install it with `pip install instascrape-ax[async]`.")
+        self._cookie = cookie or {}
+        self._user_agent = user_agent or UA
+        self._limit = limit
+        self._session = None
+        self._media_session = None
+
+    def __repr__(self):
+        return "<AsyncInstaScraper limit={0}>".format(self._limit)
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+        return False
+
+    @classmethod
+    def from_scraper(cls, insta, limit: int = 100):
+        """Build an `AsyncInstaScraper` with the cookie and user agent of a logged in `InstaScraper`."""
+        return cls(cookie=insta._session.cookies.get_dict(), user_agent=insta._session.headers.get("User-Agent"), limit=limit)
+
+    async def open(self):
+        """Open the HTTP sessions. Must be called inside the event loop, which the scraper is used in."""
+        headers = {"Accept-Language": "en-US,en;q=0.8", "Origin": "https://www.instagram.com", "Referer": "https://www.instagram.com/",
+                   "User-Agent": self._user_agent, "X-Instagram-AJAX": "1", "X-Requested-With": "XMLHttpRequest"}
+        if "csrftoken" in self._cookie:
+            headers["X-CSRFToken"] = self._cookie["csrftoken"]
+        self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self._limit), headers=headers, cookies=self._cookie)
+        # the cookie is not sent to the CDN hosts
+        self._media_session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self._limit), headers={"User-Agent": UA})
+
+    async def close(self):
+        for session in (self._session, self._media_session):
+            if session is not None:
+                await session.close()
+        self._session = self._media_session = None
+
+    # ---------------Requests----------------
+
+    async def _get_json(self, url: str) -> dict:
+        """Asynchronous version of `Governor.get_json()`."""
+        bucket = governor.bucket(endpoint_family(url))
+        for attempt in range(governor.retries + 1):
+            await asyncio.sleep(bucket.reserve())
+            try:
+                async with self._session.get(url) as resp:
+                    limited = resp.status == 429
+                    if not limited:
+                        try:
+                            data = await resp.json(content_type=None)
+                        except ValueError:
+                            raise ExtractError("response is not json")
+                        limited = isinstance(data, dict) and data.get("message") == "rate limited"
+                    headers = resp.headers
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                raise ConnectionError(url)
+            if not limited:
+                bucket.success()
+                return data
+
+            if attempt == governor.retries:
+                break
+            delay = governor.backoff_delay(headers, attempt)
+            bucket.throttle(delay)
+            logger.warning("Rate limited by Instagram, retrying in %.1fs (%s/%s)...", delay, attempt + 1, governor.retries)
+        raise RateLimitedError()
+
+    async def _query_next_page(self, url: str, param: dict, root: str) -> dict:
+        """Asynchronous version of `BaseStructure._query_next_page()`, `root` is the key of the node data (e.g. 'user')."""
+        initial_data = await self._get_json(url + json.dumps(param))
+        logger.debug("getting next page (param: %s)", param)
+        data = initial_data.get("data") or initial_data.get("graphql") or initial_data
+        if root not in data:
+            raise_for_message(data)
+        if not data[root]:
+            raise ExtractError("no data")
+        return data[root]
+
+    async def scrape_pages(self, extractor, url: str, param: dict, root: str, key: str, count: int = 50, initial: dict = None,
+                           cursor: str = None, on_page=None, **kwargs):
+        """Asynchronous generator version of `BaseStructure._scrape_pages()`, which yields the extracted items only.
+
+        Arguments:
+            extractor: behaviour function to extract data from node data
+            url: one of the URLs in constants.py
+            param: `variables`, added to URL
+            root: key of the node data in the response (e.g. 'user', 'hashtag')
+            key: key to extract edges data from node data
+            count: the maximum count of items you want to fetch
+            initial: already fetched edges data of page-0, query page-1 first if not provided
+            cursor: start from the page after this cursor (the 'cursor' of a checkpoint state) instead, `initial` is ignored
+            on_page: callback called with the checkpoint state (see `BaseStructure._scrape_pages()`) after each page
+
+        Keyword Arguments (**kwargs):
+            - All Keyword Arguments will be passed to `extractor` function
+        """
+        only = kwargs.get("only")
+        if only:
+            assert only in ("image", "video", "sidecar"), "Invalid 'only' argument: '{0}'. Should be one of 'image', 'video', 'sidecar'.".format(only)
+        param = dict(param)
+        if not param.get("first"):
+            param["first"] = 50 if count >= 50 or only else count
+
+        if cursor:
+            param["after"] = cursor
+            initial = None
+        data = initial if initial is not None else (await self._query_next_page(url, param, root))[key]
+        results = 0
+        page_i = 0
+        while data["edges"]:
+            for edge in data["edges"]:
+                item = extractor(edge["node"], **kwargs)
+                if item is False:
+                    return
+                if item:
+                    results += 1
+                    yield item
+                if results >= count:
+                    return
+            if on_page:
+                on_page({"cursor": data["page_info"].get("end_cursor"), "has_next_page": data["page_info"]["has_next_page"],
+                         "page": page_i, "count": results})
+            if not data["page_info"]["has_next_page"]:
+                return
+            page_i += 1
+            param["first"] = 50
+            param["after"] = data["page_info"]["end_cursor"]
+            data = (await self._query_next_page(url, param, root))[key]
+
+    # ---------------Structures----------------
+
+    async def get_profile(self, name: str) -> Profile:
+        """Get a Profile object by a user's username."""
+        assert name, "Empty arguments"
+        logger.info("Getting @%s's profile data...", name)
+        data = cache.get("user", name)
+        if data is None:
+            try:
+                resp = await self._get_json(USER_URL.format(username=name))
+            except ExtractError:
+                raise UserNotFound(name)
+            data = resp["graphql"]["user"]
+            cache.put_profile(data)
+        return Profile(None, name, data=data)
+
+    async def _get_post(self, shortcode: str) -> Post:
+        data = cache.get("post", shortcode)
+        if data is None:
+            try:
+                resp = await self._get_json(POST_URL.format(shortcode=shortcode))
+            except ExtractError:
+                raise PostNotFound(shortcode)
+            data = resp["graphql"]["shortcode_media"]
+            cache.put("post", shortcode, data)
+        return Post(None, shortcode, data=data)
+
+    async def get_post(self, shortcode: str) -> Post:
+        """Get a Post object by a post's shortcode."""
+        assert shortcode, "Empty arguments"
+        logger.info("Getting :%s post data...", shortcode)
+        return await self._get_post(shortcode)
+
+    async def _get_reel(self, user_id: str = None, tag: str = None, reel_id: str = None) -> dict:
+        url = reels_query_url([user_id] if user_id else [], [tag] if tag else [], [reel_id] if reel_id else [])
+        data = extract_reels(await self._get_json(url))
+        if not data:
+            raise StoryNotFound(user_id or tag or reel_id)
+        return data[0]
+
+    async def _reels(self, reel_ids: list = (), highlight_reel_ids: list = (), chunk_size: int = REELS_CHUNK) -> dict:
+        """Get the reels data of the stories of users (`reel_ids`) and highlight reels, which are queried concurrently in chunks of `chunk_size` ids per request.
+        The ids of the chunks whose data cannot be extracted are queried again one at a time, errors are logged and the ids which still failed
+        are left out, as well as the ids with no reel found. Other errors (e.g. rate limited, connection errors) are raised.
+
+        Returns:
+            dict: {<id>: <reel data>}
+        """
+        async def query(key: str, ids: list) -> dict:
+            try:
+                return split_reels(extract_reels(await self._get_json(reels_query_url(**{key: ids}))))
+            except ExtractError as e:
+                if len(ids) == 1:
+                    logger.error("Reel (%s): %s", ids[0], e)
+                    return {}
+                logger.warning("Failed to get %s reels (%s), retrying one at a time...", len(ids), e)
+                return dict(item for reels in await asyncio.gather(*(query(key, [id]) for id in ids)) for item in reels.items())
+
+        queries = [query("reel_ids", chunk) for chunk in chunks(reel_ids, chunk_size)]
+        queries += [query("highlight_reel_ids", chunk) for chunk in chunks(highlight_reel_ids, chunk_size)]
+        results = {}
+        for reels in await asyncio.gather(*queries):
+            results.update(reels)
+        return results
+
+    async def get_user_stories(self, user_ids: list, chunk_size: int = REELS_CHUNK) -> list:
+        """Get the Story objects of many users at once, `chunk_size` users per request.
+
+        Returns:
+            list: `Story` instances, users without stories are left out
+        """
+        logger.info("Getting story data of %s users...", len(user_ids))
+        reels = await self._reels(reel_ids=user_ids, chunk_size=chunk_size)
+        return [Story(None, user_id=user_id, data=reels[user_id]) for user_id in user_ids if user_id in reels]
+
+    async def get_user_ids(self, names: list) -> dict:
+        """Get the user ids of users by their usernames, through the same cache as `InstaScraper.get_user_ids()`.
+        The usernames missing from the cache are looked up concurrently.
+
+        Returns:
+            dict: {<username>: <user id>}, the users not found are left out
+        """
+        ids = load_user_ids()
+        missing = [name for name in names if name not in ids]
+        if missing:
+            logger.info("Looking up user ids of %s users (%s cached)...", len(missing), len(names) - len(missing))
+            found = {}
+            for name, profile in zip(missing, await asyncio.gather(*(self.get_profile(name) for name in missing), return_exceptions=True)):
+                if isinstance(profile, Exception):
+                    logger.error("Profile (%s): %s", name, profile)
+                    continue
+                found[name] = profile.user_id
+            dump_user_ids(found)
+            ids.update(found)
+        return dict((name, ids[name]) for name in names if name in ids)
+
+    async def get_user_story(self, name: str) -> Story:
+        """Get a user's Story object by username."""
+        assert name, "Empty arguments"
+        user_id = (await self.get_profile(name)).user_id
+        logger.info("Getting @%s's story data...", name)
+        return Story(None, user_id=user_id, data=await self._get_reel(user_id=user_id))
+
+    async def get_hashtag_story(self, tag: str) -> Story:
+        """Get a hashtag's Story object by hashtag name."""
+        assert tag, "Empty arguments"
+        logger.info("Getting #%s story data...", tag)
+        return Story(None, tag=tag, data=await self._get_reel(tag=tag))
+
+    async def get_user_highlights(self, name: str, chunk_size: int = REELS_CHUNK) -> list:
+        """Get a user's story highlights, which are queried concurrently in chunks of `chunk_size` highlights per request.
+
+        Returns:
+            list: `Highlight` instances (the ones failed to fetch are left out)
+        """
+        assert name, "Empty arguments"
+        logger.info("Fetching @%s's story highlights...", name)
+        user = await self.get_profile(name)
+        highlights = extract_highlights(await self._get_json(highlights_query_url(user.user_id)))
+        if not highlights:
+            logger.error("No story highlights found for @%s.", name)
+            return []
+        reels = await self._reels(highlight_reel_ids=[reel_id for _, reel_id in highlights], chunk_size=chunk_size)
+        return [Highlight(None, title, reel_id, data=reels[reel_id]) for title, reel_id in highlights if reel_id in reels]
+
+    async def _post(self, shortcode: str, node: dict = None, full: bool = False) -> Post or None:
+        """Build a lite `Post` from `node` if it has enough information and `full` is False, get the full data of the post otherwise.
+        * A lite post has no session to fetch its full data with, so only the fields guaranteed by `lite_node()` can be accessed.
+        Errors are logged and None is returned.
+        """
+        if node and not full and lite_node(node):
+            return Post(None, shortcode, node=node)
+        try:
+            return await self._get_post(shortcode)
+        except InstaScrapeError as e:
+            logger.error("Failed to get post :%s: %s", shortcode, e)
+            return None
+
+    async def _posts(self, nodes, full: bool = True):
+        """Asynchronous generator, which yields `Post` instances of the (shortcode, node data) yielded by `nodes` in order.
+        * The data of at most `PREFETCH` upcoming posts are fetched concurrently.
+        """
+        pending = deque()
+        try:
+            async for shortcode, node in nodes:
+                pending.append(asyncio.ensure_future(self._post(shortcode, node, full)))
+                if len(pending) >= PREFETCH:
+                    post = await pending.popleft()
+                    if post:
+                        yield post
+            while pending:
+                post = await pending.popleft()
+                if post:
+                    yield post
+        finally:
+            for task in pending:
+                task.cancel()
+            await nodes.aclose()
+
+    async def _timeline_nodes(self, name: str, count: int = 50, only: str = None, timestamp_limit: dict = None):
+        user = await self.get_profile(name)
+        return self.scrape_pages(node_extractor, QUERY_USER_MEDIA_URL, {"id": user.user_id}, "user", "edge_owner_to_timeline_media", count,
+                                 initial=user.data["edge_owner_to_timeline_media"], only=only, timestamp_limit=timestamp_limit)
+
+    async def _tagged_nodes(self, name: str, count: int = 50, only: str = None, timestamp_limit: dict = None):
+        user = await self.get_profile(name)
+        return self.scrape_pages(node_extractor, QUERY_USER_TAGGED_URL, {"id": user.user_id}, "user", "edge_user_to_photos_of_you", count,
+                                 only=only, timestamp_limit=timestamp_limit)
+
+    async def _hashtag_nodes(self, tag: str, count: int = 50, only: str = None, timestamp_limit: dict = None):
+        return self.scrape_pages(node_extractor, QUERY_HASHTAG_URL, {"tag_name": tag}, "hashtag", "edge_hashtag_to_media", count,
+                                 only=only, timestamp_limit=timestamp_limit)
+
+    async def get_user_timeline_posts(self, name: str, count: int = 50, only: str = None, timestamp_limit: dict = None):
+        """Asynchronous generator, which yields a user's timeline posts in the form of `Post` objects.
+
+        Arguments:
+            name: the user's username
+            count: maximum limit of posts you want to get
+            only: only this type of posts will be yielded [image, video, sidecar]
+            timestamp_limit: only get posts created between these timestamps, {"before": <before timestamp>, "after", <after_timestamp>}
+        """
+        assert name, "Empty arguments"
+        logger.info("Fetching @%s's timeline posts...", name)
+        async for post in self._posts(await self._timeline_nodes(name, count, only, timestamp_limit)):
+            yield post
+
+    async def get_user_tagged_posts(self, name: str, count: int = 50, only: str = None, timestamp_limit: dict = None):
+        """Asynchronous generator, which yields posts that tagged a user in the form of `Post` objects (see `get_user_timeline_posts()`)."""
+        assert name, "Empty arguments"
+        logger.info("Fetching @%s's tagged posts...", name)
+        async for post in self._posts(await self._tagged_nodes(name, count, only, timestamp_limit)):
+            yield post
+
+    async def get_hashtag_posts(self, tag: str, count: int = 50, only: str = None, timestamp_limit: dict = None):
+        """Asynchronous generator, which yields posts of a hashtag in the form of `Post` objects (see `get_user_timeline_posts()`)."""
+        assert tag, "Empty arguments"
+        logger.info("Fetching #%s posts...", tag)
+        async for post in self._posts(await self._hashtag_nodes(tag, count, only, timestamp_limit)):
+            yield post
+
+    async def get_user_followers(self, name: str, count: int = 50):
+        """Asynchronous generator, which yields a user's followers in the form of {"username": <username>, "user_id": <user id>}."""
+        assert name, "Empty arguments"
+        user = await self.get_profile(name)
+        async for item in self.scrape_pages(lambda node: {"username": node["username"], "user_id": node["id"]}, QUERY_FOLLOWERS_URL,
+                                            {"id": user.user_id}, "user", "edge_followed_by", count):
+            yield item
+
+    async def get_user_followings(self, name: str, count: int = 50):
+        """Asynchronous generator, which yields a user's followings in the form of {"username": <username>, "user_id": <user id>}."""
+        assert name, "Empty arguments"
+        user = await self.get_profile(name)
+        async for item in self.scrape_pages(lambda node: {"username": node["username"], "user_id": node["id"]}, QUERY_FOLLOWINGS_URL,
+                                            {"id": user.user_id}, "user", "edge_follow", count):
+            yield item
+
+    # ---------------Download----------------
+
+    async def _down_from_src(self, src: str, filename: str, path: str) -> str or None:
+        """Asynchronous version of `download._down_from_src()`, streams the media to disk and resumes from `.part` files the same way."""
+        part_ext, offset = _find_part(path, filename)
+        f = None
+        try:
+            headers = {"Range": "bytes={0}-".format(offset)} if offset else {}
+            async with self._media_session.get(src, headers=headers) as r:
+                if offset and r.status == 416:
+                    total = _content_range(r.headers.get("Content-Range", ""))[1]
+                    if total.isdigit() and int(total) == offset:
+                        logger.debug("=> [%s] already completed", filename + part_ext)
+                        os.rename(os.path.join(path, filename + part_ext + ".part"), os.path.join(path, filename + part_ext))
+                        return path
+                    raise _StalePart("range not satisfiable (size: {0}, partial file: {1})".format(total or "?", offset))
+                r.raise_for_status()
+
+                mime = r.headers["Content-Type"]
+                size = int(r.headers["Content-Length"])
+                ext = _media_ext(mime)
+                finish_filename = filename + ext
+                part_filename = filename + ext + ".part"
+
+                if offset and r.status == 206:
+                    content_range = r.headers.get("Content-Range", "")
+                    start, total = _content_range(content_range)
+                    if part_ext != ext or not start.isdigit() or int(start) != offset:
+                        raise _StalePart("unexpected {0} content from '{1}' (partial file: {2}{3})".format(mime, content_range, offset, part_ext))
+                    total = int(total) if total.isdigit() else offset + size
+                    mode = "ab"
+                else:
+                    if part_ext:
+                        os.remove(os.path.join(path, filename + part_ext + ".part"))
+                    offset = 0
+                    total = size
+                    mode = "wb"
+
+                logger.debug("=> [%s] %s (%s kB)%s", finish_filename, mime, int(total / 1000), " resumed from %s kB" % int(offset / 1000) if offset else "")
+                f = open(os.path.join(path, part_filename), mode)
+                async for chunk in r.content.iter_chunked(1024 * 64):
+                    f.write(chunk)
+                f.close()
+
+            received = os.path.getsize(os.path.join(path, part_filename))
+            if received != total:
+                raise DownloadError("Incomplete content: received {0} of {1} bytes.".format(received, total))
+        except asyncio.CancelledError:
+            raise
+        except _StalePart as e:
+            logger.debug("=> [%s] %s, downloading it again", filename + part_ext, e)
+            os.remove(os.path.join(path, filename + part_ext + ".part"))
+            return await self._down_from_src(src, filename, path)
+        except Exception as e:
+            logger.error("Download Error (src: '%s'): %s", src, e)
+            return None
+        finally:
+            if f:
+                f.close()
+
+        os.rename(os.path.join(path, part_filename), os.path.join(path, finish_filename))
+        return path
+
+    async def _down_structure(self, structure, dest: str = None, directory: str = None, subdir: str = None, force_subdir: bool = False,
+                              manifest: Manifest = None) -> (str, tuple):
+        """Asynchronous version of `download._down_structure()`, all media of the structure are downloaded concurrently."""
+        return_path, path, items = _plan_structure(structure, dest, directory, subdir, force_subdir)
+        own_manifest = manifest is None
+        if own_manifest:
+            manifest = Manifest(return_path)
+        shortcode = getattr(structure, "shortcode", None)  # -> None for Story and Highlight
+
+        async def down(i, c, filename, name):
+            if await self._down_from_src(c.src, filename, path):
+                manifest.add(name, shortcode, i, src_id(c.src))
+                return True
+            return False
+
+        try:
+            tasks = [item for item in items if not (item[3] in manifest or src_id(item[1].src) in manifest.srcs)]
+            logger.debug("Downloading %s (%s media, %s exist) [%s]...", subdir or directory, len(items), len(items) - len(tasks), structure.typename)
+            results = await asyncio.gather(*(down(*item) for item in tasks))
+        finally:
+            if own_manifest:
+                manifest.close()
+        return return_path, (results.count(True), len(items) - len(tasks))
+
+    async def _down_posts(self, posts, dest: str = None, directory: str = None, dump_metadata: bool or str = False, stop_at_archived: bool = False) -> str or None:
+        """Asynchronous version of `download._down_posts()`, `posts` is an asynchronous iterable of `Post` instances."""
+        path = NOTHING
+        downs = exists = 0
+        with _open_manifest(dest, directory) as manifest, _metadata_sink(dump_metadata, manifest.path) as sink:
+            async for p in posts:
+                subdir = to_datetime(p.created_time) + "_" + p.shortcode
+                path, (d, e) = await self._down_structure(p, dest, directory, subdir, manifest=manifest)
+                if sink:
+                    sink.add(p)
+                elif dump_metadata:
+                    with open(os.path.join(path, subdir + ".json"), "w+") as f:
+                        json.dump(p.as_dict(), f, indent=4)
+                downs += d
+                exists += e
+                if stop_at_archived and not d and e == p.media_count:
+                    logger.info("Reached already downloaded post :%s, stopped.", p.shortcode)
+                    break
+            if hasattr(posts, "aclose"):
+                await posts.aclose()
+        logger.info("[%s] %s total = %s downloads + %s exists", directory, downs + exists, downs, exists)
+        return path
+
+    async def download_post(self, shortcode: str, dest: str = None, dump_metadata: bool or str = False) -> str:
+        p = await self.get_post(shortcode)
+        json_metadata = dump_metadata and dump_metadata != "parquet"
+        path, _ = await self._down_structure(p, dest, subdir=p.shortcode, force_subdir=json_metadata)
+        if dump_metadata == "parquet":
+            with _metadata_sink(dump_metadata, path) as sink:
+                sink.add(p)
+        elif json_metadata:
+            with open(os.path.join(path, p.shortcode, p.shortcode + ".json"), "w+") as f:
+                json.dump(p.as_dict(), f, indent=4)
+        return path
+
+    async def download_user_story(self, name: str, dest: str = None) -> str:
+        story = await self.get_user_story(name)
+        path, _ = await self._down_structure(story, dest, directory="@" + story.owner_name + "(story)")
+        return path
+
+    async def download_users_stories(self, names: list, dest: str = None, chunk_size: int = REELS_CHUNK) -> str or None:
+        """Download the stories of many users (see `InstaScraper.download_users_stories()`), all stories are downloaded concurrently."""
+        user_ids = await self.get_user_ids(names)
+        stories = await self.get_user_stories(list(dict.fromkeys(user_ids.values())), chunk_size) if user_ids else []
+        if not stories:
+            return NOTHING
+        results = await asyncio.gather(*(self._down_structure(story, dest, "@" + story.owner_name + "(story)") for story in stories))
+        downs = sum(d for _, (d, _) in results)
+        exists = sum(e for _, (_, e) in results)
+        logger.info("[%s stories] %s total = %s downloads + %s exists", len(stories), downs + exists, downs, exists)
+        return os.path.abspath(dest or "./")
+
+    async def download_hashtag_story(self, tag: str, dest: str = None) -> str:
+        story = await self.get_hashtag_story(tag)
+        path, _ = await self._down_structure(story, dest, directory="#" + story.owner_name + "(story)")
+        return path
+
+    async def download_user_highlights(self, name: str, dest: str = None) -> str or None:
+        highlights = await self.get_user_highlights(name)
+        if not highlights:
+            return NOTHING
+        directory = "@" + name + "(highlights)"
+        with _open_manifest(dest, directory) as manifest:
+            results = await asyncio.gather(*(self._down_structure(highlight, dest, directory, highlight.title.replace("/", "-"), force_subdir=True, manifest=manifest)
+                                             for highlight in highlights))
+        return results[0][0]
+
+    async def download_user_timeline_posts(self, name: str, count: int = 50, only: str = None, dest: str = None, timestamp_limit: dict = None,
+                                           dump_metadata: bool or str = False, stop_at_archived: bool = False) -> str or None:
+        """Download a user's timeline posts.
+        * Posts are built from the pagination data without querying them again, unless their metadata is dumped.
+
+        Arguments:
+            name: the user's username
+            count: maximum limit of posts you want to download
+            only: only this type of posts will be downloaded [image, video, sidecar]
+            dest: path to the destination of the download files
+            timestamp_limit: only get posts created between these timestamps, {"before": <before timestamp>, "after", <after_timestamp>}
+            dump_metadata: dump metadata of each post to a JSON file if True or 'json', to the Parquet files of the destination if 'parquet' (see `MetadataSink`)
+            stop_at_archived: stop when reaching a post whose media have all been downloaded to `dest` before
+
+        Returns:
+            path: full path to the download destination, or `NOTHING` ('') if there was nothing to download
+        """
+        posts = self._posts(await self._timeline_nodes(name, count, only, timestamp_limit), full=dump_metadata)
+        return await self._down_posts(posts, dest, "@" + name, dump_metadata, stop_at_archived)
+
+    async def download_user_tagged_posts(self, name: str, count: int = 50, only: str = None, dest: str = None, timestamp_limit: dict = None,
+                                         dump_metadata: bool or str = False, stop_at_archived: bool = False) -> str or None:
+        """Download posts that tagged a user (see `download_user_timeline_posts()`)."""
+        posts = self._posts(await self._tagged_nodes(name, count, only, timestamp_limit), full=dump_metadata)
+        return await self._down_posts(posts, dest, "@" + name + "(tagged)", dump_metadata, stop_at_archived)
+
+    async def download_hashtag_posts(self, tag: str, count: int = 50, only: str = None, dest: str = None, timestamp_limit: dict = None,
+                                     dump_metadata: bool or str = False, stop_at_archived: bool = False) -> str or None:
+        """Download posts of a hashtag (see `download_user_timeline_posts()`)."""
+        posts = self._posts(await self._hashtag_nodes(tag, count, only, timestamp_limit), full=dump_metadata)
+        return await self._down_posts(posts, dest, "#" + tag, dump_metadata, stop_at_archived)
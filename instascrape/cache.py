@@ -0,0 +1,148 @@
+import os
+import json
+import time
+import logging
+from threading import Lock
+from collections import OrderedDict
+
+from instascrape.constants import (CACHE_TTL, CACHE_SIZE)
+
+logger = logging.getLogger("instascrape")
+
+KINDS = ("user", "post")
+
+
+class DataCache:
+    """Cache of the data of profiles and posts, shared by all structures (see the `cache` instance below).
+    * The shared `cache` is disabled by default, it is enabled by `InstaScraper(cache_ttl=...)` and by the command line (`CACHE_TTL`).
+    * Entries are kept in memory for `ttl` seconds, the least recently used ones are evicted when there are more than `size` entries.
+    * Profile data are keyed by username ('user'), post data are keyed by shortcode ('post').
+    * If `path` is set, entries are also saved to (and loaded from) JSON files in that directory, so they outlive the process.
+
+    Arguments:
+        ttl: seconds an entry stays valid (0 disables the cache)
+        size: maximum amount of entries kept in memory
+        path: full path to the directory of the disk cache, None to keep the entries in memory only
+    """
+
+    def __init__(self, ttl: float = CACHE_TTL, size: int = CACHE_SIZE, path: str = None):
+        self.ttl = ttl
+        self.size = size
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # -> (kind, key): (expiry time, data)
+        self._lock = Lock()
+
+    def __repr__(self):
+        return "<DataCache entries={0} hits={1} misses={2}>".format(len(self._entries), self.hits, self.misses)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def configure(self, ttl: float = None, size: int = None, path: str = None):
+        """Change the settings of the cache, the arguments which are None are left unchanged."""
+        with self._lock:
+            if ttl is not None:
+                self.ttl = ttl
+            if size is not None:
+                self.size = size
+                self._evict()
+            if path is not None:
+                if not os.path.isdir(path):
+                    os.makedirs(path)
+                self.path = path
+
+    @staticmethod
+    def _key(kind: str, key: str) -> tuple:
+        if kind not in KINDS:
+            raise ValueError("Invalid kind: '{0}'. Should be one of {1}.".format(kind, ", ".join(KINDS)))
+        # usernames are case insensitive
+        return kind, str(key).lower() if kind == "user" else str(key)
+
+    def _file(self, k: tuple) -> str:
+        return os.path.join(self.path, "{0}-{1}.json".format(*k))
+
+    def _evict(self):
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def _load(self, k: tuple) -> tuple or None:
+        """Load an entry from the disk cache."""
+        file = self._file(k)
+        if not os.path.isfile(file):
+            return None
+        try:
+            with open(file, "r") as f:
+                entry = json.load(f)
+        except ValueError:
+            return None
+        return entry["expires"], entry["data"]
+
+    def get(self, kind: str, key: str) -> dict or None:
+        """Get the cached data of an entry.
+
+        Arguments:
+            kind: one of 'user', 'post'
+            key: username or shortcode
+
+        Returns:
+            dict: the data if the entry is found and not expired, None otherwise
+        """
+        if not self.ttl:
+            return None
+        k = self._key(kind, key)
+        with self._lock:
+            entry = self._entries.get(k)
+            if entry is None and self.path:
+                entry = self._load(k)
+                if entry is not None:
+                    self._entries[k] = entry
+                    self._evict()
+            if entry is None or entry[0] < time.time():
+                self._entries.pop(k, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(k)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, kind: str, key: str, data: dict):
+        """Cache the data of an entry for `ttl` seconds (see `get()`)."""
+        if not self.ttl:
+            return
+        k = self._key(kind, key)
+        entry = (time.time() + self.ttl, data)
+        with self._lock:
+            self._entries[k] = entry
+            self._entries.move_to_end(k)
+            self._evict()
+            if self.path:
+                file = self._file(k)
+                with open(file + ".tmp", "w") as f:
+                    json.dump({"expires": entry[0], "data": data}, f)
+                os.replace(file + ".tmp", file)
+
+    def put_profile(self, data: dict):
+        """Cache the data of a profile by its username."""
+        self.put("user", data["username"], data)
+
+    def invalidate(self, kind: str, key: str):
+        """Remove an entry from the cache (memory & disk)."""
+        k = self._key(kind, key)
+        with self._lock:
+            self._entries.pop(k, None)
+            if self.path and os.path.isfile(self._file(k)):
+                os.remove(self._file(k))
+
+    def clear(self):
+        """Remove all entries from the cache (memory & disk)."""
+        with self._lock:
+            self._entries.clear()
+            if self.path:
+                for file in os.listdir(self.path):
+                    if file.endswith(".json") and file.split("-", 1)[0] in KINDS:
+                        os.remove(os.path.join(self.path, file))
+
+
+cache = DataCache(ttl=0)
@@ -1,5 +1,4 @@
 import argparse
-import traceback
 import time
 import json
 import sys
@@ -13,10 +12,13 @@ from colorama import (Fore, Style)
 
 from . import ACCOUNT_DIR
 from instascrape.__version__ import __version__
-from instascrape.instascraper import InstaScraper
-from instascrape.utils import (load_obj, dump_obj, remove_obj, to_timestamp)
-from instascrape.logger import set_logger
+from instascrape.constants import (POOL_SIZE, MAX_WORKERS, PRELOAD_WORKERS, JOB_WORKERS, JOBS_PER_TARGET, JOB_ATTEMPTS, CACHE_TTL)
+from instascrape.export import (FORMATS, METADATA_FORMATS, guess_format, open_writer)
+from instascrape.logger import (set_logger, set_stream)
 from instascrape.exceptions import InstaScrapeError
+from instascrape.cache import cache
+
+# * The scraping modules (requests, tqdm...) are imported by the commands which use them, not at startup (e.g. for `--help` or `--version`).
 
 
 @contextmanager
@@ -33,14 +35,12 @@ def handle_errors(is_final: bool = False):
             ask("Contiune to next job")
     except InstaScrapeError as e:
         logger = logging.getLogger("instascrape")
-        exc = sys.exc_info()
-        exc = "".join(traceback.format_exception(*exc))
-        logger.error(str(e))
-        logger.debug(str(exc))
+        logger.error("%s", e)
+        logger.debug("Traceback", exc_info=True)
         info_print("(✗) Download Failed", color=Fore.LIGHTRED_EX)
     except Exception as e:
         logger = logging.getLogger("instascrape")
-        logger.critical(str(e), exc_info=True)
+        logger.critical("%s", e, exc_info=True)
         info_print("(✗) Downloa Failed", color=Fore.LIGHTRED_EX)
     finally:
         pass
@@ -119,11 +119,34 @@ def info_print(msg: str, text: str = None, color: str = None):
     print(s)
 
 
+_sessions = None  # -> {state: InstaScraper}, the logged in session kept between the commands run by the daemon (`instascrape serve`)
+
+
+def load_session():
+    """Restore the `InstaScraper` object of the logged in account from the session state file, None if no account is logged in.
+    * In the daemon, the object is kept and reused by the next commands, until another account is logged in.
+    """
+    from instascrape.instascraper import InstaScraper
+    from instascrape.utils import load_state
+    state = load_state()
+    if not state:
+        return None
+    if _sessions is None:
+        return InstaScraper.from_state(state)
+    key = json.dumps(state, sort_keys=True)
+    if key not in _sessions:
+        _sessions.clear()
+        _sessions[key] = InstaScraper.from_state(state)
+    return _sessions[key]
+
+
 def login(args: argparse.Namespace):
+    from instascrape.instascraper import InstaScraper
+    from instascrape.utils import (load_state, dump_state)
     username = args.username
     cookie_file = args.cookie
-    insta = load_obj()
-    my_username = insta.my_username if insta else ""
+    insta = load_state()
+    my_username = insta["my_username"] if insta else ""
 
     if cookie_file:
         un = pw = None
@@ -211,19 +234,20 @@ def login(args: argparse.Namespace):
             return
     # Initialize and login with `InstasSraper` object
     insta = InstaScraper(username=un, password=pw, cookie=cookie_data)  # ! no need to provide logger `level`, as the logger was set up in `main()`.
-    insta.login()  # keep the logged in state and store it in the pickle
-    dump_obj(insta)
+    insta.login()  # keep the logged in state and store it in the session state file
+    dump_state(insta.state())
     info_print("Logged in as '{0}'".format(insta.my_username), color=Fore.LIGHTBLUE_EX)
 
 
 def logout(args: argparse.Namespace):
+    from instascrape.utils import remove_state
     if args.real:
-        insta = load_obj()
+        insta = load_session()
         if not insta:
             err_print("You haven't logged in to any account.")
             return
         insta.logout()
-    remove_obj()
+    remove_state()
     info_print("Logged out", color=Fore.LIGHTBLUE_EX)
 
 
@@ -235,7 +259,7 @@ def dump(args: argparse.Namespace):
     if not targets:
         parser.error("at least one dump type must be specified")
 
-    insta = load_obj()
+    insta = load_session()
     if not insta:
         err_print("No account logged in")
         return
@@ -296,21 +320,17 @@ def dump(args: argparse.Namespace):
             if outfile:
                 # save to file
                 path = os.path.abspath(outfile)
-                if isinstance(data, dict):
+                fmt = args.format or guess_format(path)
+                if isinstance(data, dict) and fmt == "json":
                     # => JSON
                     with open(path, "w+") as f:
                         json.dump(data, f, indent=4)
                 else:
-                    # => txt
-                    with open(path, "w+") as f:
-                        buffer = []
-                        for item in data:
-                            if isinstance(item, dict):  # comments
-                                buffer.append(item)
-                            else:
-                                f.write("@" + str(item) + "\n")
-                        if buffer:
-                            json.dump(buffer, f, indent=4)
+                    # => records are written as they are fetched
+                    with open_writer(path, fmt) as writer:
+                        for item in [data] if isinstance(data, dict) else data:
+                            writer.write(item)
+                    path = "{0} ({1} records)".format(path, writer.count)
                 # done
                 info_print("(✓) Dump Succeeded =>", text=path, color=Fore.LIGHTGREEN_EX)
             else:
@@ -318,20 +338,106 @@ def dump(args: argparse.Namespace):
                 pretty_print(data, title.format(string))
 
 
+def size_media_pool(parallel: int, workers: int = None):
+    """Keep enough connections alive for the media downloads of `parallel` jobs running at the same time, each with `workers` threads."""
+    from instascrape.download import media_session
+    size = parallel * (workers or MAX_WORKERS)
+    if size > POOL_SIZE:
+        media_session(size)
+
+
+def run_parallel(scheduler):
+    """Run the download jobs with the scheduler (`JobScheduler`), print a line when each job starts & finishes, and a summary at the end."""
+    from instascrape.download import (hide_progress, cancel_downloads)
+    total = len(scheduler)
+    started = time.time()
+    starts = []
+    finished = []
+
+    def on_start(job):
+        starts.append(job)
+        info_print("[{0}/{1}] (↓) {2}".format(len(starts), total, job.name), text=job.target, color=Fore.LIGHTBLUE_EX)
+
+    def on_finish(job):
+        finished.append(job)
+        counter = "[{0}/{1}]".format(len(finished), total)
+        if job.succeeded:
+            info_print("{0} (✓) {1}".format(counter, job.name), text="{0} => {1} ({2:.1f}s)".format(job.target, job.result or "nothing to download", job.elapsed), color=Fore.LIGHTGREEN_EX)
+        else:
+            info_print("{0} (✗) {1}".format(counter, job.name), text="{0}{1} ({2:.1f}s)".format(job.target, ": " + str(job.error) if job.error else "", job.elapsed), color=Fore.LIGHTRED_EX)
+            if job.error and not isinstance(job.error, InstaScrapeError):
+                logging.getLogger("instascrape").debug("Traceback", exc_info=(type(job.error), job.error, job.error.__traceback__))
+
+    hide_progress()
+    cancel_downloads(False)  # -> the downloads cancelled by a previous command (daemon)
+    try:
+        scheduler.run(on_start, on_finish, on_interrupt=cancel_downloads)
+    except KeyboardInterrupt:
+        print()
+        err_print("Interrupted by user")
+    finally:
+        hide_progress(False)
+
+    # summary
+    failed = [job for job in finished if not job.succeeded]
+    print()
+    print(Style.BRIGHT + "\033[4m[Summary]")
+    print("·", "Jobs:", Style.BRIGHT + "{0} / {1} finished".format(len(finished), total))
+    print("·", "Succeeded:", Fore.LIGHTGREEN_EX + Style.BRIGHT + str(len(finished) - len(failed)))
+    print("·", "Failed:", (Fore.LIGHTRED_EX if failed else "") + Style.BRIGHT + str(len(failed)))
+    for job in failed:
+        print("  -", job.name, job.target)
+    print("·", "Elapsed:", Style.BRIGHT + "{0:.1f}s".format(time.time() - started))
+
+
+def run_sequential(jobs: list):
+    """Run the download jobs (tuple(function, (args), kwargs, target text)) one by one with progress bars."""
+    from instascrape.download import cancel_downloads
+    cancel_downloads(False)  # -> the downloads cancelled by a previous command (daemon)
+    for i, (function, arguments, kwargs, target) in enumerate(jobs, start=1):
+        print()
+        with handle_errors(is_final=i == len(jobs)):
+            info_print("(↓) {0}".format(function.__name__.title().replace("_", " ")), text=target if target else None, color=Fore.LIGHTBLUE_EX)
+            path = function(*arguments, **kwargs)
+            if path is None:
+                # no download destination path returned because of download failed
+                info_print("(✗) Download Failed", color=Fore.LIGHTRED_EX)
+            elif not path:
+                info_print("(-) Nothing To Download", color=Fore.LIGHTBLACK_EX)
+            else:
+                info_print("(✓) Download Completed =>", text=path, color=Fore.LIGHTGREEN_EX)
+
+
+def enqueue(queue, function, arguments: tuple, kwargs: dict, target: str):
+    """Record a download job in the queue (`JobQueue`), and return the function wrapped to keep its status (& progress) in the queue."""
+    if "dest" in kwargs:
+        # resuming may happen in another working directory
+        kwargs = dict(kwargs, dest=os.path.abspath(kwargs["dest"] or "./"))
+    job = queue.add(target, function.__name__, arguments, kwargs)
+    return queue.wrap(job, function)
+
+
 def down(args: argparse.Namespace):
+    from instascrape.scheduler import JobScheduler
+    from instascrape.jobqueue import JobQueue
+    from instascrape.utils import to_timestamp
     targets = args.profile
     count = args.count
     only = args.only
     dest = args.dest
     preload = args.preload
-    dump_metadata = args.dump_metadata
+    dump_metadata = (args.metadata_format or "json") if args.dump_metadata or args.metadata_format else False
     before_date = args.before_date
     after_date = args.after_date
+    workers = args.workers
+    sync = args.sync
+    parallel = args.jobs if args.jobs is not None else JOB_WORKERS
+    per_target = args.jobs_per_target if args.jobs_per_target is not None else JOBS_PER_TARGET
 
-    if not targets and not args.explore and not args.saved:
+    if not targets and not args.explore and not args.saved and not args.stories_from:
         parser.error("at least one media type must be specified")
 
-    insta = load_obj()
+    insta = load_session()
     if not insta:
         err_print("No account logged in")
         return
@@ -348,12 +454,22 @@ def down(args: argparse.Namespace):
         parser.error("incorrect datetime format, should be `YY-mm-dd-h:m:s`")
     if all((before_date, after_date)) and timestamp_limit["after"] >= timestamp_limit["before"]:
         parser.error("timestamp limit conflict: `after` is greater than or equal to `before`")
+    if args.preload_workers is not None and args.preload_workers < 1:
+        parser.error("--preload-workers: should be a positive integer")
+    insta.preload_workers = args.preload_workers or PRELOAD_WORKERS  # -> the object may be reused by the next commands (daemon)
+    if parallel < 1 or per_target < 1:
+        parser.error("--jobs, --jobs-per-target: should be positive integers")
+    if workers is not None and workers < 1:
+        parser.error("--workers: should be a positive integer")
+    size_media_pool(parallel, workers)
 
     kwargs = {"count": count or 50, "only": only, "dest": dest, "preload": preload, "dump_metadata": dump_metadata,
-              "timestamp_limit": timestamp_limit or None}
-    ex_kwargs = {"dest": dest}  # -> kwargs for individuals
-    highlight_kwargs = {"dest": dest, "preload": preload}
-    igtv_kwargs = {"dest": dest, "preload": preload, "dump_metadata": dump_metadata}
+              "timestamp_limit": timestamp_limit or None, "max_workers": workers}
+    sync_kwargs = dict(kwargs, sync=sync)  # -> kwargs for timeline & hashtag posts
+    ex_kwargs = {"dest": dest, "max_workers": workers}  # -> kwargs for individuals
+    pic_kwargs = {"dest": dest}  # -> kwargs for profile-pic
+    highlight_kwargs = {"dest": dest, "preload": preload, "max_workers": workers}
+    igtv_kwargs = {"dest": dest, "preload": preload, "dump_metadata": dump_metadata, "max_workers": workers}
 
     has_individual = False  # -> has one of 'story', 'post', 'profile-pic'
     has_inherited = False  # -> has one of 'highlights', 'igtv'
@@ -368,10 +484,10 @@ def down(args: argparse.Namespace):
             if target[1] == "#":  # tagged
                 jobs.append((insta.download_user_tagged_posts, (target[2:],), kwargs, target))
             else:  # timeline
-                jobs.append((insta.download_user_timeline_posts, (target[1:],), kwargs, target))
+                jobs.append((insta.download_user_timeline_posts, (target[1:],), sync_kwargs, target))
 
         elif target[0] == "#":  # hashtag
-            jobs.append((insta.download_hashtag_posts, (target[1:],), kwargs, target))
+            jobs.append((insta.download_hashtag_posts, (target[1:],), sync_kwargs, target))
 
         elif target[0] == "%":  # story
             if target[1] == "@":  # user
@@ -400,24 +516,26 @@ def down(args: argparse.Namespace):
 
         elif target[0] == "/":  # profile-pic
             has_individual = True
-            jobs.append((insta.download_user_profile_pic, (target[1:],), ex_kwargs, target))
+            jobs.append((insta.download_user_profile_pic, (target[1:],), pic_kwargs, target))
 
         elif target[0].isalpha() or target[0].isdigit():  # profile
             # specify a new path as to create a seperate directory for storing the whole profile media
             profile_path = os.path.join(dest or "./", target)
             profile_kwargs = kwargs.copy()
+            profile_sync_kwargs = sync_kwargs.copy()
             profile_ex_kwargs = ex_kwargs.copy()
+            profile_pic_kwargs = pic_kwargs.copy()
             profile_highlight_kwargs = highlight_kwargs.copy()
             profile_igtv_kwargs = igtv_kwargs.copy()
-            for aa in (profile_kwargs, profile_ex_kwargs, profile_highlight_kwargs, profile_igtv_kwargs):
+            for aa in (profile_kwargs, profile_sync_kwargs, profile_ex_kwargs, profile_pic_kwargs, profile_highlight_kwargs, profile_igtv_kwargs):
                 aa.update({"dest": profile_path})
             temp = [
-                (insta.download_user_timeline_posts, (target,), profile_kwargs),
+                (insta.download_user_timeline_posts, (target,), profile_sync_kwargs),
                 (insta.download_user_tagged_posts, (target,), profile_kwargs),
                 (insta.download_user_igtv, (target,), profile_igtv_kwargs),
                 (insta.download_user_story, (target,), profile_ex_kwargs),
                 (insta.download_user_highlights, (target,), profile_highlight_kwargs),
-                (insta.download_user_profile_pic, (target,), profile_ex_kwargs)
+                (insta.download_user_profile_pic, (target,), profile_pic_kwargs)
             ]
             profile_jobs.append((target, temp))
 
@@ -428,6 +546,17 @@ def down(args: argparse.Namespace):
         jobs.append((insta.download_self_saved_posts, (), kwargs, None))
     if args.explore:  # explore
         jobs.append((insta.download_explore_posts, (), kwargs, None))
+    if args.stories_from:  # stories of the users in a file
+        has_individual = True
+        try:
+            with open(args.stories_from, "r") as f:
+                # one username each line, with or without the '@' prefix
+                names = [line.strip().lstrip("@") for line in f if line.strip() and (line.strip()[0] == "@" or line.strip()[0].isalnum())]
+        except OSError as e:
+            parser.error("--stories-from: {0}".format(e))
+        if not names:
+            parser.error("--stories-from: no usernames found in '{0}'".format(args.stories_from))
+        jobs.append((insta.download_users_stories, (names,), ex_kwargs, "{0} users".format(len(names))))
 
     # Handle profiles download
     if profile_jobs and jobs:
@@ -439,16 +568,34 @@ def down(args: argparse.Namespace):
     print(Fore.YELLOW + "Current User:", Style.BRIGHT + insta.my_username)
     if not has_individual and not has_inherited:
         print(Fore.YELLOW + "Count:", Style.BRIGHT + str(count or 50))
-    if has_individual and any((count, only, preload, dump_metadata, before_date, after_date)):
-        err_print("--count, --only, --preload, --dump-metadata, --before-date, --after-date: not allowed with argument profile_pic (/), post (:), story (%@) (%#)")
+    if has_individual and any((count, only, preload, dump_metadata, before_date, after_date, sync)):
+        err_print("--count, --only, --preload, --dump-metadata, --before-date, --after-date, --sync: not allowed with argument profile_pic (/), post (:), story (%@) (%#), --stories-from")
         return
-    if has_inherited and any((count, only, before_date, after_date)):
-        err_print("--count, --only, --before-date, --after-date: not allowed with argument highlights (%-), igtv (+)")
+    if has_inherited and any((count, only, before_date, after_date, sync)):
+        err_print("--count, --only, --before-date, --after-date, --sync: not allowed with argument highlights (%-), igtv (+)")
         return
     if insta.download_user_highlights in [job[0] for job in jobs] and dump_metadata:
         err_print("--count, --only, --dump-metadata, --before-date, --after-date: not allowed with argument highlights (%-)")
         return
 
+    # Record the jobs, so that the run can be continued by `instascrape resume` if it stops
+    queue = JobQueue()
+    profile_jobs = [(target, [(enqueue(queue, f, a, k, target), a, k) for f, a, k in profiles]) for target, profiles in profile_jobs]
+    jobs = [(enqueue(queue, f, a, k, target), a, k, target) for f, a, k, target in jobs]
+
+    # Run jobs in parallel
+    if parallel > 1 and sum(len(profiles) for _, profiles in profile_jobs) + len(jobs) > 1:
+        scheduler = JobScheduler(parallel, per_target)
+        for target, profiles in profile_jobs:
+            for function, arguments, kwargs in profiles:
+                scheduler.add(target, function, arguments, kwargs)
+        for function, arguments, kwargs, target in jobs:
+            scheduler.add(target or function.__name__, function, arguments, kwargs)
+        print(Fore.YELLOW + "Jobs:", Style.BRIGHT + "{0} (at most {1} at the same time, {2} per target)".format(len(scheduler), parallel, per_target))
+        print()
+        run_parallel(scheduler)
+        return
+
     # Handle profile jobs
     if profile_jobs:
         for target, profiles in profile_jobs:
@@ -460,23 +607,102 @@ def down(args: argparse.Namespace):
                     if path is None:
                         # no download destination path returned because the download failed
                         info_print("(✗) Download Failed", color=Fore.LIGHTRED_EX)
+                    elif not path:
+                        info_print("(-) Nothing To Download", color=Fore.LIGHTBLACK_EX)
                     else:
                         info_print("(✓) Download Completed =>", text=path, color=Fore.LIGHTGREEN_EX)
             print(Style.BRIGHT + Fore.LIGHTCYAN_EX + "> \033[4mCompleted User Profile:", Style.BRIGHT + "\033[4m@{0}".format(target))
 
     # Handle seperate jobs
     if jobs:
-        # retrieve functions and arguments from the job queue
-        for i, (function, arguments, kwargs, target) in enumerate(jobs, start=1):
-            print()
-            with handle_errors(is_final=i == len(jobs)):
-                info_print("(↓) {0}".format(function.__name__.title().replace("_", " ")), text=target if target else None, color=Fore.LIGHTBLUE_EX)
-                path = function(*arguments, **kwargs)
-                if path is None:
-                    # no download destination path returned because of download failed
-                    info_print("(✗) Download Failed", color=Fore.LIGHTRED_EX)
-                else:
-                    info_print("(✓) Download Completed =>", text=path, color=Fore.LIGHTGREEN_EX)
+        run_sequential(jobs)
+
+
+def resume(args: argparse.Namespace):
+    from instascrape.scheduler import JobScheduler
+    from instascrape.jobqueue import JobQueue
+    parallel = args.jobs if args.jobs is not None else JOB_WORKERS
+    per_target = args.jobs_per_target if args.jobs_per_target is not None else JOBS_PER_TARGET
+    if parallel < 1 or per_target < 1:
+        parser.error("--jobs, --jobs-per-target: should be positive integers")
+    max_attempts = args.max_attempts if args.max_attempts is not None else JOB_ATTEMPTS
+    if max_attempts < 1:
+        parser.error("--max-attempts: should be a positive integer")
+
+    queue = JobQueue()
+    if not args.list and not args.clear:
+        for job in queue.prune(max_attempts):
+            warn_print("Dropped job [{0}] {1} {2}: failed {3} times ({4})".format(job.id, job.method.title().replace("_", " "), job.target or "",
+                                                                                 job.attempts, job.error))
+    unfinished = queue.unfinished()
+    if args.clear:
+        queue.clear()
+        info_print("(✓) Removed {0} unfinished jobs".format(len(unfinished)), color=Fore.LIGHTGREEN_EX)
+        return
+    if not unfinished:
+        info_print("No unfinished jobs to resume")
+        return
+    if args.list:
+        print(Style.BRIGHT + "\033[4m[Unfinished Jobs]")
+        for job in unfinished:
+            progress = " ({0} posts done)".format(len(job.finished)) if job.finished else ""
+            attempts = " after {0} attempts".format(job.attempts) if job.attempts > 1 else ""
+            print("·", "[{0}]".format(job.id), job.method.title().replace("_", " "), Style.BRIGHT + str(job.target or ""),
+                  Fore.LIGHTBLACK_EX + job.status + attempts + progress + (": " + job.error if job.error else ""))
+        return
+
+    insta = load_session()
+    if not insta:
+        err_print("No account logged in")
+        return
+
+    jobs = []
+    for job in unfinished:
+        function = getattr(insta, job.method, None)
+        if function is None:
+            warn_print("Unknown job '{0}', skipped".format(job.method))
+            continue
+        jobs.append((queue.wrap(job, function), tuple(job.args), job.kwargs, job.target))
+    print(Fore.YELLOW + "Current User:", Style.BRIGHT + insta.my_username)
+    print(Fore.YELLOW + "Resuming:", Style.BRIGHT + "{0} jobs".format(len(jobs)))
+
+    size_media_pool(min(parallel, len(jobs)), max((kwargs.get("max_workers") or MAX_WORKERS for _, _, kwargs, _ in jobs), default=None))
+    if parallel > 1 and len(jobs) > 1:
+        scheduler = JobScheduler(parallel, per_target)
+        for function, arguments, kwargs, target in jobs:
+            scheduler.add(target or function.__name__, function, arguments, kwargs)
+        print()
+        run_parallel(scheduler)
+    else:
+        run_sequential(jobs)
+
+
+def serve(args: argparse.Namespace):
+    from instascrape.daemon import (Daemon, stop, socket_path)
+    global _sessions
+    path = args.socket or socket_path()
+    if args.stop:
+        if stop(path):
+            info_print("(✓) Daemon stopped", text=path, color=Fore.LIGHTGREEN_EX)
+        else:
+            err_print("No daemon is running on '{0}'".format(path))
+        return
+
+    try:
+        daemon = Daemon(main, path)
+    except OSError as e:
+        err_print(str(e))
+        return
+    _sessions = {}
+    with daemon:
+        info_print("Serving on", text=path + " (Ctrl+C to stop)", color=Fore.LIGHTBLUE_EX)
+        set_stream(daemon.stdout)
+        try:
+            daemon.serve()
+        finally:
+            set_stream(daemon.stdout.stream)
+            _sessions = None
+    info_print("Daemon stopped", color=Fore.LIGHTBLUE_EX)
 
 
 def main(argv=None):
@@ -491,6 +717,7 @@ def main(argv=None):
     group = parser.add_mutually_exclusive_group()
     group.add_argument("-d", "--debug", help="show detailed logging messages (level: DEBUG)", default=False, action="store_true")
     group.add_argument("-q", "--quiet", help="suppress logging messages output (level: ERROR)", default=False, action="store_true")
+    parser.add_argument("--no-daemon", help="run dump, down & resume in this process, even if a daemon (serve) is running", default=False, action="store_true")
     subparsers = parser.add_subparsers()
 
     login_parser = subparsers.add_parser("login", help="Login to Instagram and choose account (cookie)")
@@ -529,6 +756,8 @@ def main(argv=None):
     dump_options = dump_parser.add_argument_group("Dump Options")
     dump_options.add_argument("-o", "--outfile", type=str, metavar="<path/to/file>",
                               help="Dump data output to the file in a proper format i.e. JSON / txt")
+    dump_options.add_argument("--format", choices=FORMATS, type=str,
+                              help="Format of the output file, records are streamed to it as they are fetched (default: guessed from the file extension, else json)")
 
     down_parser = subparsers.add_parser("down", help="Download media from target(s)", usage="instascrape down [[type]...] [[option]...]")
     down_parser.set_defaults(func=down)
@@ -553,6 +782,8 @@ def main(argv=None):
                              help="Download posts media by hashtag name (#)")
     media_types.add_argument("-explore", action="store_true",
                              help="Download media of posts in the explore feed section (-flag)")
+    media_types.add_argument("--stories-from", type=str, metavar="<path/to/file>", dest="stories_from",
+                             help="Download stories media of all users listed in a file (one username each line), queried in batches")
     media_types.add_argument("-saved", action="store_true",
                              help="Download saved posts media of yourself (-flag)")
     down_options = down_parser.add_argument_group("Options")
@@ -563,16 +794,57 @@ def main(argv=None):
     down_options.add_argument("--dest", type=str, metavar="<path/to/directory>",
                               help="Set path to the destination of download (default: .)")
     down_options.add_argument("--preload", action="store_true",
-                              help="Might help increase the speed of download by collecting the initial data of all items before downloading "
-                                   "(WARN: this option is unstable and should only be used when downloading a small amount of posts, might get rate limited by Instagram)")
+                              help="Might help increase the speed of download by collecting the initial data of all items before downloading")
+    down_options.add_argument("--preload-workers", type=int, metavar="<integer>",
+                              help="Set maximum number of items preloaded at the same time (default: {0})".format(PRELOAD_WORKERS))
     down_options.add_argument("--before-date", type=str, metavar="<YY-mm-dd-h:m:s>",
                               help="Download post only if it was created before this date")
     down_options.add_argument("--after-date", type=str, metavar="<YY-mm-dd-h:m:s>",
                               help="Download post only if it was created after this date")
     down_options.add_argument("--dump-metadata", action="store_true",
                               help="Dump metadata of each post to JSON files")
-
-    args = parser.parse_args(argv[1:] if argv else None)
+    down_options.add_argument("--metadata-format", choices=METADATA_FORMATS, type=str,
+                              help="Format of the metadata dumped, 'parquet' appends the metadata of all posts and media to Parquet files in the '.metadata' directory instead (implies --dump-metadata) (default: json)")
+    down_options.add_argument("--sync", action="store_true",
+                              help="Only download timeline & hashtag posts created after the newest one downloaded in the last complete sync (the first sync stops at already downloaded posts)")
+    down_options.add_argument("--workers", type=int, metavar="<integer>",
+                              help="Set maximum number of media downloaded at the same time (default: {0})".format(MAX_WORKERS))
+    down_options.add_argument("--jobs", type=int, metavar="<integer>",
+                              help="Set maximum number of download jobs (targets & media types) run at the same time, 1 to run them one by one with progress bars (default: {0})".format(JOB_WORKERS))
+    down_options.add_argument("--jobs-per-target", type=int, metavar="<integer>",
+                              help="Set maximum number of download jobs of the same target run at the same time (default: {0})".format(JOBS_PER_TARGET))
+
+    resume_parser = subparsers.add_parser("resume", help="Continue the download jobs of the runs which stopped before finishing", usage="instascrape resume [[option]...]")
+    resume_parser.set_defaults(func=resume)
+    resume_options = resume_parser.add_argument_group("Options")
+    r_group = resume_options.add_mutually_exclusive_group()
+    r_group.add_argument("--list", action="store_true",
+                         help="List the unfinished jobs without running them")
+    r_group.add_argument("--clear", action="store_true",
+                         help="Remove all the unfinished jobs without running them")
+    resume_options.add_argument("--jobs", type=int, metavar="<integer>",
+                                help="Set maximum number of download jobs run at the same time, 1 to run them one by one with progress bars (default: {0})".format(JOB_WORKERS))
+    resume_options.add_argument("--jobs-per-target", type=int, metavar="<integer>",
+                                help="Set maximum number of download jobs of the same target run at the same time (default: {0})".format(JOBS_PER_TARGET))
+    resume_options.add_argument("--max-attempts", type=int, metavar="<integer>",
+                                help="Drop the failed jobs which have already been run this many times instead of running them again (default: {0})".format(JOB_ATTEMPTS))
+
+    serve_parser = subparsers.add_parser("serve", help="Run a daemon which runs the dump, down & resume commands, keeping the sessions, connections & caches warm")
+    serve_parser.set_defaults(func=serve)
+    serve_parser.add_argument("--socket", type=str, metavar="<path/to/socket>",
+                              help="Path to the Unix socket to listen on (default: $INSTASCRAPE_SOCKET, else ~/.instascrape/daemon.sock)")
+    serve_parser.add_argument("--stop", action="store_true",
+                              help="Stop the running daemon, after the command it is running")
+
+    argv = list(argv) if argv else sys.argv
+    args = parser.parse_args(argv[1:])
+
+    # let the daemon run the command if one is running (unless this is the daemon itself)
+    if getattr(args, "func", None) in (dump, down, resume) and not args.no_daemon and _sessions is None:
+        from instascrape.daemon import submit
+        code = submit(argv)
+        if code is not None:
+            sys.exit(code)
 
     # setup logger everytime the program starts, before executing anything
     level = 20  # INFO
@@ -581,6 +853,8 @@ def main(argv=None):
     elif args.debug:
         level = 10  # DEBUG
     set_logger(level)
+    # the data cache is disabled for library users, the commands (also run by the daemon) reuse the profiles & posts fetched recently
+    cache.configure(ttl=CACHE_TTL)
 
     try:
         args.func
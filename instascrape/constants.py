@@ -1,4 +1,8 @@
-BASE_URL = "https://instagram.com"
+import os
+
+# * The base URLs can be overridden by environment variables, e.g. to run against a local mock server (see benchmarks/mock_instagram.py)
+BASE_URL = os.environ.get("INSTASCRAPE_BASE_URL", "https://instagram.com").rstrip("/")
+API_URL = os.environ.get("INSTASCRAPE_API_URL", "https://i.instagram.com").rstrip("/")
 
 # Login & Logout
 LOGIN_URL = BASE_URL + "/accounts/login/ajax/"
@@ -6,7 +10,7 @@ LOGOUT_URL = BASE_URL + "/accounts/logout"
 
 # User
 USER_URL = BASE_URL + "/{username}/?__a=1"
-USER_ID_URL = "https://i.instagram.com/api/v1/users/{user_id}/info/"
+USER_ID_URL = API_URL + "/api/v1/users/{user_id}/info/"
 
 # Post
 POST_URL = BASE_URL + "/p/{shortcode}/?__a=1"
@@ -42,3 +46,33 @@ QUERY_HIGHLIGHTS_URL = BASE_URL + "/graphql/query/?query_hash=7c16654f22c819fb63
 
 # User-Agent
 UA = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/60.0.3112.113 Safari/537.36"
+
+# Download
+POOL_SIZE = 10  # maximum number of kept-alive connections per CDN host
+MAX_WORKERS = 4  # maximum number of media of a single structure downloaded at the same time
+PREFETCH = 5  # maximum number of resolved posts waiting to be downloaded
+PRELOAD_WORKERS = 8  # maximum number of items preloaded at the same time
+
+# Rate Limit
+REQUEST_RATE = 1.0  # initial amount of requests per second of each endpoint family
+MAX_RETRIES = 5  # maximum amount of retries of a rate limited request
+
+# Batch
+REELS_CHUNK = 20  # maximum amount of reels (stories & highlights) queried in one request
+
+# Cache
+CACHE_TTL = 600  # seconds the data of a profile or post stays cached
+CACHE_SIZE = 1000  # maximum amount of profiles & posts cached in memory
+USER_IDS_TTL = 7 * 24 * 3600  # seconds a user id stays in the cache of usernames to user ids (usernames can be changed)
+
+# Jobs
+JOB_WORKERS = 4  # maximum number of (cli) download jobs run at the same time
+JOBS_PER_TARGET = 2  # maximum number of download jobs of the same target run at the same time
+JOB_ATTEMPTS = 3  # maximum number of times a failed download job is run before `instascrape resume` drops it
+
+# Session
+STATE_VERSION = 1  # version of the format of the (cli) session state file
+
+# Export
+EXPORT_FLUSH = 100  # amount of records written to a dump file between flushes
+EXPORT_BATCH = 10000  # amount of records buffered into one record batch of a Parquet file
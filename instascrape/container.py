@@ -33,6 +33,8 @@ class Container:
         video_duration: only for 'GraphStoryVideo' and 'GraphVideo', returns None otherwise
         src: biggest in size source url
     """
+    __slots__ = ("data",)
+
     def __init__(self, data: dict):
         self.data = data
 
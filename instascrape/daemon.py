@@ -0,0 +1,253 @@
+import io
+import os
+import sys
+import json
+import stat
+import socket
+import signal
+import logging
+import threading
+import socketserver
+
+from instascrape import (DIR_PATH, make_dirs)
+
+logger = logging.getLogger("instascrape")
+
+SOCKET_ENV = "INSTASCRAPE_SOCKET"
+
+
+def socket_path() -> str:
+    """Path of the socket of the daemon: the `INSTASCRAPE_SOCKET` environment variable, or 'daemon.sock' in `DIR_PATH`."""
+    return os.environ.get(SOCKET_ENV) or os.path.join(DIR_PATH, "daemon.sock")
+
+
+def _connect(path: str) -> socket.socket or None:
+    """Connect to the daemon listening on `path`, None if there is none (e.g. the socket file was left by a daemon which was killed)."""
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def _send(f, message: dict):
+    f.write(json.dumps(message).encode() + b"\n")
+    f.flush()
+
+
+def is_running(path: str = None) -> bool:
+    """Whether a daemon is listening on `path` (default: `socket_path()`)."""
+    sock = _connect(path or socket_path())
+    if sock is None:
+        return False
+    sock.close()
+    return True
+
+
+def submit(argv: list, path: str = None) -> int or None:
+    """Run a command line by the daemon listening on `path` (default: `socket_path()`), and write its output to stdout & stderr as it comes.
+
+    Arguments:
+        argv: the command line, e.g. ["instascrape", "down", "@user"]
+        path: path to the socket of the daemon
+
+    Returns:
+        int: the exit status of the command, None if no daemon is running
+    """
+    sock = _connect(path or socket_path())
+    if sock is None:
+        return None
+    with sock, sock.makefile("rwb") as f:
+        _send(f, {"argv": list(argv), "cwd": os.getcwd(), "isatty": sys.stdout.isatty(),
+                  "columns": os.get_terminal_size().columns if sys.stdout.isatty() else None})
+        try:
+            for line in f:
+                message = json.loads(line.decode())
+                if "exit" in message:
+                    return message["exit"]
+                stream = sys.stderr if "stderr" in message else sys.stdout
+                stream.write(message.get("stderr") or message.get("stdout") or "")
+                stream.flush()
+        except KeyboardInterrupt:
+            # -> the daemon interrupts the command when the connection is closed
+            print()
+            return 130
+    print("Connection to the daemon lost", file=sys.stderr)
+    return 1
+
+
+def stop(path: str = None) -> bool:
+    """Stop the daemon listening on `path` (default: `socket_path()`), after the command it is running. Returns False if none is running."""
+    sock = _connect(path or socket_path())
+    if sock is None:
+        return False
+    with sock, sock.makefile("rwb") as f:
+        _send(f, {"stop": True})
+        f.readline()
+    return True
+
+
+class Client:
+    """The connection of the client whose command is being run, which receives the output of the command."""
+
+    def __init__(self, f, thread: threading.Thread, isatty: bool = False):
+        self._file = f
+        self._lock = threading.Lock()
+        self.thread = thread
+        self.isatty = isatty
+        self.gone = False
+
+    def send(self, message: dict):
+        with self._lock:
+            _send(self._file, message)
+
+
+class Output:
+    """Stands for `sys.stdout` (or `sys.stderr`) in the daemon: while a command runs, all its output (prints, logs, progress bars, also from
+    the threads of its jobs) is sent to the client which submitted it, and to the console of the daemon otherwise.
+    * If the client disconnects (e.g. Ctrl+C), `KeyboardInterrupt` is raised in the command, once, as it would be if it ran in the client.
+
+    Arguments:
+        stream: the stream of the daemon itself
+        name: 'stdout' or 'stderr'
+    """
+
+    def __init__(self, stream, name: str):
+        self.stream = stream
+        self.name = name
+        self.client = None
+
+    def write(self, text: str) -> int:
+        client = self.client
+        if client is None:
+            return self.stream.write(text)
+        if client.gone:
+            return len(text)
+        try:
+            client.send({self.name: text})
+        except OSError:
+            client.gone = True
+            logger.debug("Client disconnected, interrupting its command...")
+            if threading.current_thread() is client.thread:
+                raise KeyboardInterrupt()
+        return len(text)
+
+    def flush(self):
+        if self.client is None:
+            self.stream.flush()
+
+    def isatty(self) -> bool:
+        return self.client.isatty if self.client is not None else self.stream.isatty()
+
+
+class Handler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        request = json.loads(line.decode())
+        if request.get("stop"):
+            logger.info("Stopping the daemon...")
+            threading.Thread(target=self.server.shutdown).start()
+            _send(self.wfile, {"exit": 0})
+            return
+        code = self.server.run(request, self.wfile)
+        try:
+            _send(self.wfile, {"exit": code})
+        except OSError:
+            pass
+
+
+class Daemon(socketserver.UnixStreamServer):
+    """Long-running process (`instascrape serve`) which runs the commands submitted by the command line (`down`, `dump`, `resume`),
+    so that they share the state kept in memory between them: the logged in sessions, the connection pool of the media downloads,
+    the data cache and the rate limits learnt by the governor.
+    * Commands are run one at a time, in the order they are submitted (the jobs of a command still run in parallel).
+    * A command runs in the working directory of its client, and its output is streamed back to the client (see `Output`).
+    * The socket is only accessible by the user running the daemon, which acts with the user's logged in account.
+
+    Arguments:
+        path: path to the Unix socket (default: `socket_path()`)
+        run: function running a command line (`argv`)
+    """
+
+    def __init__(self, run, path: str = None):
+        self.path = path or socket_path()
+        self._run = run
+        if is_running(self.path):
+            raise OSError("A daemon is already running on '{0}'".format(self.path))
+        if self.path == socket_path():
+            make_dirs()
+        if os.path.lexists(self.path):
+            if not stat.S_ISSOCK(os.lstat(self.path).st_mode):
+                raise OSError("'{0}' exists and is not a socket".format(self.path))
+            os.remove(self.path)  # -> left by a daemon which was killed
+        umask = os.umask(0o077)  # -> the socket is created accessible by the user only, not changed afterwards
+        try:
+            socketserver.UnixStreamServer.__init__(self, self.path, Handler)
+        finally:
+            os.umask(umask)
+        self.stdout = Output(sys.stdout, "stdout")
+        self.stderr = Output(sys.stderr, "stderr")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.server_close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        return False
+
+    def run(self, request: dict, f) -> int:
+        """Run the command of a request, with its output sent to the client (`f`). Returns the exit status of the command."""
+        client = Client(f, threading.current_thread(), request.get("isatty", False))
+        cwd = os.getcwd()
+        columns = os.environ.get("COLUMNS")
+        stdin = sys.stdin
+        code = 0
+        logger.debug("Running %s in %s...", request["argv"], request["cwd"])
+        self.stdout.client = self.stderr.client = client
+        sys.stdin = io.StringIO()  # -> no input can be asked to the client
+        if request.get("columns"):
+            os.environ["COLUMNS"] = str(request["columns"])  # -> width of the progress bars
+        try:
+            os.chdir(request["cwd"])
+            self._run(request["argv"])
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else int(e.code is not None)
+        except KeyboardInterrupt:
+            if not client.gone:
+                raise  # -> the daemon itself is interrupted
+            code = 130
+        except Exception as e:
+            logger.critical("%s", e, exc_info=True)
+            code = 1
+        finally:
+            self.stdout.client = self.stderr.client = None
+            sys.stdin = stdin
+            os.chdir(cwd)
+            if columns is None:
+                os.environ.pop("COLUMNS", None)
+            else:
+                os.environ["COLUMNS"] = columns
+        return code
+
+    def serve(self):
+        """Serve until `stop()` is called, or the daemon is interrupted (Ctrl+C or SIGTERM)."""
+        def terminate(signum, frame):
+            raise KeyboardInterrupt()
+
+        sys.stdout, sys.stderr = self.stdout, self.stderr
+        signal.signal(signal.SIGTERM, terminate)
+        try:
+            self.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            sys.stdout, sys.stderr = self.stdout.stream, self.stderr.stream
@@ -2,23 +2,84 @@ import logging
 import os
 import sys
 import json
-import time
+from threading import (Lock, Event)
 from contextlib import contextmanager
+from concurrent.futures import (ThreadPoolExecutor, as_completed)
 
 import requests
+from requests.adapters import HTTPAdapter
 from colorama import (Fore, Back, Style)
 from tqdm import tqdm
 
-from instascrape.utils import to_datetime
-from instascrape.constants import UA
-from instascrape.exceptions import InstaScrapeError
+from instascrape.utils import (to_datetime, prefetch)
+from instascrape.constants import (UA, POOL_SIZE, MAX_WORKERS, PREFETCH)
+from instascrape.exceptions import (InstaScrapeError, DownloadError)
+from instascrape.manifest import (Manifest, src_id, load_mark, save_mark)
+from instascrape.export import MetadataSink
+from instascrape.logger import stream_level
 
 logger = logging.getLogger("instascrape")
 
+_transport = None  # -> tuple(pool size, requests.Session)
+_transport_lock = Lock()
+_hide_progress = False
+_cancel = Event()  # -> set by `cancel_downloads()`
+
+NOTHING = ""  # -> returned by the download methods when there is nothing to download, None means the download failed
+
+
+def media_session(pool_size: int = None) -> requests.Session:
+    """Get the shared session which all media downloads go through.
+    - Connections to the CDN hosts are kept alive and reused, instead of doing a new TCP & TLS handshake for every file.
+    - The session is rebuilt only when a different `pool_size` is requested.
+
+    Arguments:
+        pool_size: maximum number of connections kept alive per CDN host (default: `POOL_SIZE` in constants.py)
+
+    Returns:
+        requests.Session
+    """
+    global _transport
+    with _transport_lock:
+        if _transport is None or (pool_size and pool_size != _transport[0]):
+            pool_size = pool_size or POOL_SIZE
+            logger.debug("Setting up media session (pool size: %s)...", pool_size)
+            session = requests.Session()
+            session.headers.update({"user-agent": UA})
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            if _transport is not None:
+                _transport[1].close()
+            _transport = (pool_size, session)
+        return _transport[1]
+
+
+def hide_progress(hide: bool = True):
+    """Hide (or show again) all progress bars, e.g. when downloads run in parallel and the bars would interleave."""
+    global _hide_progress
+    _hide_progress = hide
+
+
+def cancel_downloads(cancel: bool = True):
+    """Interrupt (or allow again) all downloads, e.g. the jobs run in parallel by a `JobScheduler`, as only the main thread receives Ctrl+C.
+    * The downloads raise KeyboardInterrupt before their next item (post, media...) or chunk of data, the partial files are kept for resuming.
+    """
+    if cancel:
+        _cancel.set()
+    else:
+        _cancel.clear()
+
+
+def _check_cancelled():
+    if _cancel.is_set():
+        raise KeyboardInterrupt()
+
 
 @contextmanager
 def progress(total: int = None, desc: str = None, ascii: bool = True, disable: bool = False):
-    hide = disable or logger.handlers[1].level < 20 or logger.handlers[1].level >= 40
+    level = stream_level()
+    hide = disable or _hide_progress or level < 20 or level >= 40
     if hide:
         class Dummy:
             def dummy(self, *args, **kwargs):
@@ -42,10 +103,48 @@ def progress(total: int = None, desc: str = None, ascii: bool = True, disable: b
         bar.close()
 
 
+def _find_part(path: str, filename: str) -> (str or None, int):
+    """Look for the partial (`.part`) file left by an interrupted download of `filename` in `path`.
+
+    Returns:
+        str: extension of the partial file, None if not found
+        int: size of the partial file
+    """
+    for ext in (".jpg", ".mp4"):
+        part_path = os.path.join(path, filename + ext + ".part")
+        if os.path.isfile(part_path):
+            return ext, os.path.getsize(part_path)
+    return None, 0
+
+
+def _media_ext(mime: str) -> str:
+    """Get the file extension of a media MIME type. Only mp4 and jpeg are supported."""
+    if mime == "video/mp4":
+        return ".mp4"
+    if mime == "image/jpeg":
+        return ".jpg"
+    raise InstaScrapeError("Invalid MIME type: {0}.".format(mime))
+
+
+def _content_range(content_range: str) -> (str, str):
+    """Split a 'Content-Range' header ('bytes <start>-<end>/<total>') into its start and total (as strings, may not be digits)."""
+    start = content_range.replace("bytes ", "").partition("-")[0]
+    total = content_range.rpartition("/")[2]
+    return start, total
+
+
+class _StalePart(Exception):
+    """Raised by `_down_from_src` when the reply to a `Range` request does not continue its partial file (e.g. the media has changed)."""
+
+
 def _down_from_src(src: str, filename: str, path: str = None) -> str or None:
     """Low-level function to download media from a URL (`src`).
     * Called in `download_user_profile_pic`.
     * Only downloads mp4 and jpeg.
+    * Goes through the pooled session returned by `media_session()`.
+    * Data is written to a `.part` file first. If a `.part` file of an interrupted download is found, the download is resumed from its size with a `Range` request.
+    * If the reply does not continue the partial file (416 with another size, or 206 from another position), the `.part` file is removed
+      and the download is started again once, without `Range`. If the server sends the whole content (200), it replaces the partial file.
 
     Arguments:
         src: source of media (URL)
@@ -55,38 +154,72 @@ def _down_from_src(src: str, filename: str, path: str = None) -> str or None:
     Returns:
         path: full path to the download destination
     """
+    _check_cancelled()
     path = path or "./"
     path = os.path.abspath(path)
     if not os.path.isdir(path):
         os.mkdir(path)
 
+    # look for the partial file left by an interrupted download
+    part_ext, offset = _find_part(path, filename)
+
     f = None
     try:
-        r = requests.get(src, stream=True, headers={"user-agent": UA})
-        r.raise_for_status()
-
-        # Get info of the file
-        mime = r.headers["Content-Type"]
-        size = r.headers["Content-Length"]
-        size_in_kb = int(int(size) / 1000)
-        if mime == "video/mp4":
-            ext = ".mp4"
-        elif mime == "image/jpeg":
-            ext = ".jpg"
-        else:
-            raise InstaScrapeError("Invalid MIME type: {0}.".format(mime))
-
-        finish_filename = filename + ext
-        part_filename = filename + ext + ".part"
-
-        # Download
-        logger.debug("=> [{0}] {1} ({2} kB)".format(finish_filename, mime, size_in_kb))
-        f = open(os.path.join(path, part_filename), "wb+")
-        for chunk in r.iter_content(1024):
-            if chunk:
-                f.write(chunk)
+        headers = {"Range": "bytes={0}-".format(offset)} if offset else {}
+        # the response is closed (connection released back to the pool) when leaving the block
+        with media_session().get(src, stream=True, headers=headers) as r:
+            if offset and r.status_code == 416:
+                # nothing left to download if the partial file has already got the whole content
+                total = _content_range(r.headers.get("Content-Range", ""))[1]
+                if total.isdigit() and int(total) == offset:
+                    logger.debug("=> [%s] already completed", filename + part_ext)
+                    os.rename(os.path.join(path, filename + part_ext + ".part"), os.path.join(path, filename + part_ext))
+                    return path
+                raise _StalePart("range not satisfiable (size: {0}, partial file: {1})".format(total or "?", offset))
+            r.raise_for_status()
+
+            # Get info of the file
+            mime = r.headers["Content-Type"]
+            size = int(r.headers["Content-Length"])
+            ext = _media_ext(mime)
+
+            finish_filename = filename + ext
+            part_filename = filename + ext + ".part"
+
+            if offset and r.status_code == 206:
+                # resume: check that the content starts right at the end of the partial file
+                content_range = r.headers.get("Content-Range", "")
+                start, total = _content_range(content_range)
+                if part_ext != ext or not start.isdigit() or int(start) != offset:
+                    raise _StalePart("unexpected {0} content from '{1}' (partial file: {2}{3})".format(mime, content_range, offset, part_ext))
+                total = int(total) if total.isdigit() else offset + size
+                mode = "ab"
+            else:
+                # download from the beginning, the server does not support range requests and sent the whole content
+                if part_ext:
+                    os.remove(os.path.join(path, filename + part_ext + ".part"))
+                offset = 0
+                total = size
+                mode = "wb"
+
+            # Download
+            logger.debug("=> [%s] %s (%s kB)%s", finish_filename, mime, int(total / 1000), " resumed from %s kB" % int(offset / 1000) if offset else "")
+            with open(os.path.join(path, part_filename), mode) as f:
+                for chunk in r.iter_content(1024 * 64):
+                    _check_cancelled()
+                    if chunk:
+                        f.write(chunk)
+
+        # keep the partial file (for resuming) if the content is incomplete
+        received = os.path.getsize(os.path.join(path, part_filename))
+        if received != total:
+            raise DownloadError("Incomplete content: received {0} of {1} bytes.".format(received, total))
+    except _StalePart as e:
+        logger.debug("=> [%s] %s, downloading it again", filename + part_ext, e)
+        os.remove(os.path.join(path, filename + part_ext + ".part"))
+        return _down_from_src(src, filename, path)  # -> no partial file: no `Range` request this time
     except Exception as e:
-        logger.error("Download Error (src: '{0}'): ".format(src) + str(e))
+        logger.error("Download Error (src: '%s'): %s", src, e)
         return None
 
     finally:
@@ -98,35 +231,20 @@ def _down_from_src(src: str, filename: str, path: str = None) -> str or None:
     return path
 
 
-def _down_structure(structure, dest: str = None, directory: str = None, subdir: str = None, force_subdir: bool = False) -> (str, tuple):
-    """Download media of containers of a single structure to `dest`. May deecorate the proccess with progress bar.
-    - If there is multiple media in the structure, a sub directory will be created to store the media.
-    * This function calls `down_from_src` function and wraps it with some interactions with Post object to support downloading post.
-    * Containers are obtained by calling `structure.obtain_media()`.
-    * Called in `download_story` and `download_post` individualy.
-    * If a file with the same path and filename found, it will skip the download process.
-
-    [dest]
-        [directory]
-            [sub directory] (multi or dump_metadata=True)
-            [file]
-            ...
-
-    Arguments:
-        structure: a structure object that has attrubute `obtain_media()` (`Post` or `Story`)
-        dest: destination path, one will be created if directory not found (must be a directory)
-        directory: make a new directory inside `dest` to store all files
-        subdir: name of the sub directory which is created when downloading multiple media
-        force_subdir: force create a sub directory and store all the media (used when dump_metadata=True)
+def _plan_structure(structure, dest: str = None, directory: str = None, subdir: str = None, force_subdir: bool = False) -> (str, str, list):
+    """Prepare the download destination of the media of a single structure (see `_down_structure()`) and name the file of each media.
+    Directories will be created if not found.
 
     Returns:
-        str: full path to the download destination
-        tuple: (downs, exists)
+        str: full path to the download destination (`dest` + `directory`)
+        str: full path to the directory where the files are stored (sub directory included)
+        list: [(index, container, filename, name)], `name` is the path of the file relative to the download destination, without the extension
+              (the filenames of stories & highlights are their datetime, numbered from '_2' if several media have the same one)
     """
     dest = dest or "./"
     path = os.path.abspath(dest)
     if not os.path.isdir(path):
-        logger.debug("{0} directory not found. Creating one...".format(path))
+        logger.debug("%s directory not found. Creating one...", path)
         os.mkdir(path)
     if directory:
         path = os.path.join(path, directory)
@@ -143,135 +261,293 @@ def _down_structure(structure, dest: str = None, directory: str = None, subdir:
             if not os.path.isdir(path):
                 os.mkdir(path)
 
-    logger.debug("Downloading {0} ({1} media) [{2}]...".format(subdir or directory, len(containers), structure.typename))
-    logger.debug("Path: " + path)
-    downs = exists = 0
-    with progress(len(containers), disable=False) as bar:
-        for i, c in enumerate(containers, start=1):
-            bar.set_postfix_str(c.typename)
-            if multi:
-                filename = str(i)
-            else:
-                filename = subdir or str(i)
+    items = []
+    seen = {}
+    for i, c in enumerate(containers, start=1):
+        if multi:
+            filename = str(i)
+        else:
+            filename = subdir or str(i)
+
+        if structure.__class__.__name__ in ("Story", "Highlight"):
+            # * exclusively and explictly change filename to datetime string for Story and Highlight
+            filename = to_datetime(structure.created_time_list[i-1])
+            # media posted within the same second are numbered, so that their downloads do not write to the same file
+            seen[filename] = seen.get(filename, 0) + 1
+            if seen[filename] > 1:
+                filename += "_" + str(seen[filename])
+        items.append((i, c, filename, os.path.relpath(os.path.join(path, filename), return_path)))
+    return return_path, path, items
+
+
+def _down_structure(structure, dest: str = None, directory: str = None, subdir: str = None, force_subdir: bool = False, max_workers: int = None,
+                    manifest: Manifest = None) -> (str, tuple):
+    """Download media of containers of a single structure to `dest`. May deecorate the proccess with progress bar.
+    - If there is multiple media in the structure, a sub directory will be created to store the media.
+    * This function calls `down_from_src` function and wraps it with some interactions with Post object to support downloading post.
+    * Containers are obtained by calling `structure.obtain_media()`.
+    * Called in `download_story` and `download_post` individualy.
+    * If a media is found in the manifest of the download destination (`dest` + `directory`), it will skip the download process.
+    * Partially downloaded (`.part`) files are not recorded in the manifest, their downloads are resumed by `_down_from_src`.
+    * Media that need to be downloaded are fetched in parallel by a pool of at most `max_workers` threads.
+
+    [dest]
+        [directory]
+            [sub directory] (multi or dump_metadata=True)
+            [file]
+            ...
 
-            if structure.__class__.__name__ in ("Story", "Highlight"):
-                # * exclusively and explictly change filename to datetime string for Story and Highlight
-                filename = to_datetime(structure.created_time_list[i-1])
+    Arguments:
+        structure: a structure object that has attrubute `obtain_media()` (`Post` or `Story`)
+        dest: destination path, one will be created if directory not found (must be a directory)
+        directory: make a new directory inside `dest` to store all files
+        subdir: name of the sub directory which is created when downloading multiple media
+        force_subdir: force create a sub directory and store all the media (used when dump_metadata=True)
+        max_workers: maximum number of media downloaded at the same time (default: `MAX_WORKERS`)
+        manifest: the opened `Manifest` of the download destination, one will be opened (and closed) if not provided
 
-            # check if the file / directory already exists
-            if os.path.isfile(os.path.join(path, filename + ".jpg")) or os.path.isfile(os.path.join(path, filename + ".mp4")):
+    Returns:
+        str: full path to the download destination
+        tuple: (downs, exists)
+    """
+    return_path, path, items = _plan_structure(structure, dest, directory, subdir, force_subdir)
+    own_manifest = manifest is None
+    if own_manifest:
+        manifest = Manifest(return_path)
+
+    logger.debug("Downloading %s (%s media) [%s]...", subdir or directory, len(items), structure.typename)
+    logger.debug("Path: %s", path)
+    shortcode = getattr(structure, "shortcode", None)  # -> None for Story and Highlight
+    downs = exists = 0
+    with progress(len(items), disable=False) as bar:
+        # sort out the existing files first, collect the rest as download tasks
+        tasks = []  # -> tuple(index, container, filename, name)
+        for i, c, filename, name in items:
+            # check if the media has already been downloaded
+            if name in manifest or src_id(c.src) in manifest.srcs:
                 exists += 1
                 logger.debug("file already downloaded, skipped !")
+                bar.set_postfix_str(c.typename)
                 bar.set_description_str(Back.BLUE + Fore.BLACK + "[" + "Exists".center(11) + "]" + Style.RESET_ALL)
-                time.sleep(0.1)  # give some time for displaying the 'Exists' badge of the progress bar
+                bar.update(1)
             else:
+                tasks.append((i, c, filename, name))
+
+        try:
+            if tasks:
                 # download
-                state = _down_from_src(c.src, filename, path)
-                if state:
-                    downs += 1
-            bar.update(1)
+                with ThreadPoolExecutor(max_workers=min(max_workers or MAX_WORKERS, len(tasks))) as executor:
+                    futures = {executor.submit(_down_from_src, c.src, filename, path): (i, c, name) for i, c, filename, name in tasks}
+                    for future in as_completed(futures):
+                        # the progress bar and the manifest are only driven by this (main) thread
+                        i, c, name = futures[future]
+                        bar.set_postfix_str(c.typename)
+                        if future.result():
+                            downs += 1
+                            manifest.add(name, shortcode, i, src_id(c.src))
+                        bar.update(1)
+        finally:
+            if own_manifest:
+                manifest.close()
     return return_path, (downs, exists)
 
 
-def _down_posts(posts, dest: str = None, directory: str = None, dump_metadata: bool = False):
+@contextmanager
+def _metadata_sink(dump_metadata: bool or str, path: str):
+    """Open the `MetadataSink` of the download directory `path` if `dump_metadata` is 'parquet', yields None otherwise (JSON files or no metadata)."""
+    if dump_metadata != "parquet":
+        yield None
+        return
+    with MetadataSink(path) as sink:
+        yield sink
+
+
+def _open_manifest(dest: str = None, directory: str = None) -> Manifest:
+    """Open the manifest of the download destination (`dest` + `directory`). Directories will be created if not found."""
+    path = os.path.abspath(dest or "./")
+    if directory:
+        path = os.path.join(path, directory)
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    return Manifest(path)
+
+
+def _down_posts(posts, dest: str = None, directory: str = None, dump_metadata: bool = False, max_workers: int = None, queue_size: int = PREFETCH,
+                stop_at_archived: bool = False, sync: bool = False, count: int = None, checkpoint=None):
     """High-level function for downloading media of a list of posts. Decorates the process with tqdm progress bar.
     * This function calls `down_structure` function and wraps it with 'for' loop & progress bar to support downloading multiple posts.
+    * If `posts` is a generator, upcoming posts are resolved in a background thread (see `prefetch`) while the media of the current one are downloaded.
 
     Arguments:
         posts: a generator which generates `Post` instances or a list that contains preloaded `Post` instances
         dest: download destination (should be a directory)
         directory: make a new directory inside `dest` to store all the files
-        dump_metadata: (force create a sub directory of the post and) dump metadata of each post to a file inside if True
+        dump_metadata: (force create a sub directory of the post and) dump metadata of each post to a JSON file inside if True or 'json',
+                       append it to the Parquet files of the download directory if 'parquet' (see `MetadataSink`)
+        max_workers: maximum number of media of a post downloaded at the same time
+        queue_size: maximum number of resolved posts waiting to be downloaded (generator only)
+        stop_at_archived: stop (paginating) when reaching a post whose media have all been downloaded before
+        sync: save the newest post as the high-water mark of the destination (see `save_mark`) if the run is complete: no media failed and the run
+              was not cut off by `count` (otherwise the posts between the previous mark and the oldest post of this run would never be synced)
+        count: (sync only) the `count` of the run, `posts` is expected to yield one more post, which is not downloaded but tells the run was cut off
+        checkpoint: a `QueuedJob` (see jobqueue.py), each processed post is reported to it with `checkpoint.done()`
 
     Returns:
-        bool: True if file already exists and skipped the download process
-        path: full path to the download destination if download succeeded
+        path: full path to the download destination if download succeeded, `NOTHING` if there was no post to download
     """
     is_preloaded = isinstance(posts, list)
-    path = None
+    path = NOTHING
+    complete = True  # -> all posts were processed & completely downloaded, for `sync`
+    if is_preloaded and count is not None and len(posts) > count:
+        posts = posts[:count]
+        complete = False
     total = len(posts) if is_preloaded else None
-    logger.info("Downloading {0} posts {1}...".format(total or "(?)", "with " + str(sum([len(x) for x in posts])) + " media in total" if is_preloaded else ""))
+    logger.info("Downloading %s posts %s...", total or "(?)", "with " + str(sum([len(x) for x in posts])) + " media in total" if is_preloaded else "")
+    if not is_preloaded:
+        posts = prefetch(posts, queue_size)
     downs = exists = 0
+    newest = None  # -> the newest post processed, for `sync`
     # prepare progress bar, hide progress bar when quiet and show download details when debugging
-    with progress(total=total, desc="Processing", ascii=False) as bar:
+    with _open_manifest(dest, directory) as manifest, _metadata_sink(dump_metadata, manifest.path) as sink, \
+            progress(total=total, desc="Processing", ascii=False) as bar:
         for i, p in enumerate(posts, start=1):
+            _check_cancelled()
+            if count is not None and i > count:
+                complete = False
+                break
             bar.set_postfix_str("(" + (p.shortcode if len(p.shortcode) <= 11 else p.shortcode[:8] + "...") + ") " + p.typename)
-            logger.debug("Downloading {0} of {1} posts...".format(i, total or "(?)"))
+            logger.debug("Downloading %s of %s posts...", i, total or "(?)")
             # download
             subdir = to_datetime(p.created_time) + "_" + p.shortcode
             # NOTE: force_subdir if dump_metadata ?
-            path, (d, e) = _down_structure(p, dest, directory, subdir, force_subdir=False)  # `subdir` can also be the filename if the post has only one media
+            path, (d, e) = _down_structure(p, dest, directory, subdir, force_subdir=False, max_workers=max_workers, manifest=manifest)  # `subdir` can also be the filename if the post has only one media
             # dump metadata
-            if dump_metadata:
+            if sink:
+                sink.add(p)
+            elif dump_metadata:
                 filename = subdir + ".json"
                 metadata_file = os.path.join(path, filename)  # path inside the sub directory
-                logger.debug("-> [{0}] dump metadata".format(filename))
+                logger.debug("-> [%s] dump metadata", filename)
                 with open(metadata_file, "w+") as f:
                     json.dump(p.as_dict(), f, indent=4)
             # calcualte total
             downs += d
             exists += e
             bar.update(1)
-    logger.info("{0} total = {1} downloads + {2} exists".format(downs + exists, downs, exists) + " "*10)
+            if checkpoint:
+                checkpoint.done(p.shortcode, complete=d + e == p.media_count)
+            if d + e < p.media_count:
+                complete = False
+            if newest is None or p.created_time > newest[0]:
+                newest = (p.created_time, p.shortcode)
+            if stop_at_archived and not d and e == p.media_count:
+                logger.info("Reached already downloaded post :%s, stopped.", p.shortcode)
+                break
+        if hasattr(posts, "close"):
+            posts.close()  # stop resolving upcoming posts
+        if sync and newest:
+            mark = load_mark(manifest.path)
+            if not complete:
+                logger.warning("Sync run stopped by the count or failed downloads, the high-water mark is not moved to :%s.", newest[1])
+            elif not mark or newest[0] > mark["timestamp"]:
+                save_mark(manifest.path, *newest)
+    logger.info("%d total = %d downloads + %d exists          ", downs + exists, downs, exists)
     if path:  # path is None if error occurred in `_down_structure()`
-        logger.info("Destination: {0}".format(path))
+        logger.info("Destination: %s", path)
     return path
 
 
-def _down_highlights(highlights, dest: str = None, directory: str = None):
+def _down_highlights(highlights, dest: str = None, directory: str = None, max_workers: int = None):
     is_preloaded = isinstance(highlights, list)
-    path = None
+    path = NOTHING
     total = len(highlights) if is_preloaded else None
-    logger.info("Downloading {0} highlights {1}...".format(total or "(?)", "with " + str(sum([len(x) for x in highlights])) + " media in total" if is_preloaded else ""))
+    logger.info("Downloading %s highlights %s...", total or "(?)", "with " + str(sum([len(x) for x in highlights])) + " media in total" if is_preloaded else "")
     downs = exists = 0
     # prepare progress bar, hide progress bar when quiet and show download details when debugging
-    with progress(total=total, desc="Processing", ascii=False) as bar:
+    with _open_manifest(dest, directory) as manifest, progress(total=total, desc="Processing", ascii=False) as bar:
         for i, highlight in enumerate(highlights, start=1):
+            _check_cancelled()
             bar.set_postfix_str("(" + (highlight.title if len(highlight.title) <= 17 else highlight.title[:14] + "...") + ") " + highlight.typename)
-            logger.debug("Downloading {0} of {1} highlights...".format(i, total or "(?)"))
+            logger.debug("Downloading %s of %s highlights...", i, total or "(?)")
             # download
             subdir = highlight.title
             subdir = subdir.replace("/", "-")  # clean
             # NOTE: force_subdir if dump_metadata ?
-            path, (d, e) = _down_structure(highlight, dest, directory, subdir, force_subdir=True)  # `subdir` can also be the filename if the post has only one media
+            path, (d, e) = _down_structure(highlight, dest, directory, subdir, force_subdir=True, max_workers=max_workers, manifest=manifest)  # `subdir` can also be the filename if the post has only one media
             # calcualte total
             downs += d
             exists += e
             bar.update(1)
-    logger.info("{0} total = {1} downloads + {2} exists".format(downs + exists, downs, exists) + " "*10)
+    logger.info("%d total = %d downloads + %d exists          ", downs + exists, downs, exists)
     if path:  # path is None if error occurred in `_down_structure()`
-        logger.info("Destination: {0}".format(path))
+        logger.info("Destination: %s", path)
     return path
 
 
-def _down_igtv(igtv, dest: str = None, directory: str = None, dump_metadata: bool = False):
+def _down_stories(stories, dest: str = None, max_workers: int = None):
+    """Download the stories of many users, each one is stored in its own '@<username>(story)' directory inside `dest`.
+
+    Arguments:
+        stories: an iterable of `Story` instances
+        dest: download destination (should be a directory)
+        max_workers: maximum number of media of a story downloaded at the same time
+
+    Returns:
+        path: full path to the download destination, `NOTHING` if there was no story to download
+    """
+    is_preloaded = isinstance(stories, list)
+    path = NOTHING
+    total = len(stories) if is_preloaded else None
+    logger.info("Downloading %s stories...", total or "(?)")
+    downs = exists = 0
+    with progress(total=total, desc="Processing", ascii=False) as bar:
+        for i, story in enumerate(stories, start=1):
+            _check_cancelled()
+            bar.set_postfix_str("(" + (story.owner_name if len(story.owner_name) <= 17 else story.owner_name[:14] + "...") + ") " + story.typename)
+            logger.debug("Downloading %s of %s stories...", i, total or "(?)")
+            _, (d, e) = _down_structure(story, dest, "@" + story.owner_name + "(story)", max_workers=max_workers)
+            path = os.path.abspath(dest or "./")
+            downs += d
+            exists += e
+            bar.update(1)
+    logger.info("%d total = %d downloads + %d exists          ", downs + exists, downs, exists)
+    if path:
+        logger.info("Destination: %s", path)
+    return path
+
+
+def _down_igtv(igtv, dest: str = None, directory: str = None, dump_metadata: bool = False, max_workers: int = None):
     is_preloaded = isinstance(igtv, list)
-    path = None
+    path = NOTHING
     total = len(igtv) if is_preloaded else None
-    logger.info("Downloading {0} IGTV videos...".format(total or "(?)"))
+    logger.info("Downloading %s IGTV videos...", total or "(?)")
     downs = exists = 0
     # prepare progress bar, hide progress bar when quiet and show download details when debugging
-    with progress(total=total, desc="Processing", ascii=False) as bar:
+    with _open_manifest(dest, directory) as manifest, _metadata_sink(dump_metadata, manifest.path) as sink, \
+            progress(total=total, desc="Processing", ascii=False) as bar:
         for i, video in enumerate(igtv, start=1):
+            _check_cancelled()
             bar.set_postfix_str("(" + (video.title if len(video.title) <= 17 else video.title[:14] + "...") + ") " + video.typename)
-            logger.debug("Downloading {0} of {1} IGTV videos...".format(i, total or "(?)"))
+            logger.debug("Downloading %s of %s IGTV videos...", i, total or "(?)")
             # download
             subdir = video.title
             subdir = subdir.replace("/", "-")  # clean
             # NOTE: force_subdir if dump_metadata ?
-            path, (d, e) = _down_structure(video, dest, directory, subdir, force_subdir=False)  # `subdir` can also be the filename if the post has only one media
+            path, (d, e) = _down_structure(video, dest, directory, subdir, force_subdir=False, max_workers=max_workers, manifest=manifest)  # `subdir` can also be the filename if the post has only one media
             # dump metadata
-            if dump_metadata:
+            if sink:
+                sink.add(video)
+            elif dump_metadata:
                 filename = subdir + ".json"
                 metadata_file = os.path.join(path, filename)  # path inside the sub directory
-                logger.debug("-> [{0}] dump metadata".format(filename))
+                logger.debug("-> [%s] dump metadata", filename)
                 with open(metadata_file, "w+") as f:
                     json.dump(video.as_dict(), f, indent=4)
             # calcualte total
             downs += d
             exists += e
             bar.update(1)
-    logger.info("{0} total = {1} downloads + {2} exists".format(downs + exists, downs, exists) + " "*10)
+    logger.info("%d total = %d downloads + %d exists          ", downs + exists, downs, exists)
     if path:  # path is None if error occurred in `_down_structure()`
-        logger.info("Destination: {0}".format(path))
+        logger.info("Destination: %s", path)
     return path
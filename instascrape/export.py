@@ -0,0 +1,246 @@
+import os
+import csv
+import time
+import json
+import logging
+
+from instascrape.constants import (EXPORT_FLUSH, EXPORT_BATCH)
+
+__all__ = ("FORMATS", "METADATA_FORMATS", "guess_format", "open_writer", "MetadataSink")
+logger = logging.getLogger("instascrape")
+
+FORMATS = ("json", "ndjson", "csv", "txt", "parquet")
+METADATA_FORMATS = ("json", "parquet")
+EXTENSIONS = {".json": "json", ".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv", ".txt": "txt", ".parquet": "parquet"}
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("writing Parquet files requires 'pyarrow', install it with `pip install instascrape-ax[parquet]`")
+    return pyarrow, pyarrow.parquet
+
+
+def guess_format(path: str) -> str:
+    """Guess the dump format from the extension of `path` (default: 'json')."""
+    return EXTENSIONS.get(os.path.splitext(path)[1].lower(), "json")
+
+
+def _flat(record: dict) -> dict:
+    """Encode the values which are not scalars (lists, dicts) as JSON strings, for the tabular formats."""
+    return {key: json.dumps(value) if isinstance(value, (list, dict)) else value for key, value in record.items()}
+
+
+class Writer:
+    """Base class of the dump writers. Records are written to the file as they come, so the memory used stays the same whatever the amount of records.
+    * The file is flushed every `EXPORT_FLUSH` records, so that the records already written can be read while dumping.
+
+    Arguments:
+        path: full path to the dump file
+    """
+
+    mode = "w"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._file = open(path, self.mode, newline="" if self.mode == "w" else None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+    def _write(self, record):
+        raise NotImplementedError
+
+    def write(self, record):
+        self._write(record)
+        self.count += 1
+        if self.count % EXPORT_FLUSH == 0:
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class JSONWriter(Writer):
+    """Writes the records as an indented JSON array."""
+
+    def _write(self, record):
+        self._file.write(",\n" if self.count else "[\n")
+        self._file.write(json.dumps(record, indent=4))
+
+    def close(self):
+        self._file.write("\n]\n" if self.count else "[]\n")
+        Writer.close(self)
+
+
+class NDJSONWriter(Writer):
+    """Writes the records as newline delimited JSON (one JSON object per line)."""
+
+    def _write(self, record):
+        self._file.write(json.dumps(record) + "\n")
+
+
+class CSVWriter(Writer):
+    """Writes the records as CSV rows. The columns are the keys of the first record."""
+
+    def __init__(self, path: str):
+        Writer.__init__(self, path)
+        self._writer = None
+
+    def _write(self, record):
+        if not isinstance(record, dict):
+            record = {"username": record}
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._file, fieldnames=list(record), extrasaction="ignore")
+            self._writer.writeheader()
+        self._writer.writerow(_flat(record))
+
+
+class TextWriter(Writer):
+    """Writes one '@username' line for each record (with the comment text after it for comments)."""
+
+    def _write(self, record):
+        if not isinstance(record, dict):
+            self._file.write("@" + str(record) + "\n")
+        elif "text" in record:
+            self._file.write("@" + record["username"] + ": " + " ".join(record["text"].split("\n")) + "\n")
+        else:
+            self._file.write("@" + record["username"] + "\n")
+
+
+class ParquetWriter(Writer):
+    """Writes the records to a Parquet file, in record batches of `EXPORT_BATCH` records.
+    * Requires the optional dependency `pyarrow` (`pip install instascrape-ax[parquet]`).
+    * If `schema` is not provided, it is inferred from the first batch, columns without any value in it are strings.
+
+    Arguments:
+        path: full path to the dump file
+        schema: `pyarrow.Schema` of the records
+    """
+
+    mode = "wb"
+
+    def __init__(self, path: str, schema=None):
+        self._pa, self._pq = _import_pyarrow()
+        self._schema = schema
+        self._writer = None
+        self._batch = []
+        Writer.__init__(self, path)
+
+    def _flush_batch(self):
+        if not self._batch:
+            return
+        columns = self._schema.names if self._schema else list(self._batch[0])
+        data = {name: [record.get(name) for record in self._batch] for name in columns}
+        if self._schema is None:
+            table = self._pa.Table.from_pydict(data)
+            self._schema = self._pa.schema([self._pa.field(f.name, self._pa.string()) if f.type == self._pa.null() else f for f in table.schema])
+            table = table.cast(self._schema)
+        else:
+            table = self._pa.Table.from_pydict(data, schema=self._schema)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._file, self._schema)
+        self._writer.write_table(table)
+        self._batch = []
+
+    def _write(self, record):
+        if not isinstance(record, dict):
+            record = {"username": record}
+        self._batch.append(_flat(record))
+        if len(self._batch) >= EXPORT_BATCH:
+            self._flush_batch()
+
+    def close(self):
+        self._flush_batch()
+        if self._writer is not None:
+            self._writer.close()
+        Writer.close(self)
+
+
+WRITERS = {"json": JSONWriter, "ndjson": NDJSONWriter, "csv": CSVWriter, "txt": TextWriter, "parquet": ParquetWriter}
+
+
+def open_writer(path: str, fmt: str = None) -> Writer:
+    """Open a streaming writer of dump records.
+
+    Arguments:
+        path: path to the dump file
+        fmt: one of `FORMATS`, guessed from the extension of `path` if not provided
+
+    Returns:
+        Writer: call `write(record)` for each record and `close()` at the end (or use it as a context manager)
+    """
+    fmt = fmt or guess_format(path)
+    if fmt not in WRITERS:
+        raise ValueError("Invalid format: '{0}'. Should be one of {1}.".format(fmt, ", ".join(FORMATS)))
+    logger.debug("Dumping to %s (%s)", path, fmt)
+    return WRITERS[fmt](os.path.abspath(path))
+
+
+class MetadataSink:
+    """Columnar sink of the metadata of downloaded posts, an alternative to the JSON file of each post (`dump_metadata="parquet"`).
+    Rows are appended to Parquet files in the '.metadata' directory of a download directory:
+    * 'posts/<time>.parquet': one row for each post, the columns are the `info_vars` of the post (e.g. `Post.info_vars`)
+    * 'media/<time>.parquet': one row for each media (`Container`) of a post, linked to its post by 'shortcode'
+    Each run writes a new file in each directory in record batches, so the archive grows incrementally and each directory can be queried
+    as a dataset (e.g. `pyarrow.dataset.dataset(path)`, `pandas.read_parquet(path)`) without loading all of it.
+    * Requires the optional dependency `pyarrow` (`pip install instascrape-ax[parquet]`).
+
+    Arguments:
+        path: full path to the download directory
+    """
+
+    INT_FIELDS = ("created_time", "media_count", "likes_count", "comments_count")
+    MEDIA_FIELDS = (("shortcode", "string"), ("index", "int64"), ("typename", "string"), ("src", "string"), ("thumbnail", "string"),
+                    ("width", "int64"), ("height", "int64"), ("video_duration", "float64"))
+
+    def __init__(self, path: str):
+        self._pa = _import_pyarrow()[0]
+        self.path = os.path.join(path, ".metadata")
+        for table in ("posts", "media"):
+            if not os.path.isdir(os.path.join(self.path, table)):
+                os.makedirs(os.path.join(self.path, table))
+        self._filename = "{0}-{1}.parquet".format(time.strftime("%Y%m%d-%H%M%S"), os.getpid())
+        self._fields = None
+        self._posts = None
+        self._media = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+    def _open(self, fields: tuple):
+        """Open the files of this run, with the schema of the first post added."""
+        pa = self._pa
+        self._fields = fields
+        post_schema = pa.schema([(name, pa.int64() if name in self.INT_FIELDS else pa.string()) for name in fields])
+        media_schema = pa.schema([(name, getattr(pa, t)()) for name, t in self.MEDIA_FIELDS])
+        self._posts = ParquetWriter(os.path.join(self.path, "posts", self._filename), post_schema)
+        self._media = ParquetWriter(os.path.join(self.path, "media", self._filename), media_schema)
+        logger.debug("Writing metadata to %s", self.path)
+
+    def add(self, post):
+        """Append the metadata of a post and its media."""
+        if self._posts is None:
+            self._open(post.info_vars)
+        row = post.as_dict()
+        self._posts.write({name: row.get(name) if name in self.INT_FIELDS or row.get(name) is None else str(row[name]) for name in self._fields})
+        for i, c in enumerate(post.obtain_media(), start=1):
+            size = c.size or {}
+            self._media.write({"shortcode": post.shortcode, "index": i, "typename": c.typename, "src": c.src, "thumbnail": c.thumbnail,
+                               "width": size.get("width"), "height": size.get("height"), "video_duration": c.video_duration})
+
+    def close(self):
+        if self._posts is not None:
+            self._posts.close()
+            self._media.close()
@@ -0,0 +1,181 @@
+import re
+import time
+import random
+import logging
+from threading import Lock
+from email.utils import parsedate_to_datetime
+
+import requests
+
+from instascrape.constants import (REQUEST_RATE, MAX_RETRIES)
+from instascrape.exceptions import (ConnectionError, ExtractError, RateLimitedError)
+
+logger = logging.getLogger("instascrape")
+
+
+def endpoint_family(url: str) -> str:
+    """Get the endpoint family of a URL in constants.py, which shares the same rate limit.
+
+    Returns:
+        str: 'query:<query hash>' for GraphQL queries, one of 'post', 'hashtag', 'user' otherwise
+    """
+    query_hash = re.search(r"query_hash=(\w+)", url)
+    if query_hash:
+        return "query:" + query_hash.group(1)
+    if "/p/" in url:
+        return "post"
+    if "/explore/tags/" in url:
+        return "hashtag"
+    return "user"
+
+
+class TokenBucket:
+    """Thread-safe token bucket, which limits the rate of requests of an endpoint family.
+    - The rate is halved every time the requests get rate limited (multiplicative decrease),
+      and raised by `increase` after every `ramp_after` successful requests in a row (additive increase).
+
+    Arguments:
+        rate: initial amount of requests per second
+        capacity: maximum amount of requests sent in a burst
+        min_rate: lower bound of the rate
+        max_rate: upper bound of the rate
+        increase: amount of requests per second added when ramping up
+        ramp_after: amount of successful requests in a row needed to ramp up
+    """
+
+    def __init__(self, rate: float, capacity: int = 3, min_rate: float = 0.05, max_rate: float = 4.0, increase: float = 0.25, ramp_after: int = 10):
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.ramp_after = ramp_after
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._resume = 0  # -> no requests before this (monotonic) time
+        self._successes = 0
+        self._lock = Lock()
+
+    def __repr__(self):
+        return "<TokenBucket rate={0:.2f}/s>".format(self.rate)
+
+    def reserve(self) -> float:
+        """Take a token without blocking.
+
+        Returns:
+            float: seconds to wait before the token can be used
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1  # a negative amount means the tokens are owed
+            return max(0.0, self._resume - now, -self._tokens / self.rate)
+
+    def acquire(self):
+        """Take a token, block until one is available."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def success(self):
+        with self._lock:
+            self._successes += 1
+            if self._successes >= self.ramp_after:
+                self._successes = 0
+                if self.rate < self.max_rate:
+                    self.rate = min(self.max_rate, self.rate + self.increase)
+                    logger.debug("Ramped up request rate to %.2f/s", self.rate)
+
+    def throttle(self, delay: float):
+        """Slow down and hold off all requests for `delay` seconds."""
+        with self._lock:
+            self._successes = 0
+            self._tokens = min(self._tokens, 0)
+            self._resume = max(self._resume, time.monotonic() + delay)
+            self.rate = max(self.min_rate, self.rate / 2)
+
+
+class Governor:
+    """Central governor of the requests of all JSON / GraphQL endpoints.
+    - Each endpoint family (see `endpoint_family`) has its own `TokenBucket`.
+    - Retries with exponential backoff and full jitter when getting HTTP 429 or a 'rate limited' message,
+      or waits for the time given by the `Retry-After` header instead if there is one.
+
+    Arguments:
+        rate: initial amount of requests per second of each endpoint family
+        retries: maximum amount of retries of a rate limited request
+        base_delay: base of the backoff delay in seconds
+        max_delay: upper bound of the backoff delay in seconds
+    """
+
+    def __init__(self, rate: float = REQUEST_RATE, retries: int = MAX_RETRIES, base_delay: float = 2.0, max_delay: float = 300.0):
+        self.rate = rate
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._buckets = {}
+        self._lock = Lock()
+
+    def bucket(self, family: str) -> TokenBucket:
+        with self._lock:
+            if family not in self._buckets:
+                self._buckets[family] = TokenBucket(self.rate)
+            return self._buckets[family]
+
+    def backoff_delay(self, headers, attempt: int) -> float:
+        """Get the delay in seconds before retrying a rate limited request.
+
+        Arguments:
+            headers: headers of the rate limited response
+            attempt: amount of retries done (starts from 0)
+        """
+        retry_after = headers.get("Retry-After")
+        if retry_after:
+            if retry_after.isdigit():
+                return float(retry_after)
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def get_json(self, session: requests.Session, url: str) -> dict:
+        """Send a GET request to `url` when the rate limit allows and decode the JSON response.
+
+        Raises:
+            ConnectionError: if failed to connect
+            ExtractError: if the response is not JSON
+            RateLimitedError: if still rate limited after all retries
+        """
+        family = endpoint_family(url)
+        bucket = self.bucket(family)
+        for attempt in range(self.retries + 1):
+            bucket.acquire()
+            try:
+                resp = session.get(url)
+            except requests.ConnectionError:
+                raise ConnectionError(url)
+
+            limited = resp.status_code == 429
+            if not limited:
+                try:
+                    data = resp.json()
+                except ValueError:
+                    # failed to decode json in first try
+                    # raise ExtractError for subclasses to handle
+                    raise ExtractError("response is not json")
+                limited = isinstance(data, dict) and data.get("message") == "rate limited"
+            if not limited:
+                bucket.success()
+                return data
+
+            if attempt == self.retries:
+                break
+            delay = self.backoff_delay(resp.headers, attempt)
+            bucket.throttle(delay)
+            logger.warning("Rate limited by Instagram, retrying in %.1fs (%s/%s)...", delay, attempt + 1, self.retries)
+        raise RateLimitedError()
+
+
+governor = Governor()
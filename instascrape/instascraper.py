@@ -8,10 +8,14 @@ import requests
 
 from instascrape.constants import *
 from instascrape.structures import *
+from instascrape.structures import fetch_reels
 from instascrape.exceptions import *
 from instascrape.logger import set_logger
-from instascrape.download import (_down_igtv, _down_highlights, _down_posts, _down_structure, _down_from_src)
-from instascrape.utils import (dump_cookie, load_cookie, delete_cookie, instance_worker, instance_generator)
+from instascrape.download import (_down_igtv, _down_highlights, _down_stories, _down_posts, _down_structure, _down_from_src, _metadata_sink, media_session, NOTHING)
+from instascrape.utils import (dump_cookie, load_cookie, delete_cookie, instance_worker, instance_generator, to_datetime, chunks, protection,
+                               load_user_ids, dump_user_ids)
+from instascrape.manifest import load_mark
+from instascrape.cache import cache
 
 
 class LoggerMixin:
@@ -23,11 +27,8 @@ class LoggerMixin:
     @property
     def _logger(self):
         """
-        * `self.level` is defined in subclass.
-        * If `self._level` is None, that means to use th preset `level` and get the exising logger.
+        * The handlers and level are set up once by `set_logger` (in `cli.py`, or by `InstaScraper` when `level` is given), not on each access.
         """
-        if self._level is not None:
-            return set_logger(level=self._level)
         return logging.getLogger("instascrape")
 
 
@@ -42,19 +43,27 @@ class InstaScraper(LoggerMixin):
         cookie: user provided cookie data
         save_cookie: call dump_cookie function to save login cookie data to a pickle file for next use if True *(for `contextmanager` only)
         logout: logout from Instagram if True !(for `contextmanager` only)
+        pool_size: maximum number of kept-alive connections per CDN host used for downloading media (default: `POOL_SIZE`)
+        preload_workers: maximum number of items preloaded at the same time when `preload=True` (default: `PRELOAD_WORKERS`)
+        cache_ttl: seconds the data of a profile or post stays in the shared `cache` (see cache.py), 0 to disable (default: disabled, unless enabled before)
+        cache_dir: full path to a directory to save the cached data of profiles and posts to, so they are reused by later runs
     """
     def __init__(self, username: str = None, password: str = None,
                  user_agent: str = None, cookie: dict = None,
-                 save_cookie: bool = True, logout: bool = True, level: int = None):
+                 save_cookie: bool = True, logout: bool = True, level: int = None, pool_size: int = None,
+                 preload_workers: int = None, cache_ttl: float = None, cache_dir: str = None):
         # Initialise variables
         self.username = username
         self._password = password
         self._save_cookie = save_cookie
         self._logout = logout
         self._level = level
+        if level is not None:
+            set_logger(level)
         self.my_user_id = ""
         self.my_username = ""
         self.logged_in = False
+        self.preload_workers = preload_workers or PRELOAD_WORKERS
         # Prepare requests session
         self._session = requests.Session()
         if cookie:
@@ -64,10 +73,14 @@ class InstaScraper(LoggerMixin):
                                       "Host": "www.instagram.com", "Origin": "https://www.instagram.com",
                                       "Referer": "https://www.instagram.com/", "User-Agent": user_agent or UA,
                                       "X-Instagram-AJAX": "1", "X-Requested-With": "XMLHttpRequest"})
+        # Prepare the shared media download session (connection pool)
+        media_session(pool_size)
+        cache.configure(ttl=cache_ttl, path=cache_dir)
 
     def __enter__(self):
         if self._level is None:
             self._level = 10  # set level to 10 (INFO) if using this class as a context manager (as API)
+            set_logger(self._level)
         # otehrwise if accessed in command line, the logger is already set in `cli.py`
         self.login()
         return self
@@ -141,7 +154,7 @@ class InstaScraper(LoggerMixin):
             # save cookie for later use
             dump_cookie(self.my_username, self._session.cookies)
         self.logged_in = True
-        self._logger.debug("Logged in as {0} ({1})".format(self.my_username, self.my_user_id))
+        self._logger.debug("Logged in as %s (%s)", self.my_username, self.my_user_id)
         return self.my_user_id, self.my_username
 
     def logout(self):
@@ -165,6 +178,34 @@ class InstaScraper(LoggerMixin):
         self._logger.debug("Logged out")
         return True
 
+    def state(self) -> dict:
+        """The logged in state of the session, which is what the command line stores between runs (see `utils.dump_state()`).
+
+        Returns:
+            dict: {"username", "my_username", "my_user_id", "cookies"}
+        """
+        return {"username": self.username, "my_username": self.my_username, "my_user_id": self.my_user_id,
+                "cookies": requests.utils.dict_from_cookiejar(self._session.cookies)}
+
+    @classmethod
+    def from_state(cls, state: dict, **kwargs):
+        """Restore a logged in `InstaScraper` object from its `state()`, without logging in again.
+
+        Arguments:
+            state: the dictionary returned by `state()`
+            **kwargs: other keyword arguments of `InstaScraper`
+
+        Returns:
+            InstaScraper
+        """
+        insta = cls(username=state["username"], cookie=state["cookies"], **kwargs)
+        if "csrftoken" in state["cookies"]:
+            insta._session.headers.update({"X-CSRFToken": state["cookies"]["csrftoken"]})
+        insta.my_username = state["my_username"]
+        insta.my_user_id = state["my_user_id"]
+        insta.logged_in = True
+        return insta
+
     # =============Get Methods===============
 
     # --------------Individuals---------------
@@ -172,26 +213,88 @@ class InstaScraper(LoggerMixin):
     def get_profile(self, name: str) -> Profile:
         """Get a Profile object by a user's username."""
         assert name, "Empty arguments"
-        self._logger.info("Getting @{0}'s profile data...".format(name))
+        self._logger.info("Getting @%s's profile data...", name)
         return Profile(self._session, name=name)
 
     def get_post(self, shortcode: str) -> Post:
         """Get a Post object by a post's shortcode."""
         assert shortcode, "Empty arguments"
-        self._logger.info("Getting :{0} post data...".format(shortcode))
+        self._logger.info("Getting :%s post data...", shortcode)
         return Post(self._session, shortcode=shortcode)
 
     def get_user_story(self, name: str) -> Story:
         """Get a user's Story object by username via Profile object."""
         assert name, "Empty arguments"
         user_id = self.get_profile(name).user_id
-        self._logger.info("Getting @{0}'s story data...".format(name))
+        self._logger.info("Getting @%s's story data...", name)
         return Story(self._session, user_id=user_id)
 
+    def _reels(self, reel_ids: list = (), highlight_reel_ids: list = (), chunk_size: int = REELS_CHUNK):
+        """Yields (id, reel data) of the stories of users (`reel_ids`) and highlight reels, which are queried in chunks of `chunk_size` ids per request.
+        * If the data of a chunk cannot be extracted, its ids are queried again one at a time, so that one bad id does not drop the others.
+        * The ids with no reel found are left out, as well as the ids which still failed (logged).
+        * Other errors (e.g. rate limited, connection errors) are raised, as querying the ids one at a time would only send more requests.
+        """
+        for key, ids in (("reel_ids", reel_ids), ("highlight_reel_ids", highlight_reel_ids)):
+            for chunk in chunks(ids, chunk_size):
+                self._logger.debug("Getting data of %s reels...", len(chunk))
+                try:
+                    reels = fetch_reels(self._session, **{key: chunk})
+                except ExtractError as e:
+                    if len(chunk) == 1:
+                        self._logger.error("Reel (%s): %s", chunk[0], e)
+                        continue
+                    self._logger.warning("Failed to get %s reels (%s), retrying one at a time...", len(chunk), e)
+                    reels = {}
+                    for id in chunk:
+                        try:
+                            reels.update(fetch_reels(self._session, **{key: [id]}))
+                        except ExtractError as e:
+                            self._logger.error("Reel (%s): %s", id, e)
+                for id in chunk:
+                    if id in reels:
+                        yield id, reels[id]
+
+    def get_user_stories(self, user_ids: list, chunk_size: int = REELS_CHUNK):
+        """Get the Story objects of many users at once, `chunk_size` users per request.
+
+        Arguments:
+            user_ids: user ids of the users
+            chunk_size: maximum amount of stories queried in one request
+
+        Returns:
+            generator: which yields `Story` instances, users without stories are left out
+        """
+        self._logger.info("Getting story data of %s users...", len(user_ids))
+        for user_id, data in self._reels(reel_ids=user_ids, chunk_size=chunk_size):
+            yield Story(self._session, user_id=user_id, data=data)
+
+    def get_user_ids(self, names: list) -> dict:
+        """Get the user ids of users by their usernames.
+        * The mapping is cached in a file for `USER_IDS_TTL` seconds (see `load_user_ids()`), only the usernames missing from the cache are looked up (one profile request each).
+
+        Arguments:
+            names: usernames of the users
+
+        Returns:
+            dict: {<username>: <user id>}, the users not found are left out
+        """
+        ids = load_user_ids()
+        missing = [name for name in names if name not in ids]
+        if missing:
+            self._logger.info("Looking up user ids of %s users (%s cached)...", len(missing), len(names) - len(missing))
+            found = {}
+            for name in missing:
+                with protection("Profile", name):
+                    found[name] = self.get_profile(name).user_id
+            dump_user_ids(found)
+            ids.update(found)
+        return dict((name, ids[name]) for name in names if name in ids)
+
     def get_hashtag_story(self, tag: str) -> Story:
         """Get a hashtag's Story object by hashtag name."""
         assert tag, "Empty arguments"
-        self._logger.info("Getting #{0} story data...".format(tag))
+        self._logger.info("Getting #%s story data...", tag)
         return Story(self._session, tag=tag)
 
     # ------------From File------------------
@@ -206,7 +309,7 @@ class InstaScraper(LoggerMixin):
                 self._logger.error("No data can be retrieved from file.")
                 return []
             if preload:
-                return instance_worker(self._session, obj, lines)
+                return instance_worker(self._session, obj, lines, self.preload_workers)
             else:
                 return instance_generator(self._session, obj, lines)
         finally:
@@ -244,28 +347,31 @@ class InstaScraper(LoggerMixin):
 
     # ------------Profile Based--------------
 
-    def get_user_highlights(self, name: str, preload: bool = False):
-        """Get a user's story highlights.
+    def get_user_highlights(self, name: str, preload: bool = False, chunk_size: int = REELS_CHUNK):
+        """Get a user's story highlights. The highlights are queried in chunks of `chunk_size` highlights per request.
 
         Arguments:
             name: the user's username
             preload: convert all items in the iterable to `Highlight` instances before downloading if True
+            chunk_size: maximum amount of highlights queried in one request
 
         Returns:
              list: if preload=True, which contains `Highlight` instances
             generator: if preload=False, which yields `Highlight` instances
         """
         assert name, "Empty arguments"
-        self._logger.info("Fetching @{0}'s story highlights...".format(name))
+        self._logger.info("Fetching @%s's story highlights...", name)
         user = self.get_profile(name)
         highlights = user.fetch_highlights()
         if not highlights:
-            self._logger.error("No story highlights found for @{0}.".format(name))
+            self._logger.error("No story highlights found for @%s.", name)
             return []
+        titles = dict((id, title) for title, id in highlights)
+        generator = (Highlight(self._session, titles[id], id, data=data) for id, data in self._reels(highlight_reel_ids=list(titles), chunk_size=chunk_size))
         if preload:
-            return instance_worker(self._session, Highlight, highlights)
+            return list(generator)
         else:
-            return instance_generator(self._session, Highlight, highlights)
+            return generator
 
     def get_user_igtv(self, name: str, preload: bool = False):
         """Get a user's IGTV videos.
@@ -279,18 +385,18 @@ class InstaScraper(LoggerMixin):
             generator: if preload=False, which yields `IGTV` instances
         """
         assert name, "Empty arguments"
-        self._logger.info("Fetching @{0}'s IGTV...".format(name))
+        self._logger.info("Fetching @%s's IGTV...", name)
         user = self.get_profile(name)
         igtv = user.fetch_igtv()
         if not igtv:
-            self._logger.error("No IGTV videos found for @{0}.".format(name))
+            self._logger.error("No IGTV videos found for @%s.", name)
             return []
         if preload:
-            return instance_worker(self._session, IGTV, igtv)
+            return instance_worker(self._session, IGTV, igtv, self.preload_workers)
         else:
             return instance_generator(self._session, IGTV, igtv)
 
-    def get_user_timeline_posts(self, name: str, count: int = 50, only: str = None, timestamp_limit: dict = None, preload: bool = False):
+    def get_user_timeline_posts(self, name: str, count: int = 50, only: str = None, timestamp_limit: dict = None, preload: bool = False, checkpoint=None):
         """Get a user's timeline posts in the form of `Post` objects
 
         Arguments:
@@ -299,24 +405,27 @@ class InstaScraper(LoggerMixin):
             only: only this type of posts will be downloaded [image, video, sidecar]
             timestamp_limit: only get posts created between these timestamps, {"before": <before timestamp>, "after", <after_timestamp>}
             preload: converts all items yielded from the generator to `Post` instances and returns a list if True
+            checkpoint: a `QueuedJob` (see jobqueue.py), resume the pagination from its cursor and skip the posts it has finished
 
         Returns:
             list: if preload=True, which contains `Post` instances
             generator: if preload=False, which yields `Post` instances
         """
         assert name, "Empty arguments"
-        self._logger.info("Fetching @{0}'s timeline posts...".format(name))
+        self._logger.info("Fetching @%s's timeline posts...", name)
         user = self.get_profile(name)
-        posts = user.fetch_timeline_posts(count, only, timestamp_limit)
+        posts = user.fetch_timeline_posts(count, only, timestamp_limit, nodes=True, **(checkpoint.page_kwargs() if checkpoint else {}))
         if next(posts) is False:
-            self._logger.error("No timeline posts found for @{0}.".format(name))
+            self._logger.error("No timeline posts found for @%s.", name)
             return []
+        if checkpoint:
+            posts = checkpoint.filter(posts)
         if preload:
-            return instance_worker(self._session, Post, posts)
+            return instance_worker(self._session, Post, posts, self.preload_workers)
         else:
             return instance_generator(self._session, Post, posts)
 
-    def get_self_saved_posts(self, count: int = 50, only: str = None, timestamp_limit: dict = None, preload: bool = False):
+    def get_self_saved_posts(self, count: int = 50, only: str = None, timestamp_limit: dict = None, preload: bool = False, checkpoint=None):
         """Get self saved posts in the form of `Post` objects.
 
         Arguments:
@@ -324,24 +433,27 @@ class InstaScraper(LoggerMixin):
             only: only this type of posts will be downloaded [image, video, sidecar]
             timestamp_limit: only get posts created between these timestamps, {"before": <before timestamp>, "after", <after_timestamp>}
             preload: converts all items yielded from the generator to `Post` instances and returns a list if True
+            checkpoint: a `QueuedJob` (see jobqueue.py), resume the pagination from its cursor and skip the posts it has finished
 
         Returns:
             list: if preload=True, which contains `Post` instances
             generator: if preload=False, which yields `Post` instances
         """
         assert self.my_username, "Empty arguments"
-        self._logger.info("Fetching @{0}'s saved posts...".format(self.my_username))
+        self._logger.info("Fetching @%s's saved posts...", self.my_username)
         user = self.get_profile(self.my_username)
-        posts = user.fetch_saved_posts(count, only, timestamp_limit)
+        posts = user.fetch_saved_posts(count, only, timestamp_limit, nodes=True, **(checkpoint.page_kwargs() if checkpoint else {}))
         if next(posts) is False:
-            self._logger.error("No saved posts found for @{0}.".format(self.my_username))
+            self._logger.error("No saved posts found for @%s.", self.my_username)
             return []
+        if checkpoint:
+            posts = checkpoint.filter(posts)
         if preload:
-            return instance_worker(self._session, Post, posts)
+            return instance_worker(self._session, Post, posts, self.preload_workers)
         else:
             return instance_generator(self._session, Post, posts)
 
-    def get_user_tagged_posts(self, name: str, count: int = 50, only: str = None, timestamp_limit: dict = None, preload: bool = False):
+    def get_user_tagged_posts(self, name: str, count: int = 50, only: str = None, timestamp_limit: dict = None, preload: bool = False, checkpoint=None):
         """Get posts that tagged the user in the form of `Post` objects.
 
         Arguments:
@@ -350,20 +462,23 @@ class InstaScraper(LoggerMixin):
             only: only this type of posts will be downloaded [image, video, sidecar]
             timestamp_limit: only get posts created between these timestamps, {"before": <before timestamp>, "after", <after_timestamp>}
             preload: converts all items yielded from the generator to `Post` instances and returns a list if True
+            checkpoint: a `QueuedJob` (see jobqueue.py), resume the pagination from its cursor and skip the posts it has finished
 
         Returns:
             list: if preload=True, which contains `Post` instances
             generator: if preload=False, which yields `Post` instances
         """
         assert name, "Empty arguments"
-        self._logger.info("Fetching @{0}'s tagged posts...".format(name))
+        self._logger.info("Fetching @%s's tagged posts...", name)
         user = self.get_profile(name)
-        posts = user.fetch_tagged_posts(count, only, timestamp_limit)
+        posts = user.fetch_tagged_posts(count, only, timestamp_limit, nodes=True, **(checkpoint.page_kwargs() if checkpoint else {}))
         if next(posts) is False:
-            self._logger.error("No tagged posts found for @{0}.".format(name))
+            self._logger.error("No tagged posts found for @%s.", name)
             return []
+        if checkpoint:
+            posts = checkpoint.filter(posts)
         if preload:
-            return instance_worker(self._session, Post, posts)
+            return instance_worker(self._session, Post, posts, self.preload_workers)
         else:
             return instance_generator(self._session, Post, posts)
 
@@ -381,16 +496,16 @@ class InstaScraper(LoggerMixin):
             generator: if preload=False, which yields `Profile` instances
         """
         assert name, "Empty arguments"
-        self._logger.info("Fetching @{0}'s followers...".format(name))
+        self._logger.info("Fetching @%s's followers...", name)
         user = self.get_profile(name)
         usernames = user.fetch_followers(count)
         if next(usernames) is False:
-            self._logger.error("No followers found for @{0}.".format(name))
+            self._logger.error("No followers found for @%s.", name)
             return []
         if not convert:
             return usernames
         if preload:
-            return instance_worker(self._session, Profile, usernames)
+            return instance_worker(self._session, Profile, usernames, self.preload_workers)
         else:
             return instance_generator(self._session, Profile, usernames)
 
@@ -408,22 +523,22 @@ class InstaScraper(LoggerMixin):
             generator: if preload=False, which yields `Profile` instances
         """
         assert name, "Empty arguments"
-        self._logger.info("Fetching @{0}'s followings...".format(name))
+        self._logger.info("Fetching @%s's followings...", name)
         user = self.get_profile(name)
         usernames = user.fetch_followings(count)
         if next(usernames) is False:
-            self._logger.error("No following users found for @{0}.".format(name))
+            self._logger.error("No following users found for @%s.", name)
             return []
         if not convert:
             return usernames
         if preload:
-            return instance_worker(self._session, Profile, usernames)
+            return instance_worker(self._session, Profile, usernames, self.preload_workers)
         else:
             return instance_generator(self._session, Profile, usernames)
 
     # -------------Feed Based---------------
 
-    def get_hashtag_posts(self, tag: str, count: int = 50, only: str = None, timestamp_limit: dict = None, preload: bool = False):
+    def get_hashtag_posts(self, tag: str, count: int = 50, only: str = None, timestamp_limit: dict = None, preload: bool = False, checkpoint=None):
         """Get posts with the hashtag name in the form of `Post` objects.
 
         Arguments:
@@ -432,24 +547,27 @@ class InstaScraper(LoggerMixin):
             only: only this type of posts will be downloaded [image, video, sidecar]
             timestamp_limit: only get posts created between these timestamps, {"before": <before timestamp>, "after", <after_timestamp>}
             preload: converts all items yielded from the generator to `Post` instances and returns a list if True
+            checkpoint: a `QueuedJob` (see jobqueue.py), resume the pagination from its cursor and skip the posts it has finished
 
         Returns:
             list: if preload=True, which contains `Post` instances
             generator: if preload=False, which yields `Post` instances
         """
         assert tag, "Empty arguments"
-        self._logger.info("Fetching hashtag posts of #{0}...".format(tag))
+        self._logger.info("Fetching hashtag posts of #%s...", tag)
         hashtag = Hashtag(self._session, tag)
-        posts = hashtag.fetch_posts(count, only, timestamp_limit)
+        posts = hashtag.fetch_posts(count, only, timestamp_limit, nodes=True, **(checkpoint.page_kwargs() if checkpoint else {}))
         if next(posts) is False:
-            self._logger.error("No hashtag posts found for #{0}.".format(tag))
+            self._logger.error("No hashtag posts found for #%s.", tag)
             return []
+        if checkpoint:
+            posts = checkpoint.filter(posts)
         if preload:
-            return instance_worker(self._session, Post, posts)
+            return instance_worker(self._session, Post, posts, self.preload_workers)
         else:
             return instance_generator(self._session, Post, posts)
 
-    def get_explore_posts(self, count: int = 50, only: str = None, timestamp_limit: dict = None, preload: bool = False):
+    def get_explore_posts(self, count: int = 50, only: str = None, timestamp_limit: dict = None, preload: bool = False, checkpoint=None):
         """Get posts in the 'discover' feed section, in the form of `Post` objects.
 
         Arguments:
@@ -457,6 +575,7 @@ class InstaScraper(LoggerMixin):
             only: only this type of posts will be downloaded [image, video, sidecar]
             timestamp_limit: only get posts created between these timestamps, {"before": <before timestamp>, "after", <after_timestamp>}
             preload: converts all items yielded from the generator to `Post` instances and returns a list if True
+            checkpoint: a `QueuedJob` (see jobqueue.py), resume the pagination from its cursor and skip the posts it has finished
 
         Returns:
             list: if preload=True, which contains `Post` instances
@@ -464,12 +583,14 @@ class InstaScraper(LoggerMixin):
         """
         self._logger.info("Fetching explore posts...")
         explore = Explore(self._session)
-        posts = explore.fetch_posts(count, only, timestamp_limit)
+        posts = explore.fetch_posts(count, only, timestamp_limit, nodes=True, **(checkpoint.page_kwargs() if checkpoint else {}))
         if next(posts) is False:
             self._logger.error("No explore feed posts found.")
             return []
+        if checkpoint:
+            posts = checkpoint.filter(posts)
         if preload:
-            return instance_worker(self._session, Post, posts)
+            return instance_worker(self._session, Post, posts, self.preload_workers)
         else:
             return instance_generator(self._session, Post, posts)
 
@@ -489,7 +610,7 @@ class InstaScraper(LoggerMixin):
             generator: if preload=False, which yields `Profile` instances
         """
         assert shortcode, "Empty arguments"
-        self._logger.info("Fetching likes of :{0}".format(shortcode))
+        self._logger.info("Fetching likes of :%s", shortcode)
         post = self.get_post(shortcode)
         likes = post.fetch_likes(count)
         if next(likes) is False:
@@ -498,7 +619,7 @@ class InstaScraper(LoggerMixin):
         if not convert:
             return likes
         if preload:
-            return instance_worker(self._session, Profile, likes)
+            return instance_worker(self._session, Profile, likes, self.preload_workers)
         else:
             return instance_generator(self._session, Profile, likes)
 
@@ -513,7 +634,7 @@ class InstaScraper(LoggerMixin):
             generator: yields dictionaries of {"username": <string>, "text": <string>, "time": <string>}
         """
         assert shortcode, "Empty arguments"
-        self._logger.info("Fetching comments of :{0}".format(shortcode))
+        self._logger.info("Fetching comments of :%s", shortcode)
         post = self.get_post(shortcode)
         comments = post.fetch_comments(count)
         if next(comments) is False:
@@ -525,82 +646,126 @@ class InstaScraper(LoggerMixin):
 
     # -------------Individuals---------------
 
-    def download_post(self, shortcode: str, dest: str = None, dump_metadata: bool = False) -> str:
+    def download_post(self, shortcode: str, dest: str = None, dump_metadata: bool or str = False, max_workers: int = None) -> str:
         p = self.get_post(shortcode)
-        self._logger.info("Downloading {0} with {1} media...".format(shortcode, len(p)))
+        self._logger.info("Downloading %s with %s media...", shortcode, len(p))
+        json_metadata = dump_metadata and dump_metadata != "parquet"
         # subdir = to_datetime(p.created_time) + "_" + p.shortcode
-        path, _ = _down_structure(p, dest, subdir=p.shortcode, force_subdir=dump_metadata)
-        if dump_metadata:
+        path, _ = _down_structure(p, dest, subdir=p.shortcode, force_subdir=json_metadata, max_workers=max_workers)
+        if dump_metadata == "parquet":
+            with _metadata_sink(dump_metadata, path) as sink:
+                sink.add(p)
+        elif json_metadata:
             filename = p.shortcode + ".json"
             metadata_file = os.path.join(path, p.shortcode, filename)
-            self._logger.debug("-> [{0}] dump metadata".format(filename))
+            self._logger.debug("-> [%s] dump metadata", filename)
             with open(metadata_file, "w+") as f:
                 json.dump(p.as_dict(), f, indent=4)
         if path:
-            self._logger.info("Destination: {0}".format(path))
+            self._logger.info("Destination: %s", path)
         return path
 
     def download_user_profile_pic(self, name: str, dest: str = None) -> str:
         user = self.get_profile(name)
-        self._logger.info("Downloading {0}'s profile picture...".format(name))
+        self._logger.info("Downloading %s's profile picture...", name)
         path = _down_from_src(user.profile_pic, name, dest)
         if path:
-            self._logger.info("Destination: {0}".format(path))
+            self._logger.info("Destination: %s", path)
         return path
 
-    def download_user_story(self, name: str, dest: str = None) -> str:
+    def download_user_story(self, name: str, dest: str = None, max_workers: int = None) -> str:
         story = self.get_user_story(name)
-        self._logger.info("Downloading @{0}'s with {1} media...".format(name, len(story)))
-        path, _ = _down_structure(story, dest, directory="@" + story.owner_name + "(story)")
+        self._logger.info("Downloading @%s's with %s media...", name, len(story))
+        path, _ = _down_structure(story, dest, directory="@" + story.owner_name + "(story)", max_workers=max_workers)
         if path:
-            self._logger.info("Destination: {0}".format(path))
+            self._logger.info("Destination: %s", path)
         return path
 
-    def download_hashtag_story(self, tag: str, dest: str = None) -> str:
+    def download_users_stories(self, names: list, dest: str = None, max_workers: int = None, chunk_size: int = REELS_CHUNK) -> str or None:
+        """Download the stories of many users. Each user's story is stored in a '@<username>(story)' directory inside `dest`.
+        * User ids are resolved through the cache of `get_user_ids()`, and stories are queried `chunk_size` users per request,
+          so a sweep of N (cached) users costs about N / `chunk_size` requests.
+
+        Arguments:
+            names: usernames of the users
+            dest: path to the destination of the download files
+            max_workers: maximum number of media of a story downloaded at the same time
+            chunk_size: maximum amount of stories queried in one request
+
+        Returns:
+            path: full path to the download destination, or `NOTHING` ('') if no stories were found
+        """
+        user_ids = self.get_user_ids(names)
+        if not user_ids:
+            return NOTHING
+        user_ids = list(dict.fromkeys(user_ids.values()))  # drop duplicates, keep the order
+        return _down_stories(self.get_user_stories(user_ids, chunk_size), dest, max_workers=max_workers)
+
+    def download_hashtag_story(self, tag: str, dest: str = None, max_workers: int = None) -> str:
         story = self.get_hashtag_story(tag)
-        self._logger.info("Downloading story of #{0} with {1} media...".format(tag, len(story)))
-        path, _ = _down_structure(story, dest, directory="#" + story.owner_name + "(story)")
+        self._logger.info("Downloading story of #%s with %s media...", tag, len(story))
+        path, _ = _down_structure(story, dest, directory="#" + story.owner_name + "(story)", max_workers=max_workers)
         if path:
-            self._logger.info("Destination: {0}".format(path))
+            self._logger.info("Destination: %s", path)
         return path
 
+    def _sync_timestamp_limit(self, dest: str, directory: str, timestamp_limit: dict = None) -> (dict or None, bool):
+        """Get the `timestamp_limit` of a sync run, which only lets posts created after the high-water mark of the destination (see `load_mark`) through.
+
+        Returns:
+            dict: the `timestamp_limit`
+            bool: whether the destination has a high-water mark
+        """
+        mark = load_mark(os.path.join(os.path.abspath(dest or "./"), directory))
+        if not mark:
+            self._logger.info("No previous sync found in '%s'.", directory)
+            return timestamp_limit, False
+        self._logger.info("Syncing posts created after :%s (%s)...", mark["shortcode"], to_datetime(mark["timestamp"]))
+        timestamp_limit = dict(timestamp_limit or {})
+        timestamp_limit["after"] = max(timestamp_limit.get("after") or 0, mark["timestamp"])
+        return timestamp_limit, True
+
     # -------------Profile Based--------------
 
-    def download_user_igtv(self, name: str, dest: str = None, preload: bool = False, dump_metadata: bool = False) -> str or None:
+    def download_user_igtv(self, name: str, dest: str = None, preload: bool = False, dump_metadata: bool or str = False, max_workers: int = None) -> str or None:
         """Download a user's IGTV videos.
 
         Arguments:
             name: the user's username
             dest: path to the destination of the download files
             preload: convert all items in the iterable to `IGTV` instances before downloading if True
-            dump_metadata: force create a sub directory of the post and dump metadata of IGTV post to a file inside if True
+            dump_metadata: force create a sub directory of the post and dump metadata of IGTV post to a file inside if True or 'json',
+                           append it to Parquet files in the '.metadata' directory of the destination if 'parquet' (see `MetadataSink`)
+            max_workers: maximum number of media downloaded at the same time
 
         Returns:
-            path: full path to the download destination, or None if download failed
+            path: full path to the download destination, or `NOTHING` ('') if there was nothing to download
         """
         igtv = self.get_user_igtv(name, preload)
         if not igtv:
-            return None
-        return _down_igtv(igtv, dest, directory="@" + name + "(igtv)", dump_metadata=dump_metadata)
+            return NOTHING
+        return _down_igtv(igtv, dest, directory="@" + name + "(igtv)", dump_metadata=dump_metadata, max_workers=max_workers)
 
-    def download_user_highlights(self, name: str, dest: str = None, preload: bool = False) -> str or None:
+    def download_user_highlights(self, name: str, dest: str = None, preload: bool = False, max_workers: int = None) -> str or None:
         """Download a user's story highlights.
 
         Arguments:
             name: the user's username
             dest: path to the destination of the download files
             preload: convert all items in the iterable to `Highlight` instances before downloading if True
+            max_workers: maximum number of media downloaded at the same time
 
         Returns:
-            path: full path to the download destination, or None if download failed
+            path: full path to the download destination, or `NOTHING` ('') if there was nothing to download
         """
         highlights = self.get_user_highlights(name, preload)
         if not highlights:
-            return None
-        return _down_highlights(highlights, dest, directory="@" + name + "(highlights)")
+            return NOTHING
+        return _down_highlights(highlights, dest, directory="@" + name + "(highlights)", max_workers=max_workers)
 
     def download_user_timeline_posts(self, name: str, count: int = 50, only: str = None, dest: str = None, timestamp_limit: dict = None,
-                                     preload: bool = False, dump_metadata: bool = False) -> str or None:
+                                     preload: bool = False, dump_metadata: bool or str = False, max_workers: int = None,
+                                     stop_at_archived: bool = False, sync: bool = False, checkpoint=None) -> str or None:
         """Download a user's timeline posts.
 
         Arguments:
@@ -610,18 +775,31 @@ class InstaScraper(LoggerMixin):
             dest: path to the destination of the download files
             timestamp_limit: only get posts created between these timestamps, {"before": <before timestamp>, "after", <after_timestamp>}
             preload: convert all items in the iterable to `Post` instances before downloading if True
-            dump_metadata: force create a sub directory of the post and dump metadata of each post to a file inside if True
+            dump_metadata: force create a sub directory of the post and dump metadata of each post to a file inside if True or 'json',
+                           append it to Parquet files in the '.metadata' directory of the destination if 'parquet' (see `MetadataSink`)
+            max_workers: maximum number of media of a post downloaded at the same time
+            stop_at_archived: stop when reaching a post whose media have all been downloaded to `dest` before
+            sync: only download posts created after the newest post of the last sync run (implies `stop_at_archived` on the first sync run), and record
+                  the newest post of this run if all the posts up to the last one were downloaded (not cut off by `count`, no media failed)
+            checkpoint: a `QueuedJob` (see jobqueue.py), which records the progress of the download so that it can be resumed
 
         Returns:
-            path: full path to the download destination, or None if download failed
+            path: full path to the download destination, or `NOTHING` ('') if there was nothing to download
         """
-        posts = self.get_user_timeline_posts(name, count, only, timestamp_limit, preload)
+        directory = "@" + name
+        marked = False
+        if sync:
+            timestamp_limit, marked = self._sync_timestamp_limit(dest, directory, timestamp_limit)
+        # -> a sync run paginates one more post than `count`, to tell whether it was cut off by the count
+        posts = self.get_user_timeline_posts(name, count + 1 if sync else count, only, timestamp_limit, preload, checkpoint)
         if not posts:
-            return None
-        return _down_posts(posts, dest, directory="@" + name, dump_metadata=dump_metadata)
+            return NOTHING
+        return _down_posts(posts, dest, directory=directory, dump_metadata=dump_metadata, max_workers=max_workers,
+                           stop_at_archived=stop_at_archived or (sync and not marked), sync=sync, count=count if sync else None, checkpoint=checkpoint)
 
     def download_self_saved_posts(self, count: int = 50, only: str = None, dest: str = None, timestamp_limit: dict = None,
-                                  preload: bool = False, dump_metadata: bool = False) -> str or None:
+                                  preload: bool = False, dump_metadata: bool or str = False, max_workers: int = None,
+                                  stop_at_archived: bool = False, checkpoint=None) -> str or None:
         """Download self saved posts.
 
         Arguments:
@@ -630,18 +808,23 @@ class InstaScraper(LoggerMixin):
             dest: path to the destination of the download files
             timestamp_limit: only get posts created between these timestamps, {"before": <before timestamp>, "after", <after_timestamp>}
             preload: convert all items in the iterable to `Post` instances before downloading if True
-            dump_metadata: force create a sub directory of the post and dump metadata of each post to a file inside if True
+            dump_metadata: force create a sub directory of the post and dump metadata of each post to a file inside if True or 'json',
+                           append it to Parquet files in the '.metadata' directory of the destination if 'parquet' (see `MetadataSink`)
+            max_workers: maximum number of media of a post downloaded at the same time
+            stop_at_archived: stop when reaching a post whose media have all been downloaded to `dest` before
+            checkpoint: a `QueuedJob` (see jobqueue.py), which records the progress of the download so that it can be resumed
 
         Returns:
-            path: full path to the download destination, or None if download failed
+            path: full path to the download destination, or `NOTHING` ('') if there was nothing to download
         """
-        posts = self.get_self_saved_posts(count, only, timestamp_limit, preload)
+        posts = self.get_self_saved_posts(count, only, timestamp_limit, preload, checkpoint)
         if not posts:
-            return None
-        return _down_posts(posts, dest, directory="saved", dump_metadata=dump_metadata)
+            return NOTHING
+        return _down_posts(posts, dest, directory="saved", dump_metadata=dump_metadata, max_workers=max_workers, stop_at_archived=stop_at_archived, checkpoint=checkpoint)
 
     def download_user_tagged_posts(self, name: str, count: int = 50, only: str = None, dest: str = None, timestamp_limit: dict = None,
-                                   preload: bool = False, dump_metadata: bool = False) -> str or None:
+                                   preload: bool = False, dump_metadata: bool or str = False, max_workers: int = None,
+                                   stop_at_archived: bool = False, checkpoint=None) -> str or None:
         """Download posts that tagged the user.
 
         Arguments:
@@ -651,20 +834,25 @@ class InstaScraper(LoggerMixin):
             dest: path to the destination of the download files
             timestamp_limit: only get posts created between these timestamps, {"before": <before timestamp>, "after", <after_timestamp>}
             preload: convert all items in the iterable to `Post` instances before downloading if True
-            dump_metadata: force create a sub directory of the post and dump metadata of each post to a file inside if True
+            dump_metadata: force create a sub directory of the post and dump metadata of each post to a file inside if True or 'json',
+                           append it to Parquet files in the '.metadata' directory of the destination if 'parquet' (see `MetadataSink`)
+            max_workers: maximum number of media of a post downloaded at the same time
+            stop_at_archived: stop when reaching a post whose media have all been downloaded to `dest` before
+            checkpoint: a `QueuedJob` (see jobqueue.py), which records the progress of the download so that it can be resumed
 
         Returns:
-            path: full path to the download destination, or None if download failed
+            path: full path to the download destination, or `NOTHING` ('') if there was nothing to download
         """
-        posts = self.get_user_tagged_posts(name, count, only, timestamp_limit, preload)
+        posts = self.get_user_tagged_posts(name, count, only, timestamp_limit, preload, checkpoint)
         if not posts:
-            return None
-        return _down_posts(posts, dest, directory="@" + name + "(tagged)", dump_metadata=dump_metadata)
+            return NOTHING
+        return _down_posts(posts, dest, directory="@" + name + "(tagged)", dump_metadata=dump_metadata, max_workers=max_workers, stop_at_archived=stop_at_archived, checkpoint=checkpoint)
 
     # ----------------Feed Based----------------
 
     def download_hashtag_posts(self, tag: str, count: int = 50, only: str = None, dest: str = None, timestamp_limit: dict = None,
-                               preload: bool = False, dump_metadata: bool = False) -> str or None:
+                               preload: bool = False, dump_metadata: bool or str = False, max_workers: int = None,
+                               stop_at_archived: bool = False, sync: bool = False, checkpoint=None) -> str or None:
         """Download posts with the given tag.
 
         Arguments:
@@ -674,18 +862,31 @@ class InstaScraper(LoggerMixin):
             dest: path to the destination of the download files
             timestamp_limit: only get posts created between these timestamps, {"before": <before timestamp>, "after", <after_timestamp>}
             preload: convert all items in the iterable to `Post` instances before downloading if True
-            dump_metadata: force create a sub directory of the post and dump metadata of each post to a file inside if True
+            dump_metadata: force create a sub directory of the post and dump metadata of each post to a file inside if True or 'json',
+                           append it to Parquet files in the '.metadata' directory of the destination if 'parquet' (see `MetadataSink`)
+            max_workers: maximum number of media of a post downloaded at the same time
+            stop_at_archived: stop when reaching a post whose media have all been downloaded to `dest` before
+            sync: only download posts created after the newest post of the last sync run (implies `stop_at_archived` on the first sync run), and record
+                  the newest post of this run if all the posts up to the last one were downloaded (not cut off by `count`, no media failed)
+            checkpoint: a `QueuedJob` (see jobqueue.py), which records the progress of the download so that it can be resumed
 
         Returns:
-            path: full path to the download destination, or None if download failed
+            path: full path to the download destination, or `NOTHING` ('') if there was nothing to download
         """
-        posts = self.get_hashtag_posts(tag, count, only, timestamp_limit, preload)
+        directory = "#" + tag
+        marked = False
+        if sync:
+            timestamp_limit, marked = self._sync_timestamp_limit(dest, directory, timestamp_limit)
+        # -> a sync run paginates one more post than `count`, to tell whether it was cut off by the count
+        posts = self.get_hashtag_posts(tag, count + 1 if sync else count, only, timestamp_limit, preload, checkpoint)
         if not posts:
-            return
-        return _down_posts(posts, dest, directory="#" + tag, dump_metadata=dump_metadata)
+            return NOTHING
+        return _down_posts(posts, dest, directory=directory, dump_metadata=dump_metadata, max_workers=max_workers,
+                           stop_at_archived=stop_at_archived or (sync and not marked), sync=sync, count=count if sync else None, checkpoint=checkpoint)
 
     def download_explore_posts(self, count: int = 50, only: str = None, dest: str = None, timestamp_limit: dict = None,
-                               preload: bool = False, dump_metadata: bool = False) -> str or None:
+                               preload: bool = False, dump_metadata: bool or str = False, max_workers: int = None,
+                               stop_at_archived: bool = False, checkpoint=None) -> str or None:
         """Download 'explore' posts feed in the 'discover' section.
         * Download to a directory named
 
@@ -695,12 +896,16 @@ class InstaScraper(LoggerMixin):
             dest: path to the destination of the download files
             timestamp_limit: only get posts created between these timestamps, {"before": <before timestamp>, "after", <after_timestamp>}
             preload: convert all items in the iterable to `Post` instances before downloading if True
-            dump_metadata: force create a sub directory of the post and dump metadata of each post to a file inside if True
+            dump_metadata: force create a sub directory of the post and dump metadata of each post to a file inside if True or 'json',
+                           append it to Parquet files in the '.metadata' directory of the destination if 'parquet' (see `MetadataSink`)
+            max_workers: maximum number of media of a post downloaded at the same time
+            stop_at_archived: stop when reaching a post whose media have all been downloaded to `dest` before
+            checkpoint: a `QueuedJob` (see jobqueue.py), which records the progress of the download so that it can be resumed
 
         Returns:
-            path: full path to the download destination, or None if download failed
+            path: full path to the download destination, or `NOTHING` ('') if there was nothing to download
         """
-        posts = self.get_explore_posts(count, only, timestamp_limit, preload)
+        posts = self.get_explore_posts(count, only, timestamp_limit, preload, checkpoint)
         if not posts:
-            return None
-        return _down_posts(posts, dest, directory="explore", dump_metadata=dump_metadata)
+            return NOTHING
+        return _down_posts(posts, dest, directory="explore", dump_metadata=dump_metadata, max_workers=max_workers, stop_at_archived=stop_at_archived, checkpoint=checkpoint)
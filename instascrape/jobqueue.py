@@ -0,0 +1,229 @@
+import os
+import json
+import time
+import sqlite3
+import inspect
+import logging
+import functools
+from threading import Lock
+
+from instascrape import (DIR_PATH, make_dirs)
+
+logger = logging.getLogger("instascrape")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    target TEXT,
+    method TEXT NOT NULL,
+    args TEXT NOT NULL,
+    kwargs TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    cursor TEXT,
+    position INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS finished (
+    job_id INTEGER NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+    shortcode TEXT NOT NULL,
+    PRIMARY KEY (job_id, shortcode)
+);
+"""
+
+
+class QueuedJob:
+    """A download job stored in the `JobQueue`, which is also the checkpoint of its own pagination (passed as `checkpoint` to the download methods).
+    * `cursor`: the pagination resumes from this cursor, i.e. the start of the page of the last finished post.
+    * `position`: amount of items the pagination yielded before that page, deducted from the `count` of the download when resuming.
+    * `finished`: shortcodes of the posts already downloaded, which are skipped when resuming.
+    * The cursor stops moving at the first post which is not completely downloaded, so that it is retried when resuming.
+    * `incomplete`: amount of posts not completely downloaded by the current run.
+
+    Arguments:
+        queue: the `JobQueue` the job belongs to
+        row: the row of the job in the database
+        finished: shortcodes of the posts already downloaded
+    """
+
+    def __init__(self, queue, row: sqlite3.Row, finished: set = None):
+        self._queue = queue
+        self.id = row["id"]
+        self.target = row["target"]
+        self.method = row["method"]
+        self.args = json.loads(row["args"])
+        self.kwargs = json.loads(row["kwargs"])
+        self.status = row["status"]
+        self.cursor = row["cursor"]
+        self.position = row["position"]
+        self.error = row["error"]
+        self.attempts = row["attempts"]
+        self.finished = finished or set()
+        self._page = (self.cursor, self.position)  # -> (start cursor, position) of the page being yielded
+        self._pages = {}  # -> shortcode: (start cursor, position) of the page it comes from
+        self._index = self.position  # -> amount of items yielded by the pagination so far
+        self.incomplete = 0
+
+    def __repr__(self):
+        return "<QueuedJob id={0} {1} target='{2}' status={3}>".format(self.id, self.method, self.target, self.status)
+
+    def page_kwargs(self) -> dict:
+        """Keyword arguments for the `fetch_*` methods of the structures, to resume the pagination and follow its pages."""
+        return {"cursor": self.cursor, "on_page": self.on_page}
+
+    def on_page(self, state: dict):
+        """Called by `_scrape_pages` with the checkpoint state after each page, the items after it come from the page of `state['cursor']`."""
+        self._page = (state["cursor"], self._index)
+
+    def filter(self, items):
+        """Yields the (shortcode, node) items of the pagination, except the ones already finished."""
+        for item in items:
+            self._index += 1
+            shortcode = item[0] if isinstance(item, tuple) else item
+            if shortcode in self.finished:
+                logger.debug("Skipped finished post :%s", shortcode)
+                continue
+            self._pages[shortcode] = self._page
+            yield item
+
+    def remaining(self, count: int) -> int:
+        """The `count` of the download left when resuming from the cursor."""
+        return max(count - self.position, 0)
+
+    def done(self, shortcode: str, complete: bool = True):
+        """Record a processed post, and move the resume cursor to the page it comes from if no post before it is incomplete."""
+        page = self._pages.pop(shortcode, None)
+        if not complete:
+            self.incomplete += 1
+            return
+        self.finished.add(shortcode)
+        if page and not self.incomplete:
+            self.cursor, self.position = page
+        self._queue.save_progress(self, shortcode)
+
+
+class JobQueue:
+    """Durable queue of download jobs, stored in a SQLite database, so that an interrupted run can be resumed (`instascrape resume`).
+    * Jobs are removed from the queue once they are completed.
+    * Jobs which are still 'running' in the database were interrupted (e.g. the process was killed).
+
+    Arguments:
+        path: full path to the database file (default: 'jobs.db' in `DIR_PATH`)
+    """
+
+    def __init__(self, path: str = None):
+        if not path:
+            make_dirs()
+        self.path = path or os.path.join(DIR_PATH, "jobs.db")
+        self._lock = Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA foreign_keys = ON")
+            self._conn.executescript(SCHEMA)
+            columns = [row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")]
+            if "attempts" not in columns:
+                # -> database created by a previous version
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+
+    def __repr__(self):
+        return "<JobQueue path='{0}'>".format(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _execute(self, sql: str, params: tuple = ()):
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params).fetchall()
+
+    def add(self, target: str, method: str, args: tuple = (), kwargs: dict = None) -> QueuedJob:
+        """Add a job (a call of the method `method` of `InstaScraper`) to the queue. `args` & `kwargs` must be JSON serializable."""
+        now = time.time()
+        with self._lock, self._conn:
+            cur = self._conn.execute("INSERT INTO jobs (target, method, args, kwargs, created, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                                     (target, method, json.dumps(list(args)), json.dumps(kwargs or {}), now, now))
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (cur.lastrowid,)).fetchone()
+        return QueuedJob(self, row)
+
+    def unfinished(self) -> list:
+        """Get all the jobs not completed yet (pending, interrupted or failed) in the order they were added."""
+        jobs = []
+        for row in self._execute("SELECT * FROM jobs ORDER BY id"):
+            finished = set(r["shortcode"] for r in self._execute("SELECT shortcode FROM finished WHERE job_id = ?", (row["id"],)))
+            jobs.append(QueuedJob(self, row, finished))
+        return jobs
+
+    def set_status(self, job: QueuedJob, status: str, error: str = None):
+        job.status = status
+        job.error = error
+        if status == "running":
+            job.attempts += 1
+        self._execute("UPDATE jobs SET status = ?, error = ?, attempts = ?, updated = ? WHERE id = ?", (status, error, job.attempts, time.time(), job.id))
+
+    def save_progress(self, job: QueuedJob, shortcode: str):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO finished (job_id, shortcode) VALUES (?, ?)", (job.id, shortcode))
+            self._conn.execute("UPDATE jobs SET cursor = ?, position = ?, updated = ? WHERE id = ?", (job.cursor, job.position, time.time(), job.id))
+
+    def remove(self, job: QueuedJob):
+        self._execute("DELETE FROM jobs WHERE id = ?", (job.id,))
+
+    def prune(self, max_attempts: int) -> list:
+        """Remove the failed jobs which have been run `max_attempts` times already, so that they are not resumed forever.
+
+        Returns:
+            list: the removed jobs
+        """
+        jobs = [job for job in self.unfinished() if job.status == "failed" and job.attempts >= max_attempts]
+        for job in jobs:
+            self.remove(job)
+        return jobs
+
+    def clear(self):
+        """Remove all the jobs from the queue."""
+        self._execute("DELETE FROM jobs")
+
+    def wrap(self, job: QueuedJob, function):
+        """Wrap the download method of a job, so that its status is kept in the queue, and its pagination is checkpointed if it supports it.
+        * The job is removed from the queue when the method returns a path or `NOTHING` (there was nothing to download), and marked as 'failed'
+          when it raises an error, returns None without finishing any post, or reported posts which were not completely downloaded.
+          Each run of the job counts as an attempt (see `prune`).
+        * A job interrupted by the user (KeyboardInterrupt) is marked as 'interrupted', and the run does not count as an attempt.
+        """
+        takes_checkpoint = "checkpoint" in inspect.signature(function).parameters
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if takes_checkpoint:
+                kwargs = dict(kwargs, checkpoint=job)
+                if "count" in kwargs:
+                    kwargs["count"] = job.remaining(kwargs["count"])
+            job.incomplete = 0
+            self.set_status(job, "running")
+            try:
+                result = function(*args, **kwargs)
+            except KeyboardInterrupt:
+                job.attempts -= 1
+                self.set_status(job, "interrupted")
+                raise
+            except BaseException as e:
+                self.set_status(job, "failed", str(e) or e.__class__.__name__)
+                raise
+            if result is None and not job.finished:
+                self.set_status(job, "failed", "download failed")
+            elif job.incomplete:
+                self.set_status(job, "failed", "{0} posts not completely downloaded".format(job.incomplete))
+            else:
+                self.remove(job)
+            return result
+        return wrapper
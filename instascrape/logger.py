@@ -1,66 +1,116 @@
 import logging
+import logging.handlers
+import atexit
+import copy
+import queue
 import sys
 import os
 
 from colorama import (Fore, Style)
 
-from instascrape import DIR_PATH
+from instascrape import (DIR_PATH, make_dirs)
 
+_stream_handler = None
+_queue_handler = None
+_listener = None  # -> `QueueListener` writing the records to the log file in a background thread
+_exc_formatter = logging.Formatter()  # -> renders the tracebacks of the queued records
 
-def set_logger(level: int = 20):
-    """Set up logger. If this function is called repeatedly, returns the same logger with no changes.
+
+def set_logger(level: int = 20, file_level: int = logging.DEBUG):
+    """Set up logger. The handlers are only set up on the first call, calling this function again only changes the levels.
+    * The console output is written directly, while the log file is written by a background thread (`QueueListener`),
+      so that the file I/O never blocks the scraping threads.
+    * The level of the logger is the lowest level of its handlers, so that the records nobody outputs are not even created.
 
     Arguments:
-        level: logging level of the logger [0, 10, 20, 30, 40, 50]
+        level: logging level of the console output [0, 10, 20, 30, 40, 50]
+        file_level: logging level of the log file ('instascrape.log' in `DIR_PATH`)
 
     Returns:
         logging.Logger
     """
-    log_file = os.path.join(DIR_PATH, "instascrape.log")
-    # Set the requests logger level to WARNING
-    logging.getLogger("requests").setLevel(logging.WARNING)
-
+    global _stream_handler, _queue_handler, _listener
     logger = logging.getLogger("instascrape")
-    logger.propagate = True
-    logger.setLevel(logging.DEBUG)
-
-    file_handler = logging.FileHandler(log_file, mode="w+")
-    file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(logging.Formatter("%(asctime)s - [%(levelname)s] (%(funcName)s in %(filename)s line %(lineno)d) %(msg)s"))
-
-    stream_handler = logging.StreamHandler(stream=sys.stdout)
-    stream_handler.setFormatter(Formatter())
-    stream_handler.setLevel(level)
-
-    if not logger.hasHandlers():
-        logger.addHandler(file_handler)
-        logger.addHandler(stream_handler)
-    else:
-        # restore
-        logger.handlers[1].setLevel(level)
-        logger.handlers[1].setFormatter(Formatter())
+
+    if _stream_handler is None:
+        # Set the requests logger level to WARNING
+        logging.getLogger("requests").setLevel(logging.WARNING)
+        logger.propagate = True
+
+        make_dirs()
+        file_handler = logging.FileHandler(os.path.join(DIR_PATH, "instascrape.log"), mode="w+")
+        file_handler.setFormatter(logging.Formatter("%(asctime)s - [%(levelname)s] (%(funcName)s in %(filename)s line %(lineno)d) %(message)s"))
+        records = queue.Queue()
+        _listener = logging.handlers.QueueListener(records, file_handler)
+        _listener.start()
+        atexit.register(_listener.stop)  # -> flush the records left in the queue
+
+        _queue_handler = QueueHandler(records)
+        _stream_handler = logging.StreamHandler(stream=sys.stdout)
+        _stream_handler.setFormatter(Formatter())
+        logger.addHandler(_queue_handler)
+        logger.addHandler(_stream_handler)
+
+    _queue_handler.setLevel(file_level)
+    _stream_handler.setLevel(level)
+    logger.setLevel(min(level, file_level))
     return logger
 
 
+def set_stream(stream):
+    """Write the console output to `stream` instead of stdout (e.g. the daemon sends it to its clients)."""
+    if _stream_handler is None:
+        set_logger()
+    _stream_handler.acquire()
+    try:
+        _stream_handler.flush()
+        _stream_handler.stream = stream
+    finally:
+        _stream_handler.release()
+
+
+def stream_level() -> int:
+    """Level of the console output (the level of the logger if it is not set up)."""
+    if _stream_handler is None:
+        return logging.getLogger("instascrape").getEffectiveLevel()
+    return _stream_handler.level
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """Puts the records in the queue of the `QueueListener`, which formats them with the format of their level in its thread.
+    * The message (`msg % args`) and the traceback are rendered before queueing, like the standard `QueueHandler` does,
+      as the arguments (e.g. a dict of query parameters) may be modified by the time the listener formats the record.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)  # -> the record may also be handled by other handlers
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
 class Formatter(logging.Formatter):
+    """Console formatter, with a colored format for each level.
+    * The formatter of each level is built once, and formatting does not modify any state, so it is thread-safe.
+    """
+
+    FORMATS = {
+        logging.DEBUG: "    {0}DEBUG: %(message)s{1}".format(Fore.LIGHTBLACK_EX, Fore.RESET),
+        logging.INFO: "- %(message)s",
+        logging.WARNING: "- {0}WARNING:{1} %(message)s{2}".format(Style.BRIGHT + Fore.LIGHTYELLOW_EX, Style.RESET_ALL + Fore.LIGHTYELLOW_EX, Fore.RESET),
+        logging.ERROR: "- {0}ERROR:{1} %(message)s{2}".format(Style.BRIGHT + Fore.LIGHTMAGENTA_EX, Style.RESET_ALL + Fore.MAGENTA, Fore.RESET),
+        logging.CRITICAL: "- {0}CRITIC:{1} %(message)s{2}".format(Style.BRIGHT + Fore.RED, Style.RESET_ALL + Fore.RED, Fore.RESET),
+    }
+
+    def __init__(self):
+        logging.Formatter.__init__(self, "- %(message)s")
+        self._formatters = {level: logging.Formatter(fmt) for level, fmt in self.FORMATS.items()}
 
     def format(self, record):
-        original_fmt = self._fmt
-
-        # Customize format
-        if record.levelno == logging.DEBUG:
-            self._style._fmt = "    {0}DEBUG: %(msg)s{1}".format(Fore.LIGHTBLACK_EX, Fore.RESET)
-        elif record.levelno == logging.INFO:
-            self._style._fmt = "- %(msg)s"
-        elif record.levelno == logging.WARNING:
-            self._style._fmt = "- {0}WARNING:{1} %(msg)s{2}".format(Style.BRIGHT + Fore.LIGHTYELLOW_EX, Style.RESET_ALL + Fore.LIGHTYELLOW_EX, Fore.RESET)
-        elif record.levelno == logging.ERROR:
-            self._style._fmt = "- {0}ERROR:{1} %(msg)s{2}".format(Style.BRIGHT + Fore.LIGHTMAGENTA_EX, Style.RESET_ALL + Fore.MAGENTA, Fore.RESET)
-        elif record.levelno == logging.CRITICAL:
-            self._style._fmt = "- {0}CRITIC:{1} %(msg)s{2}".format(Style.BRIGHT + Fore.RED, Style.RESET_ALL + Fore.RED, Fore.RESET)
-
-        result = logging.Formatter.format(self, record)
-
-        # Restore the original format configured
-        self._fmt = original_fmt
-        return result
+        formatter = self._formatters.get(record.levelno)
+        if formatter is None:
+            return logging.Formatter.format(self, record)
+        return formatter.format(record)
@@ -0,0 +1,142 @@
+import os
+import json
+import logging
+from threading import Lock
+from urllib.parse import urlparse
+
+logger = logging.getLogger("instascrape")
+
+MANIFEST_FILENAME = ".manifest"
+MARK_FILENAME = ".mark"
+
+
+def src_id(src: str) -> str:
+    """Get the identity of a media source, which is the filename in the URL of the media, e.g. '12345_67890_n.jpg'."""
+    return os.path.basename(urlparse(src).path)
+
+
+def load_mark(path: str) -> dict or None:
+    """Load the high-water mark of a download directory, i.e. the newest post downloaded by the last completed sync run.
+
+    Arguments:
+        path: full path to the directory
+
+    Returns:
+        dict: {"timestamp": <created time>, "shortcode": <shortcode>} if found, None otherwise
+    """
+    file = os.path.join(path, MARK_FILENAME)
+    if not os.path.isfile(file):
+        return None
+    try:
+        with open(file, "r") as f:
+            return json.load(f)
+    except ValueError:
+        logger.warning("Invalid high-water mark in %s, ignored.", file)
+        return None
+
+
+def save_mark(path: str, timestamp: float, shortcode: str):
+    """Save the high-water mark of a download directory (see `load_mark()`).
+
+    Arguments:
+        path: full path to the directory
+        timestamp: created time of the newest post
+        shortcode: shortcode of the newest post
+    """
+    file = os.path.join(path, MARK_FILENAME)
+    logger.debug("Saving high-water mark :%s to %s...", shortcode, file)
+    with open(file + ".tmp", "w") as f:
+        json.dump({"timestamp": timestamp, "shortcode": shortcode}, f)
+    os.replace(file + ".tmp", file)
+
+
+class Manifest:
+    """Index of the media downloaded into a directory, stored as an append-only log (one JSON record per line) in the directory.
+    * Replaces probing the files on disk to decide whether a media has already been downloaded.
+    * When the directory has no manifest yet, the media files already inside it are indexed once.
+    * Files deleted from disk after they were indexed are still considered as downloaded.
+
+    Record:
+        name: path of the file relative to the directory, without the extension
+        shortcode: shortcode of the post that the media belongs to (None for stories & highlights)
+        index: index of the media in the post, story or highlight (starts from 1)
+        src: identity of the media source (see `src_id()`)
+
+    Arguments:
+        path: full path to the directory (must exist)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = os.path.join(path, MANIFEST_FILENAME)
+        self._lock = Lock()
+        self.names = set()
+        self.shortcodes = set()
+        self.srcs = set()
+        if os.path.isfile(self._file):
+            self._load()
+            self._f = open(self._file, "a")
+        else:
+            self._f = open(self._file, "a")
+            self._index_files()
+
+    def __repr__(self):
+        return "<Manifest path='{0}' records={1}>".format(self.path, len(self.names))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.names
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+    def _load(self):
+        logger.debug("Loading manifest %s...", self._file)
+        with open(self._file, "r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # the last line may be cut off if the program was killed while writing
+                    continue
+                self._index(record)
+
+    def _index(self, record: dict):
+        self.names.add(record["name"])
+        if record.get("shortcode"):
+            self.shortcodes.add(record["shortcode"])
+        if record.get("src"):
+            self.srcs.add(record["src"])
+
+    def _index_files(self):
+        logger.debug("Indexing existing files in %s...", self.path)
+        for root, _, files in os.walk(self.path):
+            for file in files:
+                name, ext = os.path.splitext(file)
+                if ext in (".jpg", ".mp4"):
+                    self.add(os.path.relpath(os.path.join(root, name), self.path))
+
+    def add(self, name: str, shortcode: str = None, index: int = None, src: str = None):
+        """Record a downloaded media.
+
+        Arguments:
+            name: path of the file relative to the directory, without the extension
+            shortcode: shortcode of the post that the media belongs to
+            index: index of the media in the post, story or highlight
+            src: identity of the media source
+        """
+        record = {"name": name, "shortcode": shortcode, "index": index, "src": src}
+        with self._lock:
+            self._f.write(json.dumps(record) + "\n")
+            self._f.flush()
+            self._index(record)
+
+    def close(self):
+        with self._lock:
+            self._f.close()
@@ -0,0 +1,129 @@
+import time
+import logging
+from collections import (OrderedDict, deque)
+from concurrent.futures import (ThreadPoolExecutor, wait, FIRST_COMPLETED)
+
+from instascrape.constants import (JOB_WORKERS, JOBS_PER_TARGET)
+
+logger = logging.getLogger("instascrape")
+
+
+class Job:
+    """A download job of the `JobScheduler`, i.e. a call of `function(*args, **kwargs)`.
+
+    Attributes:
+        target: the target (e.g. username) the job belongs to
+        result: return value of the function
+        error: exception raised by the function
+        elapsed: seconds the job took
+    """
+
+    def __init__(self, target: str, function, args: tuple = (), kwargs: dict = None):
+        self.target = target
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.result = None
+        self.error = None
+        self.elapsed = None
+
+    def __repr__(self):
+        return "<Job {0} target='{1}'>".format(self.function.__name__, self.target)
+
+    @property
+    def name(self) -> str:
+        return self.function.__name__.title().replace("_", " ")
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None and self.result is not None
+
+    def execute(self):
+        start = time.monotonic()
+        try:
+            self.result = self.function(*self.args, **self.kwargs)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.elapsed = time.monotonic() - start
+        return self
+
+
+class JobScheduler:
+    """Runs download jobs of many targets in parallel with a pool of threads.
+    * At most `workers` jobs run at the same time, and at most `per_target` of them belong to the same target.
+    * Targets take turns (round-robin) to start their next job, so a target with huge jobs cannot starve the others.
+    * Jobs of a target are started in the order they were added.
+
+    Arguments:
+        workers: maximum number of jobs run at the same time
+        per_target: maximum number of jobs of the same target run at the same time
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, per_target: int = JOBS_PER_TARGET):
+        self.workers = workers
+        self.per_target = per_target
+        self.jobs = []
+        self._pending = OrderedDict()  # -> target: deque[Job]
+        self._running = {}  # -> target: number of running jobs
+
+    def __len__(self):
+        return len(self.jobs)
+
+    def add(self, target: str, function, args: tuple = (), kwargs: dict = None) -> Job:
+        job = Job(target, function, args, kwargs)
+        self.jobs.append(job)
+        self._pending.setdefault(target, deque()).append(job)
+        self._running.setdefault(target, 0)
+        return job
+
+    def _next(self) -> Job or None:
+        """Pick the next job to start, from the first target in turn which has not reached `per_target` running jobs."""
+        for target in list(self._pending):
+            if self._running[target] < self.per_target:
+                job = self._pending[target].popleft()
+                if self._pending[target]:
+                    self._pending.move_to_end(target)  # -> the target goes to the back of the turn
+                else:
+                    del self._pending[target]
+                return job
+        return None
+
+    def run(self, on_start=None, on_finish=None, on_interrupt=None) -> list:
+        """Run all the jobs added and block until all of them are finished.
+        * `on_start(job)` and `on_finish(job)` are called in the calling thread.
+        * When interrupted (Ctrl+C), the jobs not started yet are dropped, `on_interrupt()` is called to stop the running ones
+          (e.g. `cancel_downloads`), and KeyboardInterrupt is raised again without waiting for them.
+
+        Returns:
+            list: all `Job` objects in the order they were added
+        """
+        executor = ThreadPoolExecutor(max_workers=max(1, self.workers))
+        running = set()
+        try:
+            while self._pending or running:
+                while len(running) < self.workers:
+                    job = self._next()
+                    if job is None:
+                        break
+                    self._running[job.target] += 1
+                    if on_start:
+                        on_start(job)
+                    running.add(executor.submit(job.execute))
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = future.result()
+                    self._running[job.target] -= 1
+                    if on_finish:
+                        on_finish(job)
+        except KeyboardInterrupt:
+            logger.warning("Interrupted, stopping %s running jobs...", len(running))
+            self._pending.clear()
+            for future in running:
+                future.cancel()  # -> the jobs submitted but not started yet
+            if on_interrupt:
+                on_interrupt()
+            executor.shutdown(wait=False)
+            raise
+        executor.shutdown()
+        return self.jobs
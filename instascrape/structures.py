@@ -1,13 +1,14 @@
 import json
 import logging
-import time
-import random
+import functools
 
 import requests
 
 from instascrape.constants import *
 from instascrape.exceptions import *
 from instascrape.container import container
+from instascrape.governor import governor
+from instascrape.cache import cache
 
 __all__ = ("BaseStructure", "Profile", "Hashtag", "Explore", "Post", "IGTV", "Story", "Highlight")
 logger = logging.getLogger("instascrape")
@@ -55,27 +56,208 @@ def shortcode_extractor(data: dict, only: str = None, timestamp_limit: dict = No
     return shortcode
 
 
+def node_extractor(data: dict, only: str = None, timestamp_limit: dict = None):
+    """Called by `self._scrape_pages()` to extract both shortcode and node data, with the same conditions as `shortcode_extractor`.
+    * The node data is used to build a lite `Post` without querying its data again.
+
+    Returns:
+        tuple: (shortcode, node data) if data satisfies the conditions
+        None: if data does not satisfy the conditions
+        False: if need to stop the process
+    """
+    shortcode = shortcode_extractor(data, only, timestamp_limit)
+    if not shortcode:
+        return shortcode
+    return shortcode, data
+
+
+def media_complete(data: dict) -> bool:
+    """Check whether the (post) data has enough information to build `Container` objects of all its media."""
+    typename = data.get("__typename")
+    if typename == "GraphImage":
+        return "display_resources" in data
+    if typename == "GraphVideo":
+        return "video_url" in data
+    if typename == "GraphSidecar":
+        children = data.get("edge_sidecar_to_children")
+        return bool(children) and all(media_complete(edge["node"]) for edge in children["edges"])
+    return False
+
+
+def lite_node(data: dict) -> bool:
+    """Check whether the node data of a post from pagination has enough information to build a lite `Post` from it."""
+    return all(key in data for key in ("__typename", "shortcode", "taken_at_timestamp", "owner")) and media_complete(data)
+
+
+def raise_for_message(data: dict):
+    """Raise the error described by the 'message' of a response data which does not contain the expected key.
+
+    Raises:
+        RateLimitedError: if the message is 'rate limited'
+        ExtractError: otherwise
+    """
+    message = data.get("message", "key error")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s", json.dumps(data))
+    if message == "rate limited":
+        raise RateLimitedError()
+    raise ExtractError(message)
+
+
+def reels_query_url(reel_ids: list = (), tag_names: list = (), highlight_reel_ids: list = ()) -> str:
+    """Get the URL of the query of reels (stories & highlights) of the given user ids, hashtag names or highlight reel ids."""
+    param = {"reel_ids": list(reel_ids), "tag_names": list(tag_names), "location_ids": [],
+             "highlight_reel_ids": list(highlight_reel_ids), "precomposed_overlay": False}
+    return QUERY_STORIES_URL + json.dumps(param)
+
+
+def extract_reels(data: dict) -> list:
+    """Extract the reels data from the response data of the query URL returned by `reels_query_url()`."""
+    if "data" not in data or "reels_media" not in data["data"]:
+        raise_for_message(data)
+    return data["data"]["reels_media"]
+
+
+def split_reels(reels: list) -> dict:
+    """Map a list of reels data to their ids (user id or highlight reel id, without the 'highlight:' prefix)."""
+    return {str(reel["id"]).rpartition(":")[2]: reel for reel in reels}
+
+
+def fetch_reels(session: requests.Session, reel_ids: list = (), highlight_reel_ids: list = ()) -> dict:
+    """Fetch the reels (stories & highlights) data of many users and highlight reels in one request.
+
+    Arguments:
+        session: requests session
+        reel_ids: user ids of the stories
+        highlight_reel_ids: ids of the highlight reels
+
+    Returns:
+        dict: {<id>: <reel data>}, the ids with no reel found are left out
+    """
+    return split_reels(extract_reels(governor.get_json(session, reels_query_url(reel_ids, highlight_reel_ids=highlight_reel_ids))))
+
+
+def highlights_query_url(user_id: str) -> str:
+    """Get the URL of the query of the story highlights of a user."""
+    param = {"user_id": user_id, "include_chaining": False, "include_reel": False,
+             "include_suggested_users": False, "include_logged_out_extras": False, "include_highlight_reels": True}
+    return QUERY_HIGHLIGHTS_URL + json.dumps(param)
+
+
+def extract_highlights(data: dict) -> list:
+    """Extract [(title, highlight reel id)] from the response data of the query URL returned by `highlights_query_url()`."""
+    if "data" not in data or "user" not in data["data"]:
+        raise_for_message(data)
+    return [(edge["node"]["title"], edge["node"]["id"]) for edge in data["data"]["user"]["edge_highlight_reels"]["edges"]]
+
+
+# Keys of the raw data kept by the structures, everything else (e.g. comments, related media & profiles) is dropped when the data is assigned
+MEDIA_KEYS = ("__typename", "id", "shortcode", "taken_at_timestamp", "dimensions", "display_resources", "display_url", "thumbnail_src",
+              "video_url", "video_resources", "video_duration")
+POST_KEYS = MEDIA_KEYS + ("location", "edge_media_to_caption")
+PROFILE_KEYS = ("id", "username", "full_name", "biography", "external_url", "is_verified", "is_private", "profile_pic_url_hd", "highlight_reel_count")
+COUNT_KEYS = ("edge_media_preview_like", "edge_media_to_parent_comment", "edge_media_to_comment", "edge_followed_by", "edge_follow", "edge_mutual_followed_by")
+
+
+def _pick(data: dict, keys: tuple) -> dict:
+    return {key: data[key] for key in keys if key in data}
+
+
+def _counts(data: dict) -> dict:
+    """Keep only the counts of the edges (e.g. likes, followers) whose nodes are not read."""
+    return {key: {"count": data[key].get("count")} for key in COUNT_KEYS if isinstance(data.get(key), dict)}
+
+
+def compact_media(data: dict) -> dict:
+    """Keep the data of a media (post or story item) read by `Container`."""
+    return _pick(data, MEDIA_KEYS)
+
+
+def compact_post(data: dict) -> dict:
+    """Keep the data of a post read by `Post` (and the `Container` objects of its media)."""
+    compact = _pick(data, POST_KEYS)
+    compact.update(_counts(data))
+    if isinstance(data.get("owner"), dict):
+        compact["owner"] = _pick(data["owner"], ("id", "username"))
+    if data.get("location"):
+        compact["location"] = _pick(data["location"], ("id", "name"))
+    if "edge_media_to_caption" in data:
+        compact["edge_media_to_caption"] = {"edges": [{"node": {"text": edge["node"]["text"]}} for edge in data["edge_media_to_caption"]["edges"]]}
+    if "edge_sidecar_to_children" in data:
+        compact["edge_sidecar_to_children"] = {"edges": [{"node": compact_media(edge["node"])} for edge in data["edge_sidecar_to_children"]["edges"]]}
+    return compact
+
+
+def compact_profile(data: dict) -> dict:
+    """Keep the data of a user read by `Profile`, including the first page of its timeline, saved posts and IGTV videos."""
+    compact = _pick(data, PROFILE_KEYS)
+    compact.update(_counts(data))
+    for key in ("edge_owner_to_timeline_media", "edge_saved_media", "edge_felix_video_timeline"):
+        if isinstance(data.get(key), dict):
+            page = _pick(data[key], ("count", "page_info"))
+            if key == "edge_felix_video_timeline":
+                page["edges"] = [{"node": _pick(edge["node"], ("title", "shortcode"))} for edge in data[key].get("edges", [])]
+            else:
+                page["edges"] = [{"node": compact_post(edge["node"])} for edge in data[key].get("edges", [])]
+            compact[key] = page
+    return compact
+
+
+def compact_reel(data: dict) -> dict:
+    """Keep the data of a reel (story or highlight) read by `Story`."""
+    compact = _pick(data, ("__typename", "id"))
+    compact["owner"] = _pick(data["owner"], ("id", "username", "name"))
+    compact["items"] = [compact_media(item) for item in data["items"]]
+    return compact
+
+
+def memoized(func):
+    """Decorator of the properties derived from the `data` of a structure: the value is computed once and kept in the structure's
+    `_memo`, which is cleared whenever `data` is replaced (e.g. the full data of a lite post is fetched)."""
+    name = func.__name__
+
+    @functools.wraps(func)
+    def getter(self):
+        try:
+            return self._memo[name]
+        except KeyError:
+            value = func(self)
+            self._memo[name] = value  # -> `_memo` of the data the value was computed from
+            return value
+    return property(getter)
+
+
 class BaseStructure:
-    """Base Structure Class, providng some basic methods."""
+    """Base Structure Class, providng some basic methods.
+    * Assigning `data` clears the values of the `memoized` properties.
+    * Assigned `data` is passed through `_compact` first, which keeps only the fields read by the structure (see `compact_post` etc.),
+      so that thousands of (preloaded) structures do not keep the whole responses alive.
+    * Structures only have the attributes declared in `__slots__`.
+    """
 
+    __slots__ = ("_session", "_data", "_memo", "page_state")
     info_vars = ()
+    _compact = None  # -> function to compact the data assigned
 
     def __init__(self, session: requests.Session):
-        self.__slots__ = self.info_vars  # optimize speed of getting attributes ?
         self._session = session
         self.data = None
+        self.page_state = None  # -> checkpoint state of the last page scraped by `_scrape_pages()`
+
+    @property
+    def data(self) -> dict or None:
+        """Raw data of the structure returned by Instagram."""
+        return self._data
+
+    @data.setter
+    def data(self, data: dict or None):
+        self._data = self._compact(data) if data and self._compact else data
+        self._memo = {}  # -> property name: value computed from this data
 
     def _get_json(self, url: str) -> dict:
+        """Get JSON data from `url` through the request `governor`, which takes care of the rate limits (see governor.py)."""
         # logger.debug("Getting json data with url {0}".format(url))
-        try:
-            resp = self._session.get(url).json()
-        except requests.ConnectionError:
-            raise ConnectionError(url)
-        except json.JSONDecodeError:
-            # failed to decode json in first try
-            # raise ExtractError for subclasses to handle
-            raise ExtractError("response is not json")
-        return resp
+        return governor.get_json(self._session, url)
 
     def _query_next_page(self, url: str, param: dict) -> dict:
         """Query data of next page using `param` provided.
@@ -90,7 +272,7 @@ class BaseStructure:
         """
         url = url + json.dumps(param)
         initial_data = self._get_json(url)
-        logger.debug("getting next page (param: {0})".format(param))
+        logger.debug("getting next page (param: %s)", param)
         data = initial_data.get("data") or initial_data.get("graphql") or initial_data
 
         clstypes = {
@@ -106,21 +288,19 @@ class BaseStructure:
 
         if k not in data:
             # key not found
-            message = data.get("message", "key error")
-            logger.debug(json.dumps(data))
-            if message == "rate limited":
-                raise RateLimitedError()
-            raise ExtractError(message)
+            raise_for_message(data)
 
         d = data[k]
         if not d:  # empty dict
             raise ExtractError("no data")
         return d
 
-    def _scrape_pages(self, extractor, url: str, param: dict, key: str, count: int = 50, new: bool = False, **kwargs):
+    def _scrape_pages(self, extractor, url: str, param: dict, key: str, count: int = 50, new: bool = False, cursor: str = None, on_page=None, **kwargs):
         """Main method to scrape data by paginating.
         * Calls `self._query_next_page()` to paginate.
         * Calls 'extractor' functions to extract results from data.
+        * After all items of a page are yielded, its checkpoint state is stored in `self.page_state` and passed to `on_page`:
+            {"cursor": <cursor to resume from>, "has_next_page": <bool>, "page": <page index>, "count": <items yielded so far>}
 
         Arguments:
             extractor: behaviour function to extract data from node data
@@ -129,6 +309,8 @@ class BaseStructure:
             key: key to extract node data from response
             count: the maximum count of posts you want to fetch (default: 50 because this is the maximum amount per page)
             new: do not use (or no) initial data and start scraping data of page-1 instead
+            cursor: start scraping from the page after this cursor (the 'cursor' of a checkpoint state) instead
+            on_page: callback called with the checkpoint state after each page, e.g. to save it
 
         Keyword Arguments (**kwargs):
             - All Keyword Arguments will be passed to `extractor` function
@@ -146,7 +328,9 @@ class BaseStructure:
             # * maximum amount is 50 (per page by Instagram)
             param["first"] = 50 if count >= 50 or only else count
 
-        if new:
+        if cursor:
+            param["after"] = cursor
+        if new or cursor:
             data = self._query_next_page(url, param)  # scrape on page-1 (skip page-0)
             if key in data and data[key].get("count") == 0:
                 logger.info("Total: 0 Items")
@@ -158,12 +342,12 @@ class BaseStructure:
         if key != "edge_user_to_photos_of_you":
             total = data.get("count")
             if total:
-                logger.info("Total: {0} Items".format(total))
+                logger.info("Total: %s Items", total)
             else:
                 total = 100000  # if unlimited count of posts found, set max limit to 100 thousands
-            logger.debug("Count: {0} Items".format(count))
+            logger.debug("Count: %s Items", count)
             if total < count:
-                logger.warning("Only {0} items can be fetched.".format(total))
+                logger.warning("Only %s items can be fetched.", total)
         else:
             # the 'count' is less than the actual amount of tagged posts the user has, idk why :( instagram's problem ?
             logger.debug("Scraping 'edge_user_to_photos_of_you' (tagged), ignored total count of posts provided the response")
@@ -171,10 +355,10 @@ class BaseStructure:
 
         yield (False) if not data["edges"] else (count if total > count else total)
 
-        page_i = 1 if new else 0
+        page_i = 1 if new or cursor else 0
         results = []
         while len(results) < count and len(results) < total and data["edges"]:
-            logger.debug("Scraping page-{}...".format(page_i))
+            logger.debug("Scraping page-%s...", page_i)
 
             # yield extracted items
             for edge in data["edges"]:
@@ -182,7 +366,7 @@ class BaseStructure:
                 if item is False:
                     logger.debug("broke loop because extractor returned a False")
                     if len(results) < total:
-                        logger.warning("Only {0} items found.".format(len(results)))
+                        logger.warning("Only %s items found.", len(results))
                     return
                 if item:
                     results.append(item)
@@ -191,6 +375,12 @@ class BaseStructure:
                 if len(results) >= count:
                     return
 
+            # checkpoint: all items of this page have been yielded
+            self.page_state = {"cursor": data["page_info"].get("end_cursor"), "has_next_page": data["page_info"]["has_next_page"],
+                               "page": page_i, "count": len(results)}
+            if on_page:
+                on_page(self.page_state)
+
             # query next page if not enough
             if data["page_info"]["has_next_page"] and len(results) < count and len(results) < total:
                 # update url parameter
@@ -200,10 +390,9 @@ class BaseStructure:
             else:
                 break
             page_i += 1
-            time.sleep(random.randrange(3))  # delay: prevent getting rate limited by Instagram
 
         if len(results) < total:
-            logger.warning("Only {0} items found.".format(len(results)))
+            logger.warning("Only %s items found.", len(results))
 
     def as_dict(self) -> dict:
         """Maps properties to a dictionary"""
@@ -224,6 +413,7 @@ class BaseStructure:
 
 class Profile(BaseStructure):
     """Interface of a user Profile. Providing information and methods to get data and media of a Profile.
+    * If `data` (already fetched data of the user) is provided, it will not be queried again.
 
     Methods:
         * as_dict()
@@ -234,24 +424,34 @@ class Profile(BaseStructure):
         - fetch_followings()
     """
 
+    __slots__ = ("name",)
     info_vars = ("url", "user_id", "username", "fullname", "biography", "website", "followers_count", "followings_count", "mutual_followers_count",
                  "is_verified", "is_private", "profile_pic", "story_highlights_count", "timeline_posts_count")
+    _compact = staticmethod(compact_profile)
 
-    def __init__(self, session: requests.Session, name: str):
+    def __init__(self, session: requests.Session, name: str, data: dict = None):
         BaseStructure.__init__(self, session)
         self.name = name
-        self._get_user_data()
+        if data:
+            self.data = data
+        else:
+            self._get_user_data()
 
     def __repr__(self):
         return "<Profile username='{0}' user_id={1}>".format(self.username, self.user_id)
 
     def _get_user_data(self):
-        logger.debug("Getting initial data of Profile(name={0})...".format(self.name))
+        self.data = cache.get("user", self.name)
+        if self.data is not None:
+            logger.debug("Using cached data of Profile(name=%s)", self.name)
+            return
+        logger.debug("Getting initial data of Profile(name=%s)...", self.name)
         try:
             resp = self._get_json(USER_URL.format(username=self.name))
         except ExtractError:
             raise UserNotFound(self.name)
         self.data = resp["graphql"]["user"]
+        cache.put_profile(self.data)
 
     @property
     def url(self) -> str:
@@ -322,18 +522,20 @@ class Profile(BaseStructure):
         """Amount of timeline posts this user has."""
         return self.data["edge_owner_to_timeline_media"]["count"]
 
-    def fetch_timeline_posts(self, count: int = 50, only: str = None, timestamp_limit: dict = None):
+    def fetch_timeline_posts(self, count: int = 50, only: str = None, timestamp_limit: dict = None, nodes: bool = False, cursor: str = None, on_page=None):
         """Fetches a user's timeline posts. Call the low-level method `self.fetch_posts`.
 
         Arguments:
             count: the maximum count of posts you want to fetch
             only: [image/video] filter out other types of posts, only get posts of this particular type
             timestamp_limit: only get posts created between these timestamps, {"before": <before timestamp>, "after", <after_timestamp>}
+            nodes: yield (shortcode, node data) tuples instead of shortcodes, for building lite `Post` objects
+            cursor, on_page: resume the pagination from a cursor, and get the checkpoint state after each page (see `_scrape_pages`)
         """
         param = {"id": self.user_id}
-        return self._scrape_pages(shortcode_extractor, QUERY_USER_MEDIA_URL, param, "edge_owner_to_timeline_media", count, only=only, timestamp_limit=timestamp_limit)
+        return self._scrape_pages(node_extractor if nodes else shortcode_extractor, QUERY_USER_MEDIA_URL, param, "edge_owner_to_timeline_media", count, cursor=cursor, on_page=on_page, only=only, timestamp_limit=timestamp_limit)
 
-    def fetch_saved_posts(self, count: int = 50, only: str = None, timestamp_limit: dict = None):
+    def fetch_saved_posts(self, count: int = 50, only: str = None, timestamp_limit: dict = None, nodes: bool = False, cursor: str = None, on_page=None):
         """Fetches self saved posts. Calls the low-level method `self.fetch_posts`.
         * This method only works for self.
 
@@ -341,38 +543,44 @@ class Profile(BaseStructure):
             count: the maximum count of posts you want to fetch
             only: [image/video] filter out other types of posts, only get posts of this particular type
             timestamp_limit: only get posts created between these timestamps, {"before": <before timestamp>, "after", <after_timestamp>}
+            nodes: yield (shortcode, node data) tuples instead of shortcodes, for building lite `Post` objects
+            cursor, on_page: resume the pagination from a cursor, and get the checkpoint state after each page (see `_scrape_pages`)
         """
         param = {"id": self.user_id}
-        return self._scrape_pages(shortcode_extractor, QUERY_USER_SAVED_URL, param, "edge_saved_media", count, only=only, timestamp_limit=timestamp_limit)
+        return self._scrape_pages(node_extractor if nodes else shortcode_extractor, QUERY_USER_SAVED_URL, param, "edge_saved_media", count, cursor=cursor, on_page=on_page, only=only, timestamp_limit=timestamp_limit)
 
-    def fetch_tagged_posts(self, count: int = 50, only: str = None, timestamp_limit: dict = None):
+    def fetch_tagged_posts(self, count: int = 50, only: str = None, timestamp_limit: dict = None, nodes: bool = False, cursor: str = None, on_page=None):
         """Fetches posts that tagged this user. Calls the low-level method `self.fetch_posts`.
 
         Arguments:
             count: the maximum count of posts you want to fetch
             only: [image/video] filter out other types of posts, only get posts of this particular type
             timestamp_limit: only get posts created between these timestamps, {"before": <before timestamp>, "after", <after_timestamp>}
+            nodes: yield (shortcode, node data) tuples instead of shortcodes, for building lite `Post` objects
+            cursor, on_page: resume the pagination from a cursor, and get the checkpoint state after each page (see `_scrape_pages`)
         """
         param = {"id": self.user_id}
-        return self._scrape_pages(shortcode_extractor, QUERY_USER_TAGGED_URL, param, "edge_user_to_photos_of_you", count, new=True, only=only, timestamp_limit=timestamp_limit)
+        return self._scrape_pages(node_extractor if nodes else shortcode_extractor, QUERY_USER_TAGGED_URL, param, "edge_user_to_photos_of_you", count, new=True, cursor=cursor, on_page=on_page, only=only, timestamp_limit=timestamp_limit)
 
-    def fetch_followers(self, count: int = 50):
+    def fetch_followers(self, count: int = 50, cursor: str = None, on_page=None):
         """Fetches this user's followers in usernames.
 
         Arguments:
             count: the maximum count of followers you want to fetch
+            cursor, on_page: resume the pagination from a cursor, and get the checkpoint state after each page (see `_scrape_pages`)
         """
         param = {"id": self.user_id}
-        return self._scrape_pages(lambda node: {"username": node["username"], "user_id": node["id"]}, QUERY_FOLLOWERS_URL, param, "edge_followed_by", count, new=True)
+        return self._scrape_pages(lambda node: {"username": node["username"], "user_id": node["id"]}, QUERY_FOLLOWERS_URL, param, "edge_followed_by", count, new=True, cursor=cursor, on_page=on_page)
 
-    def fetch_followings(self, count: int = 50):
+    def fetch_followings(self, count: int = 50, cursor: str = None, on_page=None):
         """Fetches this user's followings in usernames.
 
         Arguments:
             count: the maximum count of followings you want to fetch
+            cursor, on_page: resume the pagination from a cursor, and get the checkpoint state after each page (see `_scrape_pages`)
         """
         param = {"id": self.user_id}
-        return self._scrape_pages(lambda node: {"username": node["username"], "user_id": node["id"]}, QUERY_FOLLOWINGS_URL, param, "edge_follow", count, new=True)
+        return self._scrape_pages(lambda node: {"username": node["username"], "user_id": node["id"]}, QUERY_FOLLOWINGS_URL, param, "edge_follow", count, new=True, cursor=cursor, on_page=on_page)
 
     def fetch_highlights(self) -> list:
         """Fetches this user's all story highlights in titles & highlight reel ids.
@@ -380,23 +588,7 @@ class Profile(BaseStructure):
         Returns:
             list: [(title, id)]
         """
-        param = {"user_id": self.user_id, "include_chaining": False, "include_reel": False,
-                 "include_suggested_users": False, "include_logged_out_extras": False, "include_highlight_reels": True}
-        data = self._get_json(QUERY_HIGHLIGHTS_URL + json.dumps(param))
-        if "data" not in data or "user" not in data["data"]:
-            message = data.get("message", "key error")
-            logger.debug(json.dumps(data))
-            if message == "rate limited":
-                raise RateLimitedError()
-            raise ExtractError(message)
-
-        data = data["data"]["user"]["edge_highlight_reels"]["edges"]
-        results = []
-        for item in data:
-            title = item["node"]["title"]
-            id = item["node"]["id"]
-            results.append((title, id))
-        return results
+        return extract_highlights(self._get_json(highlights_query_url(self.user_id)))
 
     def fetch_igtv(self) -> list:
         data = self.data["edge_felix_video_timeline"]
@@ -404,7 +596,7 @@ class Profile(BaseStructure):
         count = data["count"]
         if not count:
             return results
-        logger.debug("Total: {0} Items".format(count))
+        logger.debug("Total: %s Items", count)
         for item in data["edges"]:
             node = item["node"]
             results.append((node["title"], node["shortcode"]))
@@ -418,6 +610,7 @@ class Hashtag(BaseStructure):
         - fetch_posts()
     """
 
+    __slots__ = ("tag",)
     info_vars = ()
 
     def __init__(self, session: requests.Session, tag: str):
@@ -427,16 +620,18 @@ class Hashtag(BaseStructure):
     def __repr__(self):
         return "<Hashtag tag='{0}'>".format(self.tag)
 
-    def fetch_posts(self, count: int = 50, only: str = None, timestamp_limit: dict = None):
+    def fetch_posts(self, count: int = 50, only: str = None, timestamp_limit: dict = None, nodes: bool = False, cursor: str = None, on_page=None):
         """Fetches posts that tagged the given hashtag name.
 
         Arguments:
             count: the maximum count of posts you want to fetch
             only: [image/video] filter out other types of posts, only get posts of this particular type
             timestamp_limit: only get posts created between these timestamps, {"before": <before timestamp>, "after", <after_timestamp>}
+            nodes: yield (shortcode, node data) tuples instead of shortcodes, for building lite `Post` objects
+            cursor, on_page: resume the pagination from a cursor, and get the checkpoint state after each page (see `_scrape_pages`)
         """
         param = {"tag_name": self.tag}
-        return self._scrape_pages(shortcode_extractor, QUERY_HASHTAG_URL, param, "edge_hashtag_to_media", count, new=True, only=only, timestamp_limit=timestamp_limit)
+        return self._scrape_pages(node_extractor if nodes else shortcode_extractor, QUERY_HASHTAG_URL, param, "edge_hashtag_to_media", count, new=True, cursor=cursor, on_page=on_page, only=only, timestamp_limit=timestamp_limit)
 
 
 class Explore(BaseStructure):
@@ -446,6 +641,7 @@ class Explore(BaseStructure):
         - fetch_posts()
     """
 
+    __slots__ = ()
     info_vars = ()
 
     def __init__(self, session: requests.Session):
@@ -454,16 +650,18 @@ class Explore(BaseStructure):
     def __repr__(self):
         return "<Explore>"
 
-    def fetch_posts(self, count: int = 50, only: str = None, timestamp_limit: dict = None):
+    def fetch_posts(self, count: int = 50, only: str = None, timestamp_limit: dict = None, nodes: bool = False, cursor: str = None, on_page=None):
         """Fetches posts in explore feed.
 
         Arguments:
             count: the maximum count of posts you want to fetch
             only: [image/video] filter out other types of posts, only get posts of this particular type
             timestamp_limit: only get posts created between these timestamps, {"before": <before timestamp>, "after", <after_timestamp>}
+            nodes: yield (shortcode, node data) tuples instead of shortcodes, for building lite `Post` objects
+            cursor, on_page: resume the pagination from a cursor, and get the checkpoint state after each page (see `_scrape_pages`)
         """
         param = {"first": count if count <= 50 else 50}
-        return self._scrape_pages(shortcode_extractor, QUERY_DISCOVER_URL, param, "edge_web_discover_media", count, new=True, only=only, timestamp_limit=timestamp_limit)
+        return self._scrape_pages(node_extractor if nodes else shortcode_extractor, QUERY_DISCOVER_URL, param, "edge_web_discover_media", count, new=True, cursor=cursor, on_page=on_page, only=only, timestamp_limit=timestamp_limit)
 
 
 # ========================
@@ -474,6 +672,10 @@ class Explore(BaseStructure):
 
 class Post(BaseStructure):
     """Interface of a Post. Providing information and methods to get a Post's data and media.
+    * If `node` (node data of a post from pagination) is provided and has enough information, the post is built from it as a 'lite' post without querying its data.
+      The full data of a lite post is only fetched when a field that is missing from the node data is accessed,
+      a lite post without session (built by `AsyncInstaScraper`) raises ExtractError instead.
+    * If `data` (already fetched full data of the post) is provided, it will not be queried again.
 
     Methods:
         * as_dict()
@@ -482,13 +684,23 @@ class Post(BaseStructure):
         - fetch_likes()
     """
 
+    __slots__ = ("_shortcode", "_lite")
     info_vars = ("typename", "url", "shortcode", "post_id", "location_name", "location_id", "owner_username",
                  "owner_user_id", "created_time", "caption", "media_count", "likes_count", "comments_count")
+    _compact = staticmethod(compact_post)
 
-    def __init__(self, session: requests.Session, shortcode: str):
+    def __init__(self, session: requests.Session, shortcode: str, node: dict = None, data: dict = None):
         BaseStructure.__init__(self, session)
         self._shortcode = shortcode
-        self._get_post_data()
+        self._lite = False
+        if data:
+            self.data = data
+        elif node and lite_node(node):
+            logger.debug("Building lite Post(shortcode=%s) from node data...", self._shortcode)
+            self.data = node
+            self._lite = True
+        else:
+            self._get_post_data()
 
     def __repr__(self):
         return "<Post shortcode={0} post_id={1} media_count={2}>".format(self.shortcode, self.post_id, self.media_count)
@@ -497,17 +709,45 @@ class Post(BaseStructure):
         return self.media_count
 
     def _get_post_data(self):
-        logger.debug("Getting initial data of Post(shortcode={0})...".format(self._shortcode))
+        self._lite = False
+        self.data = cache.get("post", self._shortcode)
+        if self.data is not None:
+            logger.debug("Using cached data of Post(shortcode=%s)", self._shortcode)
+            return
+        logger.debug("Getting initial data of Post(shortcode=%s)...", self._shortcode)
         try:
             resp = self._get_json(POST_URL.format(shortcode=self._shortcode))
         except ExtractError:
             raise PostNotFound(self._shortcode)
         self.data = resp["graphql"]["shortcode_media"]
+        cache.put("post", self._shortcode, self.data)
+
+    def _field(self, *keys, default=KeyError):
+        """Get the value of a (nested) field in the post data.
+        * If the field is missing from the data of a lite post, the full data is fetched first (ExtractError is raised if the post has no session).
+        * If the field is still missing, returns `default` if provided, raises KeyError otherwise.
+        """
+        value = self.data
+        try:
+            for key in keys:
+                value = value[key]
+        except KeyError:
+            if self._lite:
+                logger.debug("'%s' not found in node data of Post(shortcode=%s)", ".".join(keys), self._shortcode)
+                if self._session is None:
+                    raise ExtractError("'{0}' is not in the node data of lite Post(shortcode={1}), "
+                                       "which has no session to get its full data".format(".".join(keys), self._shortcode))
+                self._get_post_data()
+                return self._field(*keys, default=default)
+            if default is KeyError:
+                raise
+            return default
+        return value
 
     @property
     def typename(self) -> str:
         """One of 'GraphImage', 'GraphVideo', 'GraphSidecar'."""
-        return self.data["__typename"]
+        return self._field("__typename")
 
     @property
     def url(self) -> str:
@@ -517,46 +757,46 @@ class Post(BaseStructure):
     @property
     def shortcode(self) -> str:
         """A unique set of characters as an identity for Instagram."""
-        return self.data["shortcode"]
+        return self._field("shortcode")
 
     @property
     def post_id(self) -> str:
         """A unique set of long numbers as an identity for Instagram."""
-        return self.data["id"]
+        return self._field("id")
 
     @property
     def location_name(self) -> str or None:
         """Name of the location tag as an identity for Instagram. Can be empty (None)."""
-        location = self.data.get("location")
+        location = self._field("location", default=None)
         if location:
             return location["name"]
 
     @property
     def location_id(self) -> str or None:
         """Unique ID of the location tag as an identity for Instagram. Can be empty (None)."""
-        location = self.data.get("location")
+        location = self._field("location", default=None)
         if location:
             return location["id"]
 
     @property
     def owner_username(self) -> str:
         """Username of the post owner."""
-        return self.data["owner"]["username"]
+        return self._field("owner", "username")
 
     @property
     def owner_user_id(self) -> str:
         """User ID of the post owner."""
-        return self.data["owner"]["id"]
+        return self._field("owner", "id")
 
     @property
     def created_time(self) -> float:
         """Timestamp of the time the post was created."""
-        return float(self.data["taken_at_timestamp"])
+        return float(self._field("taken_at_timestamp"))
 
-    @property
+    @memoized
     def caption(self) -> str:
         """Caption text of the post."""
-        edges = self.data["edge_media_to_caption"]["edges"]
+        edges = self._field("edge_media_to_caption", "edges")
         if not edges:
             return ""
         cap = ""
@@ -567,17 +807,22 @@ class Post(BaseStructure):
     @property
     def media_count(self) -> int:
         """Amount of media in the post."""
-        return len(self.obtain_media())
+        return len(self.containers)
 
     @property
     def likes_count(self) -> int:
         """Amount of likes of the post."""
-        return self.data["edge_media_preview_like"]["count"]
+        return self._field("edge_media_preview_like", "count")
 
     @property
     def comments_count(self) -> int:
         """Amount of comments of the post."""
-        return self.data["edge_media_to_parent_comment"]["count"]
+        return self._field("edge_media_to_parent_comment", "count")
+
+    @memoized
+    def containers(self) -> list:
+        """`Container` objects of the media of the post, built once for each data."""
+        return container(self.typename, self.data)
 
     def obtain_media(self) -> list:
         """Obtain media of the post in the form of `Container` objects.
@@ -585,32 +830,34 @@ class Post(BaseStructure):
         Returns:
             list: `Container` objects (see: container.py)
         """
-        return container(self.typename, self.data)
+        return self.containers
 
-    def fetch_likes(self, count: int = 50):
+    def fetch_likes(self, count: int = 50, cursor: str = None, on_page=None):
         """Fetch likes of this post in the form of usernames of users who liked the post.
 
         Arguments:
             count: maxiumum count of likes you want to fetch
+            cursor, on_page: resume the pagination from a cursor, and get the checkpoint state after each page (see `_scrape_pages`)
 
         Returns:
             list: usernames of users who liked this post
         """
         param = {"shortcode": self.shortcode, "include_reel": False}
-        return self._scrape_pages(lambda node: {"username": node["username"], "user_id": node["id"]}, QUERY_LIKES_URL, param, "edge_liked_by", count, new=True)
+        return self._scrape_pages(lambda node: {"username": node["username"], "user_id": node["id"]}, QUERY_LIKES_URL, param, "edge_liked_by", count, new=True, cursor=cursor, on_page=on_page)
 
-    def fetch_comments(self, count: int = 50):
+    def fetch_comments(self, count: int = 50, cursor: str = None, on_page=None):
         """Fetch comments of this post in the form of {username: <username>, text: <comment text>, time: <timestamp>}.
 
         Arguments:
             count: maximum count of comments you want to fetch
+            cursor, on_page: resume the pagination from a cursor, and get the checkpoint state after each page (see `_scrape_pages`)
 
         Returns:
             list: dictionaries of comments
         """
         param = {"shortcode": self.shortcode}
         return self._scrape_pages(lambda node: {"username": node["owner"]["username"], "user_id": node["owner"]["id"], "text": node["text"], "time": node["created_at"]},
-                                  QUERY_COMMENTS_URL, param, "edge_media_to_comment", count, new=True)
+                                  QUERY_COMMENTS_URL, param, "edge_media_to_comment", count, new=True, cursor=cursor, on_page=on_page)
 
 
 class IGTV(Post):
@@ -623,6 +870,7 @@ class IGTV(Post):
         - fetch_likes()
     """
 
+    __slots__ = ("_title",)
     info_vars = ("typename", "url", "shortcode", "post_id", "location_name", "location_id", "owner_username",
                  "owner_user_id", "created_time", "caption", "media_count", "likes_count", "comments_count", "title")
 
@@ -642,43 +890,38 @@ class IGTV(Post):
 
 class Story(BaseStructure):
     """Interface of a Story. Providing information of a Story and a method to get the media.
+    * If `data` (already fetched reel data of the story) is provided, it will not be queried again.
 
     Methods:
         * obtain_media()
     """
 
+    __slots__ = ("owner_user_id", "tag", "reel_id")
     info_vars = ("typename", "owner_name", "id", "created_time_list")
+    _compact = staticmethod(compact_reel)
 
-    def __init__(self, session: requests.Session, user_id: str = None, tag: str = None, reel_id: str = None):
+    def __init__(self, session: requests.Session, user_id: str = None, tag: str = None, reel_id: str = None, data: dict = None):
         BaseStructure.__init__(self, session)
         if all((user_id, tag, reel_id)) or not any((user_id, tag, reel_id)) or (bool(user_id), bool(tag), bool(reel_id)).count(True) == 2:
             raise ValueError("Invalid arguments: only one of 'user_id', 'tag', 'reel_id' should be specified.")
         self.owner_user_id = user_id
         self.tag = tag
         self.reel_id = reel_id
-        self._get_story_data()
+        if data:
+            self.data = data
+        else:
+            self._get_story_data()
 
     def __repr__(self):
         return "<Story owner_name='{0}'>".format(self.owner_name)
 
     def __len__(self):
-        return len(self.obtain_media())
+        return len(self.containers)
 
     def _get_story_data(self):
-        logger.debug("Getting initial data of Story({0})...".format(("user_id=" + self.owner_user_id if self.owner_user_id else "tag=" + self.tag) if self.owner_user_id or self.tag else ("reel_id=" + self.reel_id)))
-        param = {"reel_ids": [self.owner_user_id] if self.owner_user_id else [],
-                 "tag_names": [self.tag] if self.tag else [], "location_ids": [],
-                 "highlight_reel_ids": [self.reel_id] if self.reel_id else [], "precomposed_overlay": False}
-        data = self._get_json(QUERY_STORIES_URL + json.dumps(param))
-
-        if "data" not in data or "reels_media" not in data["data"]:
-            message = data.get("message", "key error")
-            logger.debug(json.dumps(data))
-            if message == "rate limited":
-                raise RateLimitedError()
-            raise ExtractError(message)
-
-        data = data["data"]["reels_media"]
+        logger.debug("Getting initial data of Story(%s)...", ("user_id=" + self.owner_user_id if self.owner_user_id else "tag=" + self.tag) if self.owner_user_id or self.tag else ("reel_id=" + self.reel_id))
+        url = reels_query_url([self.owner_user_id] if self.owner_user_id else [], [self.tag] if self.tag else [], [self.reel_id] if self.reel_id else [])
+        data = extract_reels(self._get_json(url))
         if not data:
             raise StoryNotFound(self.owner_user_id or self.tag or self.reel_id)
         self.data = data[0]
@@ -698,18 +941,23 @@ class Story(BaseStructure):
         """ID (user or hashtag) of the story."""
         return self.data["id"]
 
-    @property
+    @memoized
     def created_time_list(self) -> list:
         """The created times of each story media."""
         return [float(item["taken_at_timestamp"]) for item in self.data["items"]]
 
+    @memoized
+    def containers(self) -> list:
+        """`Container` objects of the media of the story, built once for each data."""
+        return container(self.typename, self.data)
+
     def obtain_media(self) -> list:
         """Obtain media of the story in the form of `Container` objects.
 
         Returns:
             a list of Container objects: (see: container.py)
         """
-        return container(self.typename, self.data)
+        return self.containers
 
 
 class Highlight(Story):
@@ -719,10 +967,11 @@ class Highlight(Story):
         * obtain_media()
     """
 
+    __slots__ = ("_title",)
     info_vars = ("typename", "owner_name", "id", "created_time_list", "title")
 
-    def __init__(self, session: requests.Session, title: str, reel_id: str):
-        Story.__init__(self, session, reel_id=reel_id)
+    def __init__(self, session: requests.Session, title: str, reel_id: str, data: dict = None):
+        Story.__init__(self, session, reel_id=reel_id, data=data)
         self._title = title
 
     def __repr__(self):
@@ -1,15 +1,18 @@
 import os
-import sys
+import json
+import time
 import pickle
-import traceback
 import logging
-from threading import Thread
+from threading import (Thread, Event)
+from queue import (Queue, Full)
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from contextlib import contextmanager
 
 import requests
 
-from instascrape import (DIR_PATH, ACCOUNT_DIR)
+from instascrape import (DIR_PATH, ACCOUNT_DIR, make_dirs)
+from instascrape.constants import (PREFETCH, PRELOAD_WORKERS, STATE_VERSION, USER_IDS_TTL)
 from instascrape.exceptions import InstaScrapeError
 
 logger = logging.getLogger("instascrape")
@@ -49,8 +52,9 @@ def dump_cookie(username: str, cookie: requests.sessions.cookielib.CookieJar):
     Returns:
         True if success
     """
+    make_dirs()
     path = os.path.join(ACCOUNT_DIR, username + ".cookie")
-    logger.debug("dumping cookie to {0}...".format(path))
+    logger.debug("dumping cookie to %s...", path)
     if os.path.isfile(path):
         logger.warning("Cookie file already exists. Overwriting...")
     # Convert cookie to dict
@@ -71,9 +75,9 @@ def load_cookie(username: str):
         CookieJar if found matched cookie file
     """
     path = os.path.join(ACCOUNT_DIR, username + ".cookie")
-    logger.debug("trying to load cookie from {0}...".format(path))
+    logger.debug("trying to load cookie from %s...", path)
     if not os.path.isfile(path):
-        logger.debug("cookie file for {0} not found".format(username))
+        logger.debug("cookie file for %s not found", username)
         return False
     with open(path, "rb") as pkl:
         cookie_dict = pickle.load(pkl)
@@ -94,51 +98,109 @@ def delete_cookie(username: str):
         InstaScrapeError if cookie file not found
     """
     path = os.path.join(ACCOUNT_DIR, username + ".cookie")
-    logger.debug("deleting cookie in {0}...".format(path))
+    logger.debug("deleting cookie in %s...", path)
     if not os.path.isfile(path):
         raise InstaScrapeError("Cookie file for {0} not found".format(username))
     os.remove(path)
     return True
 
 
-def dump_obj(obj):
-    """Dump the `InstaScraper` object into a pickle file for later 'cli' use.
+def dump_state(state: dict):
+    """Dump the logged in state of an `InstaScraper` object (see `InstaScraper.state()`) into a JSON file for later 'cli' use.
 
     Arguments:
-        obj: `InstaScraper` object
+        state: {"username", "my_username", "my_user_id", "cookies"}
     """
-    path = os.path.join(DIR_PATH, "insta.pkl")
-    logger.debug("dumping object to {0}...".format(path))
-    if os.path.isfile(path):
-        logger.debug("pickle file already exists, overwrite.")
-    with open(path, "wb+") as pkl:
-        pickle.dump(obj, pkl)
+    make_dirs()
+    path = os.path.join(DIR_PATH, "session.json")
+    logger.debug("dumping session state to %s...", path)
+    with open(path + ".tmp", "w") as f:
+        json.dump(dict(state, version=STATE_VERSION), f)
+    os.replace(path + ".tmp", path)
 
 
-def load_obj():
-    """Load the `InstaScraper` object stored in the pickle file.
+def load_state() -> dict or None:
+    """Load the session state stored in the JSON file.
+    * The `InstaScraper` object pickled by older versions ('insta.pkl') is converted to the JSON file once.
 
     Returns:
-        insta: `InstaScraper` object if one is found, None otherwise
+        dict: the state (see `dump_state()`) if one is found, None otherwise
     """
-    path = os.path.join(DIR_PATH, "insta.pkl")
-    logger.debug("loading object from {0}...".format(path))
+    path = os.path.join(DIR_PATH, "session.json")
+    legacy_path = os.path.join(DIR_PATH, "insta.pkl")
+    if not os.path.isfile(path) and os.path.isfile(legacy_path):
+        logger.debug("converting %s to %s...", legacy_path, path)
+        with open(legacy_path, "rb") as pkl:
+            dump_state(pickle.load(pkl).state())
+        os.remove(legacy_path)
+    logger.debug("loading session state from %s...", path)
     if not os.path.isfile(path):
-        logger.debug("{0} pickle file not found.".format(path))
+        logger.debug("%s session state file not found.", path)
         return
-    with open(path, "rb") as pkl:
-        insta = pickle.load(pkl)
-    return insta
+    try:
+        with open(path, "r") as f:
+            state = json.load(f)
+    except ValueError:
+        logger.warning("Invalid session state file %s, ignored.", path)
+        return
+    if state.get("version") != STATE_VERSION:
+        logger.warning("Unsupported version of session state file %s, ignored.", path)
+        return
+    return state
 
 
-def remove_obj():
-    """Remove the pickle file that stored the `InstaScraper` object."""
-    path = os.path.join(DIR_PATH, "insta.pkl")
-    logger.debug("removing object in {0}".format(path))
-    if not os.path.isfile(path):
-        logger.warning("{0} pickle file not found".format(path))
+def remove_state():
+    """Remove the file that stored the session state (and the pickle file of older versions)."""
+    paths = [p for p in (os.path.join(DIR_PATH, "session.json"), os.path.join(DIR_PATH, "insta.pkl")) if os.path.isfile(p)]
+    if not paths:
+        logger.warning("%s session state file not found", os.path.join(DIR_PATH, "session.json"))
         return
-    os.remove(path)
+    for path in paths:
+        logger.debug("removing session state in %s", path)
+        os.remove(path)
+
+
+def _read_user_ids(path: str) -> dict:
+    """{<username>: [<user id>, <time saved>]}, the entries older than `USER_IDS_TTL` seconds (or of the older format) are left out."""
+    if not os.path.isfile(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            entries = json.load(f)
+    except ValueError:
+        logger.warning("Invalid user id cache %s, ignored.", path)
+        return {}
+    expiry = time.time() - USER_IDS_TTL
+    return dict((name, entry) for name, entry in entries.items() if isinstance(entry, list) and entry[1] > expiry)
+
+
+def load_user_ids() -> dict:
+    """Load the cached mapping of usernames to user ids.
+    * A user id is cached for `USER_IDS_TTL` seconds, since the username may be changed or taken by another user.
+
+    Returns:
+        dict: {<username>: <user id>}, empty if no cache is found
+    """
+    path = os.path.join(DIR_PATH, "user_ids.json")
+    logger.debug("loading user ids from %s...", path)
+    return dict((name, user_id) for name, (user_id, _) in _read_user_ids(path).items())
+
+
+def dump_user_ids(user_ids: dict):
+    """Add the user ids of usernames to the cache (see `load_user_ids()`), the expired entries are dropped.
+
+    Arguments:
+        user_ids: {<username>: <user id>}
+    """
+    make_dirs()
+    path = os.path.join(DIR_PATH, "user_ids.json")
+    entries = _read_user_ids(path)
+    now = time.time()
+    entries.update((name, [user_id, now]) for name, user_id in user_ids.items())
+    logger.debug("dumping %s user ids to %s...", len(user_ids), path)
+    with open(path + ".tmp", "w") as f:
+        json.dump(entries, f)
+    os.replace(path + ".tmp", path)
 
 
 @contextmanager
@@ -147,20 +209,32 @@ def protection(*args):
     try:
         yield
     except Exception as e:
-        exc = sys.exc_info()
-        logger.debug("".join(traceback.format_exception(*exc)))
-        logger.error("{0} ({1}): {2}".format(args[0], args[1], e))
+        logger.debug("Traceback", exc_info=True)
+        logger.error("%s (%s): %s", args[0], args[1], e)
     finally:
         pass
 
 
-def instance_worker(session: requests.Session, instance, generator) -> list:
-    """Spawn threads to produce instances by looping through a generator. (with protection)
+def chunks(iterable, size: int):
+    """Yields lists of at most `size` items of an iterable."""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def instance_worker(session: requests.Session, instance, generator, max_workers: int = PRELOAD_WORKERS) -> list:
+    """Produce instances by looping through a generator with a bounded pool of threads. (with protection)
     - Passes items that are yielded from the generator as arguments to the instance.
+    - Instances are returned in the same order as the items, the ones that failed to be produced are left out.
     * `instance`: one of `Post` or `Profile`.
+    * `max_workers`: maximum number of instances produced at the same time.
     """
     logger.info("==========[Preload Started]==========")
-    results = []
     # collect itmes from generator
     logger.info("[1] Collecting items...")
     items = []
@@ -171,19 +245,17 @@ def instance_worker(session: requests.Session, instance, generator) -> list:
     def job(arg):
         if type(arg) is tuple:
             with protection(instance.__name__, arg[0]):
-                results.append(instance(session, *arg))
+                return instance(session, *arg)
         else:
             with protection(instance.__name__, arg):
-                results.append(instance(session, arg))
+                return instance(session, arg)
     # spawn threads
-    logger.info("[2] Spawning workers...")
-    threads = []
-    for arg in items:
-        thread = Thread(target=job, args=(arg,))
-        threads.append(thread)
-        thread.start()
-    for thread in threads:
-        thread.join()
+    logger.info("[2] Spawning %s workers for %s items...", min(max_workers, len(items)), len(items))
+    results = []
+    if items:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            # `map` yields results in the order of the items
+            results = [result for result in executor.map(job, items) if result is not None]
     logger.info("==========[Preload Completed]========")
     return results
 
@@ -197,3 +269,49 @@ def instance_generator(session: requests.Session, instance, generator):
         else:
             with protection(instance.__name__, arg):
                 yield instance(session, arg)
+
+
+def prefetch(generator, size: int = PREFETCH):
+    """Yields items of a generator which is consumed by a background (producer) thread, through a bounded queue.
+    - The producer keeps resolving upcoming items while the consumer is busy with the current one.
+    - The producer blocks when `size` items are waiting, so memory stays flat no matter how many items the generator yields.
+    - Exceptions raised in the producer are re-raised in the consumer.
+    - The producer stops (and closes the generator) as soon as the consumer stops iterating.
+    """
+    queue = Queue(maxsize=size)
+    stop = Event()
+    end = object()  # sentinel
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in generator:
+                if not put((item, None)):
+                    break
+        except Exception as e:
+            put((None, e))
+        finally:
+            if hasattr(generator, "close"):
+                generator.close()
+            put((end, None))
+
+    thread = Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, exc = queue.get()
+            if exc is not None:
+                raise exc
+            if item is end:
+                break
+            yield item
+    finally:
+        stop.set()
@@ -15,6 +15,10 @@ REQUIRED = [
     "tqdm",
     "colorama"
 ]
+EXTRAS = {
+    "async": ["aiohttp"],
+    "parquet": ["pyarrow"]
+}
 about = {}
 with open(os.path.join(here, "instascrape", "__version__.py"), "r") as f:
     exec(f.read(), about)
@@ -55,6 +59,7 @@ setup(
         "console_scripts": ["instascrape=instascrape.cli:main"],
     },
     install_requires=REQUIRED,
+    extras_require=EXTRAS,
     include_package_data=True,
     packages=find_packages(),
     license="MIT",
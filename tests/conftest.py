@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# -> nothing is written to the real '~/.instascrape' (`DIR_PATH` is set when instascrape is imported)
+os.environ["HOME"] = tempfile.mkdtemp(prefix="instascrape-tests-")
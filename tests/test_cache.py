@@ -0,0 +1,37 @@
+from instascrape import cache as module
+from instascrape.cache import DataCache
+
+PROFILE = {"id": "1", "username": "Someone"}
+
+
+def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(module.time, "time", lambda: now[0])
+    cache = DataCache(ttl=60)
+    cache.put_profile(PROFILE)
+    now[0] += 59
+    assert cache.get("user", "someone") == PROFILE  # -> usernames are case insensitive
+    now[0] += 2
+    assert cache.get("user", "someone") is None
+    assert len(cache) == 0 and (cache.hits, cache.misses) == (1, 1)
+
+
+def test_disk_entries_expire(monkeypatch, tmp_path):
+    now = [1000.0]
+    monkeypatch.setattr(module.time, "time", lambda: now[0])
+    DataCache(ttl=60, path=str(tmp_path)).put("post", "abc", {"shortcode": "abc"})
+    cache = DataCache(ttl=60, path=str(tmp_path))  # -> e.g. a later run
+    assert cache.get("post", "abc") == {"shortcode": "abc"}
+    now[0] += 61
+    assert DataCache(ttl=60, path=str(tmp_path)).get("post", "abc") is None
+
+
+def test_disabled_and_evicted():
+    cache = DataCache(ttl=0)
+    cache.put("post", "abc", {})
+    assert cache.get("post", "abc") is None and len(cache) == 0
+
+    cache.configure(ttl=60, size=2)
+    for shortcode in ("a", "b", "c"):
+        cache.put("post", shortcode, {"shortcode": shortcode})
+    assert cache.get("post", "a") is None and cache.get("post", "c") == {"shortcode": "c"}
@@ -0,0 +1,22 @@
+import os
+import stat
+
+import pytest
+
+from instascrape.daemon import Daemon
+
+
+def test_socket_is_private(tmp_path):
+    path = str(tmp_path / "daemon.sock")
+    with Daemon(lambda argv: None, path):
+        mode = os.stat(path).st_mode
+        assert stat.S_ISSOCK(mode) and not stat.S_IMODE(mode) & 0o077
+    assert not os.path.exists(path)
+
+
+def test_other_file_is_not_removed(tmp_path):
+    path = tmp_path / "daemon.sock"
+    path.write_text("not a socket")
+    with pytest.raises(OSError):
+        Daemon(lambda argv: None, str(path))
+    assert path.read_text() == "not a socket"
@@ -0,0 +1,113 @@
+import re
+import threading
+from http.server import (HTTPServer, BaseHTTPRequestHandler)
+
+import pytest
+
+from instascrape.download import (_down_from_src, _plan_structure)
+from instascrape.utils import to_datetime
+
+CONTENT = bytes(range(256)) * 40  # -> 10240 bytes
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Serves `CONTENT` as a JPEG, replying to `Range` requests as set by `server.mode`:
+    'range' (206), 'ignore' (200 with the whole content), 'wrong-start' (206 from 0), 'gone' (416 for another size)."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.ranges.append(self.headers.get("Range"))
+        match = re.match(r"bytes=(\d+)-", self.headers.get("Range") or "")
+        mode = self.server.mode
+        if not match or mode == "ignore":
+            return self.reply(200, CONTENT)
+        start = int(match.group(1))
+        if mode == "gone" or start >= len(CONTENT):
+            total = len(CONTENT) + 1 if mode == "gone" else len(CONTENT)
+            return self.reply(416, b"", {"Content-Range": "bytes */{0}".format(total)})
+        if mode == "wrong-start":
+            start = 0
+        self.reply(206, CONTENT[start:], {"Content-Range": "bytes {0}-{1}/{2}".format(start, len(CONTENT) - 1, len(CONTENT))})
+
+    def reply(self, status: int, body: bytes, headers: dict = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    server.mode = "range"
+    server.ranges = []
+    server.src = "http://127.0.0.1:{0}/media.jpg".format(server.server_address[1])
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def write_part(tmp_path, data: bytes):
+    (tmp_path / "media.jpg.part").write_bytes(data)
+
+
+def downloaded(tmp_path) -> bytes:
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["media.jpg"]
+    return (tmp_path / "media.jpg").read_bytes()
+
+
+def test_download(server, tmp_path):
+    assert _down_from_src(server.src, "media", str(tmp_path)) == str(tmp_path)
+    assert downloaded(tmp_path) == CONTENT
+    assert server.ranges == [None]
+
+
+def test_resume_from_part(server, tmp_path):
+    write_part(tmp_path, CONTENT[:3000])
+    assert _down_from_src(server.src, "media", str(tmp_path)) == str(tmp_path)
+    assert downloaded(tmp_path) == CONTENT
+    assert server.ranges == ["bytes=3000-"]
+
+
+def test_complete_part(server, tmp_path):
+    write_part(tmp_path, CONTENT)
+    assert _down_from_src(server.src, "media", str(tmp_path)) == str(tmp_path)
+    assert downloaded(tmp_path) == CONTENT
+    assert server.ranges == ["bytes={0}-".format(len(CONTENT))]
+
+
+@pytest.mark.parametrize("mode", ["gone", "wrong-start"])
+def test_stale_part_is_downloaded_again(server, tmp_path, mode):
+    server.mode = mode
+    write_part(tmp_path, b"x" * 5000)
+    assert _down_from_src(server.src, "media", str(tmp_path)) == str(tmp_path)
+    assert downloaded(tmp_path) == CONTENT
+    assert server.ranges == ["bytes=5000-", None]
+
+
+def test_whole_content_replaces_part(server, tmp_path):
+    server.mode = "ignore"
+    write_part(tmp_path, b"x" * 5000)
+    assert _down_from_src(server.src, "media", str(tmp_path)) == str(tmp_path)
+    assert downloaded(tmp_path) == CONTENT
+    assert server.ranges == ["bytes=5000-"]
+
+
+class Story:
+    """Stands in for a `Story` of 3 media, 2 of them posted within the same second."""
+    created_time_list = [1600000000.0, 1600000000.5, 1600000001.0]
+
+    def obtain_media(self):
+        return ["image", "video", "image"]
+
+
+def test_story_filenames_are_unique(tmp_path):
+    _, _, items = _plan_structure(Story(), str(tmp_path), "@user(story)")
+    first, last = to_datetime(1600000000.0), to_datetime(1600000001.0)
+    assert [filename for _, _, filename, _ in items] == [first, first + "_2", last]
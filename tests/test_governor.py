@@ -0,0 +1,60 @@
+import pytest
+
+from instascrape import governor as module
+from instascrape.exceptions import RateLimitedError
+from instascrape.governor import Governor
+
+URL = "https://www.instagram.com/graphql/query/?query_hash=abc&variables={}"
+
+
+class Response:
+
+    def __init__(self, status_code: int = 200, data: dict = None, headers: dict = None):
+        self.status_code = status_code
+        self.data = data
+        self.headers = headers or {}
+
+    def json(self):
+        return self.data
+
+
+class Session:
+    """Replies to the requests with `responses`, in order."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.urls = []
+
+    def get(self, url):
+        self.urls.append(url)
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(module.time, "sleep", sleeps.append)
+    return sleeps
+
+
+def test_retry_after(sleeps):
+    governor = Governor(rate=1000)
+    session = Session(Response(429, headers={"Retry-After": "7"}), Response(data={"message": "rate limited"}, headers={"Retry-After": "3"}),
+                      Response(data={"data": 1}))
+    assert governor.get_json(session, URL) == {"data": 1}
+    assert len(session.urls) == 3
+    assert [round(s) for s in sleeps] == [7, 7]  # -> no time passes in the (mocked) sleeps, the 3s delay ends within the 7s one
+    assert governor.bucket("query:abc").rate == 250  # -> halved by each rate limited response
+
+
+def test_backoff_with_jitter(sleeps, monkeypatch):
+    monkeypatch.setattr(module.random, "uniform", lambda low, high: high)
+    governor = Governor(rate=1000, retries=3, base_delay=2.0, max_delay=5.0)
+    with pytest.raises(RateLimitedError):
+        governor.get_json(Session(*[Response(429)] * 4), URL)
+    assert [governor.backoff_delay({}, attempt) for attempt in range(4)] == [2.0, 4.0, 5.0, 5.0]
+
+
+def test_retry_after_date(monkeypatch):
+    monkeypatch.setattr(module.time, "time", lambda: 1600000000.0)
+    assert Governor().backoff_delay({"Retry-After": "Sun, 13 Sep 2020 12:27:00 GMT"}, 0) == pytest.approx(20.0)
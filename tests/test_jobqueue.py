@@ -0,0 +1,141 @@
+import pytest
+
+from instascrape.instascraper import InstaScraper
+from instascrape.jobqueue import JobQueue
+from instascrape.download import NOTHING
+
+
+@pytest.fixture
+def queue(tmp_path):
+    with JobQueue(str(tmp_path / "jobs.db")) as queue:
+        yield queue
+
+
+def test_target_without_igtv_is_removed(queue, monkeypatch):
+    insta = InstaScraper()
+    monkeypatch.setattr(insta, "get_user_igtv", lambda name, preload=False: [])
+    job = queue.add("someone", "download_user_igtv", ("someone",), {})
+    result = queue.wrap(job, insta.download_user_igtv)("someone")
+    assert result == NOTHING and result is not None
+    assert queue.unfinished() == []
+
+
+def test_target_without_highlights_or_posts_is_removed(queue, monkeypatch):
+    insta = InstaScraper()
+    monkeypatch.setattr(insta, "get_user_highlights", lambda name, preload=False: [])
+    monkeypatch.setattr(insta, "get_user_timeline_posts", lambda *args: [])
+    for method in ("download_user_highlights", "download_user_timeline_posts"):
+        job = queue.add("someone", method, ("someone",), {})
+        queue.wrap(job, getattr(insta, method))("someone")
+    assert queue.unfinished() == []
+
+
+def test_users_without_stories_are_removed(queue, monkeypatch):
+    insta = InstaScraper()
+    monkeypatch.setattr(insta, "get_user_ids", lambda names: {"someone": "1"})
+    monkeypatch.setattr(insta, "get_user_stories", lambda user_ids, chunk_size: iter([]))
+    job = queue.add("stories.txt", "download_users_stories", (["someone"],), {})
+    result = queue.wrap(job, insta.download_users_stories)(["someone"])
+    assert result == NOTHING and result is not None
+    assert queue.unfinished() == []
+
+
+def test_failed_job_is_kept_then_pruned(queue):
+    job = queue.add("someone", "download_post", ("abc",), {})
+    for attempt in range(1, 3):
+        queue.wrap(job, lambda shortcode: None)("abc")
+        [job] = queue.unfinished()
+        assert (job.status, job.attempts, job.error) == ("failed", attempt, "download failed")
+        assert queue.prune(3) == []
+
+    def fail(shortcode):
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        queue.wrap(job, fail)("abc")
+    assert [j.id for j in queue.prune(3)] == [job.id]
+    assert queue.unfinished() == []
+
+
+def test_interrupted_job_is_not_pruned(queue):
+    job = queue.add("someone", "download_post", ("abc",), {})
+    for _ in range(5):
+        queue.set_status(job, "running")
+    assert queue.prune(3) == []
+    assert [j.status for j in queue.unfinished()] == ["running"]
+
+
+PAGES = {None: (["a", "b"], "c1"), "c1": (["c", "d"], "c2"), "c2": (["e"], None)}  # -> cursor: (shortcodes, end cursor)
+
+
+def paginate(cursor: str, on_page):
+    """Yields the shortcodes of the pages from `cursor`, like `_scrape_pages`."""
+    while True:
+        shortcodes, cursor = PAGES[cursor]
+        yield from shortcodes
+        on_page({"cursor": cursor})
+        if cursor is None:
+            return
+
+
+def downloader(downloaded: list, fail_at: str = None, incomplete: str = None):
+    """A download method which supports checkpoints, fails at the post `fail_at` and does not complete the post `incomplete`."""
+    def download_user_timeline_posts(name, count=50, checkpoint=None):
+        downloaded.append(count)
+        pages = paginate(checkpoint.cursor, checkpoint.on_page)
+        for shortcode in checkpoint.filter(pages):
+            if shortcode == fail_at:
+                raise ValueError("boom")
+            downloaded.append(shortcode)
+            checkpoint.done(shortcode, complete=shortcode != incomplete)
+        return "path"
+    return download_user_timeline_posts
+
+
+def test_job_resumes_from_checkpoint(queue):
+    job = queue.add("someone", "download_user_timeline_posts", ("someone",), {"count": 10})
+    downloaded = []
+    with pytest.raises(ValueError):
+        queue.wrap(job, downloader(downloaded, fail_at="d"))("someone", **job.kwargs)
+    assert downloaded == [10, "a", "b", "c"]
+
+    [job] = queue.unfinished()
+    assert (job.status, job.cursor, job.position, job.finished) == ("failed", "c1", 2, {"a", "b", "c"})
+    downloaded = []
+    assert queue.wrap(job, downloader(downloaded))("someone", **job.kwargs) == "path"
+    assert downloaded == [8, "d", "e"]  # -> from the page of 'c', which is skipped, with the count of the pages before it deducted
+    assert queue.unfinished() == []
+
+
+def test_incomplete_post_holds_the_cursor(queue):
+    job = queue.add("someone", "download_user_timeline_posts", ("someone",), {"count": 10})
+    with pytest.raises(ValueError):
+        queue.wrap(job, downloader([], fail_at="e", incomplete="b"))("someone", **job.kwargs)
+    [job] = queue.unfinished()
+    assert (job.cursor, job.position, job.finished) == (None, 0, {"a", "c", "d"})
+
+
+def test_job_with_incomplete_posts_is_kept(queue):
+    job = queue.add("someone", "download_user_timeline_posts", ("someone",), {"count": 10})
+    downloaded = []
+    assert queue.wrap(job, downloader(downloaded, incomplete="c"))("someone", **job.kwargs) == "path"
+    [job] = queue.unfinished()
+    assert (job.status, job.error, job.cursor, job.finished) == ("failed", "1 posts not completely downloaded", None, {"a", "b", "d", "e"})
+    downloaded = []
+    assert queue.wrap(job, downloader(downloaded))("someone", **job.kwargs) == "path"
+    assert downloaded == [10, "c"]  # -> from the page of the incomplete post, the finished ones are skipped
+    assert queue.unfinished() == []
+
+
+def test_interrupted_job_is_not_a_failed_attempt(queue):
+    job = queue.add("someone", "download_post", ("abc",), {})
+
+    def interrupt(shortcode):
+        raise KeyboardInterrupt()
+
+    for _ in range(3):
+        with pytest.raises(KeyboardInterrupt):
+            queue.wrap(job, interrupt)("abc")
+    assert queue.prune(3) == []
+    [job] = queue.unfinished()
+    assert (job.status, job.attempts) == ("interrupted", 0)
@@ -0,0 +1,26 @@
+import logging
+import queue
+
+from instascrape.logger import QueueHandler
+
+
+def test_record_is_formatted_before_queueing():
+    records = queue.Queue()
+    handler = QueueHandler(records)
+    logger = logging.getLogger("instascrape.test_logger")
+    logger.addHandler(handler)
+    param = {"after": "a"}
+    try:
+        logger.warning("Query: %s", param)
+        param["after"] = "b"
+        try:
+            raise ValueError("bad")
+        except ValueError:
+            logger.exception("Failed")
+    finally:
+        logger.removeHandler(handler)
+    record = records.get_nowait()
+    assert (record.getMessage(), record.args) == ("Query: {'after': 'a'}", None)
+    record = records.get_nowait()
+    assert record.exc_info is None and "ValueError: bad" in record.exc_text
+    assert "ValueError: bad" in logging.Formatter().format(record)
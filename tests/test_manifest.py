@@ -0,0 +1,25 @@
+import os
+
+from instascrape.manifest import (Manifest, MANIFEST_FILENAME, src_id)
+
+
+def test_existing_files_are_indexed_once(tmp_path):
+    (tmp_path / "post").mkdir()
+    for file in ("post/1.jpg", "post/2.mp4", "story.jpg.part", "notes.txt"):
+        (tmp_path / file).write_bytes(b"")
+    with Manifest(str(tmp_path)) as manifest:
+        assert manifest.names == {os.path.join("post", "1"), os.path.join("post", "2")}  # -> not the partial download
+    os.remove(str(tmp_path / "post" / "1.jpg"))
+    (tmp_path / "2.jpg").write_bytes(b"")
+    with Manifest(str(tmp_path)) as manifest:
+        assert os.path.join("post", "1") in manifest and "2" not in manifest  # -> the files are not probed again
+
+
+def test_records_are_reloaded(tmp_path):
+    src = "https://scontent.cdninstagram.com/v/t51/12345_67890_n.jpg?_nc_ht=scontent&oh=abc"
+    with Manifest(str(tmp_path)) as manifest:
+        manifest.add("abc", shortcode="abc", index=1, src=src_id(src))
+    with open(str(tmp_path / MANIFEST_FILENAME), "a") as f:
+        f.write('{"name": "cut')  # -> killed while writing
+    with Manifest(str(tmp_path)) as manifest:
+        assert (manifest.names, manifest.shortcodes, manifest.srcs) == ({"abc"}, {"abc"}, {"12345_67890_n.jpg"})
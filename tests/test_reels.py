@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from instascrape import aio, instascraper
+from instascrape.aio import AsyncInstaScraper
+from instascrape.exceptions import (ExtractError, RateLimitedError)
+from instascrape.instascraper import InstaScraper
+
+IDS = ["1", "2", "bad", "4", "5"]
+
+
+class Reels:
+    """Replies to the reels requests like Instagram: fails to extract the data if one of the ids is 'bad', or with `error` if set."""
+
+    def __init__(self, error: Exception = None):
+        self.error = error
+        self.requests = []
+
+    def __call__(self, ids: list) -> dict:
+        self.requests.append(list(ids))
+        if self.error:
+            raise self.error
+        if "bad" in ids:
+            raise ExtractError("bad request")
+        return dict((id, {"id": id}) for id in ids if id != "4")  # -> no reel of '4'
+
+
+def reels_sync(monkeypatch, reels: Reels) -> dict:
+    monkeypatch.setattr(instascraper, "fetch_reels", lambda session, reel_ids=(), highlight_reel_ids=(): reels(reel_ids))
+    return dict(InstaScraper()._reels(reel_ids=IDS, chunk_size=3))
+
+
+def reels_async(monkeypatch, reels: Reels) -> dict:
+    async def get_json(url):
+        await asyncio.sleep(0)
+        return reels(url["reel_ids"])
+
+    monkeypatch.setattr(aio, "reels_query_url", lambda reel_ids=(), highlight_reel_ids=(): {"reel_ids": reel_ids})
+    monkeypatch.setattr(aio, "extract_reels", lambda data: data)
+    monkeypatch.setattr(aio, "split_reels", lambda data: data)
+    insta = AsyncInstaScraper()
+    monkeypatch.setattr(insta, "_get_json", get_json)
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(insta._reels(reel_ids=IDS, chunk_size=3))
+    finally:
+        loop.close()
+
+
+@pytest.mark.parametrize("get_reels", [reels_sync, reels_async])
+def test_failed_chunk_is_retried_one_id_at_a_time(monkeypatch, get_reels):
+    reels = Reels()
+    assert sorted(get_reels(monkeypatch, reels)) == ["1", "2", "5"]
+    assert sorted(reels.requests) == [["1"], ["1", "2", "bad"], ["2"], ["4", "5"], ["bad"]]
+
+
+@pytest.mark.parametrize("get_reels", [reels_sync, reels_async])
+def test_rate_limited_chunk_is_not_split(monkeypatch, get_reels):
+    reels = Reels(RateLimitedError())
+    with pytest.raises(RateLimitedError):
+        get_reels(monkeypatch, reels)
+    assert all(len(ids) > 1 for ids in reels.requests)
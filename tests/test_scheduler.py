@@ -0,0 +1,39 @@
+import time
+import threading
+
+import pytest
+
+from instascrape.download import (cancel_downloads, _check_cancelled)
+from instascrape.scheduler import JobScheduler
+
+
+def test_interrupt_stops_running_jobs():
+    stopped = threading.Event()
+    started = []
+
+    def long_download():
+        started.append("long")
+        try:
+            while True:  # -> e.g. the posts of a huge timeline
+                _check_cancelled()
+                time.sleep(0.01)
+        finally:
+            stopped.set()
+
+    def on_finish(job):
+        raise KeyboardInterrupt()  # -> Ctrl+C, received by the main thread
+
+    scheduler = JobScheduler(workers=2, per_target=1)
+    scheduler.add("a", long_download)
+    scheduler.add("b", lambda: started.append("short"))
+    scheduler.add("b", lambda: started.append("pending"))
+    cancel_downloads(False)
+    start = time.monotonic()
+    try:
+        with pytest.raises(KeyboardInterrupt):
+            scheduler.run(on_finish=on_finish, on_interrupt=cancel_downloads)
+        assert time.monotonic() - start < 1
+        assert stopped.wait(1)
+        assert sorted(started) == ["long", "short"]  # -> not the pending job
+    finally:
+        cancel_downloads(False)
@@ -0,0 +1,14 @@
+import pytest
+
+from instascrape.exceptions import ExtractError
+from instascrape.structures import Post
+
+NODE = {"__typename": "GraphImage", "shortcode": "abc", "id": "1", "taken_at_timestamp": 1600000000, "owner": {"id": "2"},
+        "display_resources": [{"src": "https://scontent.cdninstagram.com/abc.jpg", "config_width": 640, "config_height": 640}]}
+
+
+def test_lite_post_without_session():
+    post = Post(None, "abc", node=NODE)
+    assert (post.typename, post.shortcode, post.created_time, post.media_count) == ("GraphImage", "abc", 1600000000.0, 1)
+    with pytest.raises(ExtractError):
+        post.likes_count
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from instascrape import download
+from instascrape.instascraper import InstaScraper
+from instascrape.manifest import (load_mark, save_mark)
+
+
+class FakePost:
+
+    def __init__(self, i: int):
+        self.shortcode = "post{0}".format(i)
+        self.typename = "GraphImage"
+        self.created_time = 1600000000.0 + i
+        self.media_count = 1
+
+    def __len__(self):
+        return self.media_count
+
+
+POSTS = [FakePost(i) for i in range(10, 0, -1)]  # -> newest first, like the pagination
+
+
+@pytest.fixture
+def insta(monkeypatch, tmp_path):
+    """`InstaScraper` whose timeline is `POSTS`, and whose downloads fail for the posts in `insta.failing`."""
+    insta = InstaScraper()
+    insta.failing = set()
+    insta.downloaded = []
+
+    def get_user_timeline_posts(name, count=50, only=None, timestamp_limit=None, preload=False, checkpoint=None):
+        after = (timestamp_limit or {}).get("after") or 0
+        posts = [p for p in POSTS if p.created_time > after][:count]
+        return posts if preload else iter(posts)
+
+    def down_structure(p, dest, directory, subdir, **kwargs):
+        insta.downloaded.append(p.shortcode)
+        return os.path.join(dest, directory), (0 if p.shortcode in insta.failing else 1, 0)
+
+    monkeypatch.setattr(insta, "get_user_timeline_posts", get_user_timeline_posts)
+    monkeypatch.setattr(download, "_down_structure", down_structure)
+    os.mkdir(str(tmp_path / "@someone"))
+    save_mark(str(tmp_path / "@someone"), POSTS[-3].created_time, POSTS[-3].shortcode)  # -> post3
+    return insta
+
+
+def sync(insta, tmp_path, count: int, preload: bool = False) -> str:
+    insta.downloaded = []
+    insta.download_user_timeline_posts("someone", count=count, dest=str(tmp_path), preload=preload, sync=True)
+    return load_mark(str(tmp_path / "@someone"))["shortcode"]
+
+
+def test_mark_moves_after_complete_run(insta, tmp_path):
+    assert sync(insta, tmp_path, 10) == "post10"
+    assert insta.downloaded == ["post{0}".format(i) for i in range(10, 3, -1)]
+
+
+@pytest.mark.parametrize("preload", [False, True])
+def test_mark_is_kept_when_cut_off_by_count(insta, tmp_path, preload):
+    assert sync(insta, tmp_path, 3, preload) == "post3"
+    assert insta.downloaded == ["post10", "post9", "post8"]  # -> the 4th post only tells that the run was cut off
+    assert sync(insta, tmp_path, 7, preload) == "post10"  # -> a run with a larger count catches up
+
+
+def test_mark_is_kept_when_media_failed(insta, tmp_path):
+    insta.failing.add("post5")
+    assert sync(insta, tmp_path, 10) == "post3"
+    insta.failing.clear()
+    assert sync(insta, tmp_path, 10) == "post10"
@@ -0,0 +1,16 @@
+import time
+
+from instascrape import utils
+from instascrape.constants import USER_IDS_TTL
+
+
+def test_user_ids_expire(monkeypatch):
+    utils.dump_user_ids({"old": "1"})
+    utils.dump_user_ids({"new": "2"})
+    assert utils.load_user_ids() == {"old": "1", "new": "2"}
+
+    later = time.time() + USER_IDS_TTL - 1
+    monkeypatch.setattr(utils.time, "time", lambda: later)
+    utils.dump_user_ids({"new": "3"})  # -> refreshed
+    monkeypatch.setattr(utils.time, "time", lambda: later + 2)
+    assert utils.load_user_ids() == {"new": "3"}